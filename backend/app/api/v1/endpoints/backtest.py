@@ -16,7 +16,8 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from ....database import get_db
-from src.models import Position, PositionStatus
+from src.models import Position
+from ....services.position_frame import get_position_frame
 from ....services.counterfactual import (
     RULES,
     run_all_rules,
@@ -62,7 +63,8 @@ class CounterfactualResult(BaseModel):
 
 
 def _load_closed_positions(db: Session) -> List[Position]:
-    return db.query(Position).filter(Position.status == PositionStatus.CLOSED).all()
+    # Projected rows from the shared snapshot; same field names as Position
+    return get_position_frame(db).records()
 
 
 def _to_response(result, cfg) -> CounterfactualResult:
@@ -1,14 +1,29 @@
 """
 Dashboard API endpoints
+
+Handlers are synchronous and run on the bounded DB executor via
+@blocking_endpoint (see app/core/executor.py).
+
+KPI / equity / strategy / daily aggregations read the cached columnar
+snapshot of closed positions (services/position_frame.py); the row-level
+lists (recent trades, needs review) stay as SQL queries that load only the
+columns in ROW_ITEM_COLUMNS.
+
+Responses are cached per workspace data version with ETag / 304 support
+via @cached_response (see app/core/response_cache.py).
 """
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import func, or_
 from typing import Optional
 from datetime import date, timedelta
 
+import pandas as pd
+
 from ....database import get_db, Position, PositionStatus
+from ....core.executor import blocking_endpoint
+from ....core.response_cache import cached_response
 from ....schemas import (
     DashboardKPIs,
     EquityCurveResponse,
@@ -18,13 +33,27 @@ from ....schemas import (
     StrategyBreakdownItem,
     DailyPnLItem,
 )
-from ....utils.currency import get_pnl_in_usd, get_fees_in_usd
+from ....services.position_frame import get_position_frame
 
 router = APIRouter()
 
+# Columns read when building RecentTradeItem / NeedsReviewItem.
+ROW_ITEM_COLUMNS = (
+    Position.id,
+    Position.symbol,
+    Position.close_date,
+    Position.net_pnl,
+    Position.net_pnl_pct,
+    Position.score_grade,
+    Position.direction,
+    Position.currency,
+)
+
 
 @router.get("/kpis", response_model=DashboardKPIs)
-async def get_dashboard_kpis(
+@cached_response
+@blocking_endpoint
+def get_dashboard_kpis(
     date_start: Optional[date] = Query(None, description="Start date filter"),
     date_end: Optional[date] = Query(None, description="End date filter"),
     db: Session = Depends(get_db),
@@ -34,18 +63,9 @@ async def get_dashboard_kpis(
 
     Returns total P&L, win rate, average score, trade count, etc.
     """
-    # Base query for closed positions
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    # Apply date filters
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
+    positions = get_position_frame(db).select(date_start, date_end)
 
-    positions = query.all()
-
-    if not positions:
+    if positions.empty:
         return DashboardKPIs(
             total_pnl=0.0,
             win_rate=0.0,
@@ -55,32 +75,22 @@ async def get_dashboard_kpis(
             avg_holding_days=0.0,
         )
 
-    # Calculate metrics — convert each position's P&L / fees to USD so HKD
-    # and USD positions don't get summed naïvely as if they were the same unit.
-    total_pnl = sum(get_pnl_in_usd(p) for p in positions)
-    total_fees = sum(get_fees_in_usd(p) for p in positions)
+    # Calculate metrics — P&L / fees are already USD-converted in the frame so
+    # HKD and USD positions don't get summed naïvely as if they were the same unit.
+    total_pnl = float(positions["pnl_usd"].sum())
+    total_fees = float(positions["fees_usd"].sum())
     trade_count = len(positions)
 
     # Win rate (sign of P&L is currency-agnostic, no conversion needed here)
-    winners = sum(1 for p in positions if p.net_pnl and float(p.net_pnl) > 0)
-    win_rate = (winners / trade_count * 100) if trade_count > 0 else 0.0
-
-    # Average score
-    scored_positions = [p for p in positions if p.overall_score is not None]
-    avg_score = (
-        sum(float(p.overall_score) for p in scored_positions) / len(scored_positions)
-        if scored_positions
-        else 0.0
-    )
+    winners = int(positions["is_winner"].sum())
+    win_rate = winners / trade_count * 100
 
-    # Average holding days
-    positions_with_holding = [p for p in positions if p.holding_period_days is not None]
-    avg_holding_days = (
-        sum(p.holding_period_days for p in positions_with_holding)
-        / len(positions_with_holding)
-        if positions_with_holding
-        else 0.0
-    )
+    # Average score / holding days over the positions that have one
+    scores = positions["overall_score"].dropna()
+    avg_score = float(scores.mean()) if len(scores) else 0.0
+
+    holding = positions["holding_days"].dropna()
+    avg_holding_days = float(holding.mean()) if len(holding) else 0.0
 
     return DashboardKPIs(
         total_pnl=round(total_pnl, 2),
@@ -93,7 +103,9 @@ async def get_dashboard_kpis(
 
 
 @router.get("/equity-curve", response_model=EquityCurveResponse)
-async def get_equity_curve(
+@cached_response
+@blocking_endpoint
+def get_equity_curve(
     date_start: Optional[date] = Query(None, description="Start date filter"),
     date_end: Optional[date] = Query(None, description="End date filter"),
     db: Session = Depends(get_db),
@@ -103,33 +115,14 @@ async def get_equity_curve(
 
     Returns cumulative P&L over time.
     """
-    # Query closed positions ordered by close date
-    query = (
-        db.query(Position)
-        .filter(Position.status == PositionStatus.CLOSED)
-        .filter(Position.close_date.isnot(None))
-        .order_by(Position.close_date)
-    )
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.all()
+    positions = get_position_frame(db).select(date_start, date_end)
+    positions = positions[positions["close_date"].notna()]
 
-    if not positions:
+    if positions.empty:
         return EquityCurveResponse(data=[], total_pnl=0.0)
 
     # Group by date and calculate cumulative P&L (USD-equivalent)
-    date_pnl = {}
-    for p in positions:
-        d = p.close_date
-        pnl = get_pnl_in_usd(p)
-        if d not in date_pnl:
-            date_pnl[d] = {"pnl": 0, "count": 0}
-        date_pnl[d]["pnl"] += pnl
-        date_pnl[d]["count"] += 1
+    date_pnl = positions.groupby("close_date", sort=True)["pnl_usd"].agg(["sum", "size"])
 
     # Build equity curve
     data = []
@@ -137,13 +130,13 @@ async def get_equity_curve(
     peak = 0.0
     max_drawdown = 0.0
 
-    for d in sorted(date_pnl.keys()):
-        cumulative += date_pnl[d]["pnl"]
+    for d, stats in date_pnl.iterrows():
+        cumulative += float(stats["sum"])
         data.append(
             EquityCurvePoint(
-                date=d,
+                date=d.date(),
                 cumulative_pnl=round(cumulative, 2),
-                trade_count=date_pnl[d]["count"],
+                trade_count=int(stats["size"]),
             )
         )
 
@@ -166,7 +159,9 @@ async def get_equity_curve(
 
 
 @router.get("/recent-trades", response_model=list[RecentTradeItem])
-async def get_recent_trades(
+@cached_response
+@blocking_endpoint
+def get_recent_trades(
     limit: int = Query(10, ge=1, le=50, description="Number of trades to return"),
     db: Session = Depends(get_db),
 ) -> list[RecentTradeItem]:
@@ -175,6 +170,7 @@ async def get_recent_trades(
     """
     positions = (
         db.query(Position)
+        .options(load_only(*ROW_ITEM_COLUMNS, raiseload=True))
         .filter(Position.status == PositionStatus.CLOSED)
         .order_by(Position.close_date.desc())
         .limit(limit)
@@ -197,7 +193,9 @@ async def get_recent_trades(
 
 
 @router.get("/needs-review", response_model=list[NeedsReviewItem])
-async def get_needs_review(
+@cached_response
+@blocking_endpoint
+def get_needs_review(
     limit: int = Query(10, ge=1, le=50, description="Number of trades to return"),
     db: Session = Depends(get_db),
 ) -> list[NeedsReviewItem]:
@@ -212,6 +210,7 @@ async def get_needs_review(
     # Large losses
     large_losses = (
         db.query(Position)
+        .options(load_only(*ROW_ITEM_COLUMNS, raiseload=True))
         .filter(Position.status == PositionStatus.CLOSED)
         .filter(Position.net_pnl < -500)
         .filter(Position.reviewed_at.is_(None))
@@ -223,6 +222,7 @@ async def get_needs_review(
     # Low scores
     low_scores = (
         db.query(Position)
+        .options(load_only(*ROW_ITEM_COLUMNS, raiseload=True))
         .filter(Position.status == PositionStatus.CLOSED)
         .filter(
             or_(
@@ -274,7 +274,9 @@ async def get_needs_review(
 
 
 @router.get("/strategy-breakdown", response_model=list[StrategyBreakdownItem])
-async def get_strategy_breakdown(
+@cached_response
+@blocking_endpoint
+def get_strategy_breakdown(
     date_start: Optional[date] = Query(None, description="Start date filter"),
     date_end: Optional[date] = Query(None, description="End date filter"),
     db: Session = Depends(get_db),
@@ -282,17 +284,9 @@ async def get_strategy_breakdown(
     """
     Get P&L breakdown by strategy type.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.all()
+    positions = get_position_frame(db).select(date_start, date_end)
 
     # Group by strategy
-    strategy_stats = {}
     strategy_names = {
         "trend": "Trend Following",
         "mean_reversion": "Mean Reversion",
@@ -302,31 +296,28 @@ async def get_strategy_breakdown(
         None: "Unclassified",
     }
 
-    for p in positions:
-        strategy = p.strategy_type or None
-        if strategy not in strategy_stats:
-            strategy_stats[strategy] = {
-                "count": 0,
-                "total_pnl": 0.0,
-                "winners": 0,
-            }
-        strategy_stats[strategy]["count"] += 1
-        strategy_stats[strategy]["total_pnl"] += get_pnl_in_usd(p)
-        if p.net_pnl and float(p.net_pnl) > 0:
-            strategy_stats[strategy]["winners"] += 1
+    strategies = positions["strategy_type"].where(
+        positions["strategy_type"].fillna("").astype(str) != "", None
+    )
+    grouped = positions.groupby(strategies, sort=False, dropna=False)
+    strategy_stats = pd.DataFrame({
+        "count": grouped.size(),
+        "total_pnl": grouped["pnl_usd"].sum(),
+        "winners": grouped["is_winner"].sum(),
+    })
 
     # Convert to response items
     items = []
-    for strategy, stats in strategy_stats.items():
-        win_rate = (
-            stats["winners"] / stats["count"] * 100 if stats["count"] > 0 else 0.0
-        )
+    for strategy, stats in strategy_stats.iterrows():
+        strategy = None if pd.isna(strategy) else strategy
+        count = int(stats["count"])
+        win_rate = stats["winners"] / count * 100
         items.append(
             StrategyBreakdownItem(
                 strategy=strategy or "unknown",
                 strategy_name=strategy_names.get(strategy, strategy or "Unknown"),
-                count=stats["count"],
-                total_pnl=round(stats["total_pnl"], 2),
+                count=count,
+                total_pnl=round(float(stats["total_pnl"]), 2),
                 win_rate=round(win_rate, 2),
             )
         )
@@ -337,7 +328,9 @@ async def get_strategy_breakdown(
 
 
 @router.get("/daily-pnl", response_model=list[DailyPnLItem])
-async def get_daily_pnl(
+@cached_response
+@blocking_endpoint
+def get_daily_pnl(
     days: int = Query(30, ge=7, le=365, description="Number of days"),
     db: Session = Depends(get_db),
 ) -> list[DailyPnLItem]:
@@ -346,28 +339,16 @@ async def get_daily_pnl(
     """
     start_date = date.today() - timedelta(days=days)
 
-    positions = (
-        db.query(Position)
-        .filter(Position.status == PositionStatus.CLOSED)
-        .filter(Position.close_date >= start_date)
-        .order_by(Position.close_date)
-        .all()
-    )
+    positions = get_position_frame(db).select(date_start=start_date)
 
     # Group by date (USD-equivalent)
-    date_pnl = {}
-    for p in positions:
-        d = p.close_date
-        if d not in date_pnl:
-            date_pnl[d] = {"pnl": 0.0, "count": 0}
-        date_pnl[d]["pnl"] += get_pnl_in_usd(p)
-        date_pnl[d]["count"] += 1
+    date_pnl = positions.groupby("close_date", sort=True)["pnl_usd"].agg(["sum", "size"])
 
     return [
         DailyPnLItem(
-            date=d,
-            pnl=round(stats["pnl"], 2),
-            trade_count=stats["count"],
+            date=d.date(),
+            pnl=round(float(stats["sum"]), 2),
+            trade_count=int(stats["size"]),
         )
-        for d, stats in sorted(date_pnl.items())
+        for d, stats in date_pnl.iterrows()
     ]
@@ -3,7 +3,7 @@ Market Data API endpoints
 """
 
 from fastapi import APIRouter, Depends, Query, HTTPException, Path
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import desc
 from typing import Optional
 from datetime import date, timedelta
@@ -161,6 +161,16 @@ async def get_chart_data(
     if include_trades:
         positions = (
             db.query(Position)
+            .options(load_only(
+                Position.id,
+                Position.open_date,
+                Position.open_time,
+                Position.open_price,
+                Position.close_date,
+                Position.close_time,
+                Position.close_price,
+                raiseload=True,
+            ))
             .filter(Position.symbol == symbol.upper())
             .filter(Position.open_date >= start_date)
             .all()
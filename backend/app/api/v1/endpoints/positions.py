@@ -1,14 +1,24 @@
 """
 Positions API endpoints
+
+Handlers are synchronous and run on the bounded DB executor via
+@blocking_endpoint (see app/core/executor.py).
+
+List and aggregate handlers load only the columns they read (load_only with
+raiseload, so a missing column fails loudly instead of lazy-loading per row).
+The heavy JSON columns (score details, indicator snapshots, option analysis,
+notes) are deferred on the model and undeferred only by the detail handlers.
 """
 
 from fastapi import APIRouter, Depends, Query, HTTPException, Path
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
+from sqlalchemy.orm import Session, load_only, undefer_group
+from sqlalchemy import desc, asc, func
 from typing import Optional
 from datetime import date, datetime
 
 from ....database import get_db, Position, PositionStatus, Trade, MarketData
+from ....core.executor import blocking_endpoint, workspace_key
+from ....core.response_cache import response_cache
 from ....utils.currency import get_pnl_in_usd, get_fees_in_usd, convert_to_usd
 from ....schemas import (
     PaginatedResponse,
@@ -28,9 +38,62 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', '..'))
 from src.analyzers.insight_generator import generate_insights_for_position
+from src.models.position import DETAIL_GROUP
 
 router = APIRouter()
 
+# Columns read by position_to_list_item.
+LIST_ITEM_COLUMNS = (
+    Position.id,
+    Position.symbol,
+    Position.symbol_name,
+    Position.direction,
+    Position.status,
+    Position.open_date,
+    Position.close_date,
+    Position.holding_period_days,
+    Position.open_price,
+    Position.close_price,
+    Position.quantity,
+    Position.net_pnl,
+    Position.net_pnl_pct,
+    Position.overall_score,
+    Position.score_grade,
+    Position.strategy_type,
+    Position.reviewed_at,
+    Position.currency,
+)
+
+# Columns read by get_position_summary.
+SUMMARY_COLUMNS = (
+    Position.id,
+    Position.status,
+    Position.net_pnl,
+    Position.realized_pnl,
+    Position.total_fees,
+    Position.currency,
+    Position.overall_score,
+    Position.holding_period_days,
+)
+
+# Columns read when rendering related positions.
+RELATED_COLUMNS = (
+    Position.id,
+    Position.symbol,
+    Position.symbol_name,
+    Position.direction,
+    Position.is_option,
+    Position.underlying_symbol,
+    Position.open_date,
+    Position.close_date,
+    Position.holding_period_days,
+    Position.net_pnl,
+    Position.net_pnl_pct,
+    Position.overall_score,
+    Position.score_grade,
+    Position.currency,
+)
+
 
 def position_to_list_item(p: Position) -> PositionListItem:
     """Convert Position model to PositionListItem schema."""
@@ -57,7 +120,8 @@ def position_to_list_item(p: Position) -> PositionListItem:
 
 
 @router.get("", response_model=PaginatedResponse[PositionListItem])
-async def list_positions(
+@blocking_endpoint
+def list_positions(
     # Pagination
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
@@ -84,7 +148,7 @@ async def list_positions(
     List positions with pagination and filtering.
     """
     # Base query
-    query = db.query(Position)
+    query = db.query(Position).options(load_only(*LIST_ITEM_COLUMNS, raiseload=True))
 
     # Apply filters
     if symbol:
@@ -121,8 +185,8 @@ async def list_positions(
         else:
             query = query.filter(Position.reviewed_at.is_(None))
 
-    # Get total count
-    total = query.count()
+    # Get total count (Query.count() would wrap every column in a subquery)
+    total = query.with_entities(func.count(Position.id)).scalar()
 
     # Apply sorting
     sort_column = getattr(Position, sort_by, Position.close_date)
@@ -148,7 +212,8 @@ async def list_positions(
 
 
 @router.get("/summary", response_model=PositionSummary)
-async def get_position_summary(
+@blocking_endpoint
+def get_position_summary(
     # Filters matching list_positions
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
@@ -169,7 +234,7 @@ async def get_position_summary(
     Get position summary statistics with filtering.
     """
     # Query all positions
-    query = db.query(Position)
+    query = db.query(Position).options(load_only(*SUMMARY_COLUMNS, raiseload=True))
 
     # Apply same filters as list_positions
     if symbol:
@@ -270,14 +335,20 @@ async def get_position_summary(
 
 
 @router.get("/{position_id}", response_model=PositionDetail)
-async def get_position_detail(
+@blocking_endpoint
+def get_position_detail(
     position_id: int = Path(..., description="Position ID"),
     db: Session = Depends(get_db),
 ) -> PositionDetail:
     """
     Get detailed information about a specific position.
     """
-    position = db.query(Position).filter(Position.id == position_id).first()
+    position = (
+        db.query(Position)
+        .options(undefer_group(DETAIL_GROUP))
+        .filter(Position.id == position_id)
+        .first()
+    )
 
     if not position:
         raise HTTPException(status_code=404, detail="Position not found")
@@ -422,7 +493,8 @@ def _build_news_context(position: Position) -> Optional[NewsContextSummary]:
 
 
 @router.patch("/{position_id}/review", response_model=MessageResponse)
-async def update_position_review(
+@blocking_endpoint
+def update_position_review(
     position_id: int = Path(..., description="Position ID"),
     review: PositionReviewUpdate = ...,
     db: Session = Depends(get_db),
@@ -447,6 +519,7 @@ async def update_position_review(
     position.reviewed_at = datetime.utcnow()
 
     db.commit()
+    response_cache.bump(workspace_key(db))
 
     return MessageResponse(
         message=f"Position {position_id} review updated successfully",
@@ -455,7 +528,8 @@ async def update_position_review(
 
 
 @router.get("/symbols/list", response_model=list[str])
-async def list_symbols(
+@blocking_endpoint
+def list_symbols(
     db: Session = Depends(get_db),
 ) -> list[str]:
     """
@@ -471,7 +545,8 @@ async def list_symbols(
 
 
 @router.get("/{position_id}/trades", response_model=list[dict])
-async def get_position_trades(
+@blocking_endpoint
+def get_position_trades(
     position_id: int = Path(..., description="Position ID"),
     db: Session = Depends(get_db),
 ) -> list[dict]:
@@ -506,7 +581,8 @@ async def get_position_trades(
 
 
 @router.get("/{position_id}/market-data", response_model=dict)
-async def get_position_market_data(
+@blocking_endpoint
+def get_position_market_data(
     position_id: int = Path(..., description="Position ID"),
     db: Session = Depends(get_db),
 ) -> dict:
@@ -611,7 +687,8 @@ async def get_position_market_data(
 
 
 @router.get("/{position_id}/insights", response_model=list[dict])
-async def get_position_insights(
+@blocking_endpoint
+def get_position_insights(
     position_id: int = Path(..., description="Position ID"),
     db: Session = Depends(get_db),
 ) -> list[dict]:
@@ -620,7 +697,12 @@ async def get_position_insights(
 
     Analyzes entry/exit timing, risk management, and provides suggestions.
     """
-    position = db.query(Position).filter(Position.id == position_id).first()
+    position = (
+        db.query(Position)
+        .options(undefer_group(DETAIL_GROUP))
+        .filter(Position.id == position_id)
+        .first()
+    )
     if not position:
         raise HTTPException(status_code=404, detail="Position not found")
 
@@ -652,6 +734,7 @@ async def get_position_insights(
     # Get similar positions (same symbol)
     similar_positions = (
         db.query(Position)
+        .options(load_only(Position.id, Position.net_pnl, Position.holding_period_days, raiseload=True))
         .filter(Position.symbol == position.symbol)
         .filter(Position.id != position_id)
         .filter(Position.status == PositionStatus.CLOSED)
@@ -680,7 +763,8 @@ async def get_position_insights(
 
 
 @router.get("/{position_id}/related", response_model=list[dict])
-async def get_related_positions(
+@blocking_endpoint
+def get_related_positions(
     position_id: int = Path(..., description="Position ID"),
     db: Session = Depends(get_db),
 ) -> list[dict]:
@@ -703,6 +787,7 @@ async def get_related_positions(
         # 1. Stock positions with the same symbol as underlying
         stock_positions = (
             db.query(Position)
+            .options(load_only(*RELATED_COLUMNS, raiseload=True))
             .filter(Position.symbol == position.underlying_symbol)
             .filter(Position.id != position_id)
             .filter(Position.status == PositionStatus.CLOSED)
@@ -714,6 +799,7 @@ async def get_related_positions(
         # 2. Other options with the same underlying
         other_options = (
             db.query(Position)
+            .options(load_only(*RELATED_COLUMNS, raiseload=True))
             .filter(Position.underlying_symbol == position.underlying_symbol)
             .filter(Position.is_option == True)
             .filter(Position.id != position_id)
@@ -726,6 +812,7 @@ async def get_related_positions(
         # For stocks: find option positions using this stock as underlying
         option_positions = (
             db.query(Position)
+            .options(load_only(*RELATED_COLUMNS, raiseload=True))
             .filter(Position.underlying_symbol == position.symbol)
             .filter(Position.is_option == True)
             .filter(Position.id != position_id)
@@ -1,15 +1,29 @@
 """
 Statistics API endpoints
+
+Handlers are synchronous and run on the bounded DB executor via
+@blocking_endpoint (see app/core/executor.py).
+
+Aggregations read the workspace's cached columnar snapshot of closed
+positions (services/position_frame.py) instead of loading Position rows
+per request; P&L and fees are already converted to USD in the snapshot.
+
+Responses are cached per workspace data version with ETag / 304 support
+via @cached_response (see app/core/response_cache.py).
 """
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import date
-from collections import defaultdict
 import math
 
+import numpy as np
+import pandas as pd
+
 from ....database import get_db, Position, PositionStatus
+from ....core.executor import blocking_endpoint
+from ....core.response_cache import cached_response
 from ....schemas import (
     PerformanceMetrics,
     SymbolBreakdownItem,
@@ -34,68 +48,37 @@ from ....schemas import (
     AssetTypeBreakdownItem,
 )
 from ....services.insight_engine import InsightEngine
-
-router = APIRouter()
-
-# Currency helpers — moved to backend.app.utils.currency so dashboard /
-# positions / insights endpoints share the same conversion (previously each
-# endpoint had its own copy or none at all, producing inconsistent totals).
-from ....utils.currency import (  # noqa: E402
-    EXCHANGE_RATES,
-    convert_to_usd,
-    get_pnl_in_usd,
+from ....services.position_frame import (
+    daily_pnl,
+    drawdown_curve,
+    drawdown_stats,
+    get_position_frame,
+    group_summary,
+    longest_runs,
+    sharpe_ratio,
 )
 
-
-def _daily_pnl_from_positions(positions: list[Position]) -> dict[date, float]:
-    daily_pnl = defaultdict(float)
-    for p in positions:
-        if p.close_date and p.net_pnl is not None:
-            daily_pnl[p.close_date] += get_pnl_in_usd(p)
-    return dict(daily_pnl)
-
-
-def _calculate_sharpe_ratio(
-    positions: list[Position],
-    risk_free_rate: float = 0.05,
-) -> Optional[float]:
-    daily_pnl = _daily_pnl_from_positions(positions)
-    returns = list(daily_pnl.values())
-    if len(returns) <= 1:
-        return None
-
-    avg_return = sum(returns) / len(returns)
-    variance = sum((r - avg_return) ** 2 for r in returns) / (len(returns) - 1)
-    daily_volatility = math.sqrt(variance)
-    if daily_volatility <= 0:
-        return None
-
-    daily_risk_free = risk_free_rate / 252
-    return ((avg_return - daily_risk_free) / daily_volatility) * math.sqrt(252)
+router = APIRouter()
 
 
-def _calculate_drawdown_stats(positions: list[Position]) -> tuple[float, Optional[float]]:
-    daily_pnl = _daily_pnl_from_positions(positions)
-    cumulative = 0.0
-    peak = 0.0
-    max_drawdown = 0.0
+def _closed_positions(
+    db: Session,
+    date_start: Optional[date] = None,
+    date_end: Optional[date] = None,
+    chronological: bool = False,
+) -> pd.DataFrame:
+    return get_position_frame(db).select(date_start, date_end, chronological=chronological)
 
-    for close_date in sorted(daily_pnl.keys()):
-        cumulative += daily_pnl[close_date]
-        peak = max(peak, cumulative)
-        max_drawdown = max(max_drawdown, peak - cumulative)
 
-    if peak > 0 and peak >= max_drawdown:
-        return max_drawdown, min(max_drawdown / peak * 100, 100.0)
+def _or_default(values: pd.Series, default: str) -> pd.Series:
+    """`value or default` over a text column (None and "" both fall back)"""
+    return values.where(values.fillna("").astype(str) != "", default)
 
-    return max_drawdown, None
 
-
-def _get_realized_pnl_before_fees_usd(position: Position) -> float:
-    currency = position.currency or "USD"
-    if position.realized_pnl is not None:
-        return convert_to_usd(float(position.realized_pnl), currency)
-    return get_pnl_in_usd(position) + convert_to_usd(float(position.total_fees or 0), currency)
+def _mean(values: pd.Series) -> Optional[float]:
+    """Mean of the non-null values, None when there are none"""
+    values = values.dropna()
+    return float(values.mean()) if len(values) else None
 
 
 def _grade_sort_key(grade: str) -> tuple[int, int, int, str]:
@@ -117,7 +100,9 @@ def _grade_sort_key(grade: str) -> tuple[int, int, int, str]:
 
 
 @router.get("/date-range")
-async def get_data_date_range(
+@cached_response
+@blocking_endpoint
+def get_data_date_range(
     db: Session = Depends(get_db),
 ):
     """
@@ -140,7 +125,9 @@ async def get_data_date_range(
 
 
 @router.get("/performance", response_model=PerformanceMetrics)
-async def get_performance_metrics(
+@cached_response
+@blocking_endpoint
+def get_performance_metrics(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     db: Session = Depends(get_db),
@@ -148,16 +135,9 @@ async def get_performance_metrics(
     """
     Get comprehensive performance metrics.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
+    positions = _closed_positions(db, date_start, date_end, chronological=True)
 
-    positions = query.order_by(Position.close_date).all()
-
-    if not positions:
+    if positions.empty:
         return PerformanceMetrics(
             total_pnl=0.0,
             total_trades=0,
@@ -172,68 +152,39 @@ async def get_performance_metrics(
         )
 
     # Basic metrics (with currency conversion to USD)
-    total_pnl = sum(get_pnl_in_usd(p) for p in positions)
-    total_fees = sum(convert_to_usd(float(p.total_fees or 0), p.currency or "USD") for p in positions)
+    total_pnl = float(positions["pnl_usd"].sum())
+    total_fees = float(positions["fees_usd"].sum())
     total_trades = len(positions)
 
     # Winners and losers (based on original currency PnL sign)
-    winners = [p for p in positions if p.net_pnl and float(p.net_pnl) > 0]
-    losers = [p for p in positions if p.net_pnl and float(p.net_pnl) <= 0]
+    winners = positions[positions["is_winner"]]
+    losers = positions[positions["is_loser"]]
 
-    win_rate = len(winners) / total_trades * 100 if total_trades > 0 else 0.0
+    win_rate = len(winners) / total_trades * 100
 
     # Average metrics (converted to USD)
-    avg_win = sum(get_pnl_in_usd(p) for p in winners) / len(winners) if winners else 0.0
-    avg_loss = sum(get_pnl_in_usd(p) for p in losers) / len(losers) if losers else 0.0
-    avg_pnl = total_pnl / total_trades if total_trades > 0 else 0.0
+    avg_win = _mean(winners["pnl_usd"]) or 0.0
+    avg_loss = _mean(losers["pnl_usd"]) or 0.0
+    avg_pnl = total_pnl / total_trades
 
     # Profit factor (converted to USD)
-    gross_profit = sum(get_pnl_in_usd(p) for p in winners)
-    gross_loss = abs(sum(get_pnl_in_usd(p) for p in losers))
+    gross_profit = float(winners["pnl_usd"].sum())
+    gross_loss = abs(float(losers["pnl_usd"].sum()))
     profit_factor = gross_profit / gross_loss if gross_loss > 0 else None
 
-    max_drawdown, max_drawdown_pct = _calculate_drawdown_stats(positions)
-    sharpe_ratio = _calculate_sharpe_ratio(positions)
-
-    # Consecutive wins/losses
-    max_consecutive_wins = 0
-    max_consecutive_losses = 0
-    current_wins = 0
-    current_losses = 0
+    daily = daily_pnl(positions)
+    max_drawdown, max_drawdown_pct = drawdown_stats(daily)
+    sharpe = sharpe_ratio(daily)
 
-    for p in positions:
-        if p.net_pnl and float(p.net_pnl) > 0:
-            current_wins += 1
-            current_losses = 0
-            max_consecutive_wins = max(max_consecutive_wins, current_wins)
-        else:
-            current_losses += 1
-            current_wins = 0
-            max_consecutive_losses = max(max_consecutive_losses, current_losses)
+    # Consecutive wins/losses (anything that is not a winner breaks a winning streak)
+    max_consecutive_wins, max_consecutive_losses = longest_runs(positions["is_winner"].to_numpy())
 
     # Holding period
-    with_holding = [p for p in positions if p.holding_period_days is not None]
-    avg_holding_days = (
-        sum(p.holding_period_days for p in with_holding) / len(with_holding)
-        if with_holding
-        else 0.0
-    )
+    avg_holding_days = _mean(positions["holding_days"]) or 0.0
+    avg_winner_holding = _mean(winners["holding_days"])
+    avg_loser_holding = _mean(losers["holding_days"])
 
-    winners_with_holding = [p for p in winners if p.holding_period_days is not None]
-    losers_with_holding = [p for p in losers if p.holding_period_days is not None]
-
-    avg_winner_holding = (
-        sum(p.holding_period_days for p in winners_with_holding) / len(winners_with_holding)
-        if winners_with_holding
-        else None
-    )
-    avg_loser_holding = (
-        sum(p.holding_period_days for p in losers_with_holding) / len(losers_with_holding)
-        if losers_with_holding
-        else None
-    )
-
-    realized_pnl_before_fees = sum(_get_realized_pnl_before_fees_usd(p) for p in positions)
+    realized_pnl_before_fees = float(positions["gross_pnl_usd"].sum())
     fees_pct = (
         total_fees / abs(realized_pnl_before_fees) * 100
         if realized_pnl_before_fees != 0
@@ -252,7 +203,7 @@ async def get_performance_metrics(
         profit_factor=round(profit_factor, 2) if profit_factor else None,
         max_drawdown=round(max_drawdown, 2) if max_drawdown > 0 else None,
         max_drawdown_pct=round(max_drawdown_pct, 2) if max_drawdown_pct else None,
-        sharpe_ratio=round(sharpe_ratio, 2) if sharpe_ratio else None,
+        sharpe_ratio=round(sharpe, 2) if sharpe else None,
         max_consecutive_wins=max_consecutive_wins,
         max_consecutive_losses=max_consecutive_losses,
         total_fees=round(total_fees, 2),
@@ -264,7 +215,9 @@ async def get_performance_metrics(
 
 
 @router.get("/by-symbol", response_model=list[SymbolBreakdownItem])
-async def get_symbol_breakdown(
+@cached_response
+@blocking_endpoint
+def get_symbol_breakdown(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     limit: int = Query(20, ge=1, le=100, description="Number of symbols"),
@@ -273,44 +226,19 @@ async def get_symbol_breakdown(
     """
     Get P&L breakdown by symbol.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.all()
-
-    # Group by symbol
-    symbol_stats = defaultdict(lambda: {
-        "name": None,
-        "count": 0,
-        "total_pnl": 0.0,
-        "winners": 0,
-        "total_holding_days": 0,
-        "holding_count": 0,
-    })
+    positions = _closed_positions(db, date_start, date_end)
 
-    for p in positions:
-        stats = symbol_stats[p.symbol]
-        if p.symbol_name and not stats["name"]:
-            stats["name"] = p.symbol_name
-        stats["count"] += 1
-        stats["total_pnl"] += get_pnl_in_usd(p)  # Convert to USD
-        if p.net_pnl and float(p.net_pnl) > 0:
-            stats["winners"] += 1
-        if p.holding_period_days:
-            stats["total_holding_days"] += p.holding_period_days
-            stats["holding_count"] += 1
+    # Group by symbol; display name is the first non-empty symbol_name seen
+    summary = group_summary(positions, "symbol")
+    named = positions[positions["symbol_name"].fillna("").astype(str) != ""]
+    names = named.groupby("symbol", observed=True)["symbol_name"].first()
 
     # Convert to response items
     items = []
-    for symbol, stats in symbol_stats.items():
-        win_rate = stats["winners"] / stats["count"] * 100 if stats["count"] > 0 else 0.0
-        avg_pnl = stats["total_pnl"] / stats["count"] if stats["count"] > 0 else 0.0
+    for symbol, stats in summary.iterrows():
+        count = int(stats["count"])
         avg_holding = (
-            stats["total_holding_days"] / stats["holding_count"]
+            stats["holding_total"] / stats["holding_count"]
             if stats["holding_count"] > 0
             else 0.0
         )
@@ -318,12 +246,12 @@ async def get_symbol_breakdown(
         items.append(
             SymbolBreakdownItem(
                 symbol=symbol,
-                symbol_name=stats["name"],
-                count=stats["count"],
-                total_pnl=round(stats["total_pnl"], 2),
-                win_rate=round(win_rate, 2),
-                avg_pnl=round(avg_pnl, 2),
-                avg_holding_days=round(avg_holding, 1),
+                symbol_name=names.get(symbol),
+                count=count,
+                total_pnl=round(float(stats["total_pnl"]), 2),
+                win_rate=round(stats["winners"] / count * 100, 2),
+                avg_pnl=round(float(stats["total_pnl"]) / count, 2),
+                avg_holding_days=round(float(avg_holding), 1),
             )
         )
 
@@ -333,7 +261,9 @@ async def get_symbol_breakdown(
 
 
 @router.get("/by-grade", response_model=list[GradeBreakdownItem])
-async def get_grade_breakdown(
+@cached_response
+@blocking_endpoint
+def get_grade_breakdown(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     db: Session = Depends(get_db),
@@ -341,39 +271,24 @@ async def get_grade_breakdown(
     """
     Get P&L breakdown by score grade.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.all()
+    positions = _closed_positions(db, date_start, date_end)
 
     # Group by grade
-    grade_stats = defaultdict(lambda: {"count": 0, "total_pnl": 0.0, "winners": 0})
-
-    for p in positions:
-        grade = p.score_grade or "N/A"
-        grade_stats[grade]["count"] += 1
-        grade_stats[grade]["total_pnl"] += get_pnl_in_usd(p)  # Convert to USD
-        if p.net_pnl and float(p.net_pnl) > 0:
-            grade_stats[grade]["winners"] += 1
+    summary = group_summary(positions, _or_default(positions["score_grade"], "N/A"))
 
     items = []
 
-    for grade in sorted(grade_stats.keys(), key=_grade_sort_key):
-        stats = grade_stats[grade]
-        win_rate = stats["winners"] / stats["count"] * 100 if stats["count"] > 0 else 0.0
-        avg_pnl = stats["total_pnl"] / stats["count"] if stats["count"] > 0 else 0.0
+    for grade in sorted(summary.index, key=_grade_sort_key):
+        stats = summary.loc[grade]
+        count = int(stats["count"])
 
         items.append(
             GradeBreakdownItem(
                 grade=grade,
-                count=stats["count"],
-                total_pnl=round(stats["total_pnl"], 2),
-                win_rate=round(win_rate, 2),
-                avg_pnl=round(avg_pnl, 2),
+                count=count,
+                total_pnl=round(float(stats["total_pnl"]), 2),
+                win_rate=round(stats["winners"] / count * 100, 2),
+                avg_pnl=round(float(stats["total_pnl"]) / count, 2),
             )
         )
 
@@ -381,7 +296,9 @@ async def get_grade_breakdown(
 
 
 @router.get("/by-direction", response_model=list[DirectionBreakdownItem])
-async def get_direction_breakdown(
+@cached_response
+@blocking_endpoint
+def get_direction_breakdown(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     db: Session = Depends(get_db),
@@ -389,38 +306,23 @@ async def get_direction_breakdown(
     """
     Get P&L breakdown by direction (long/short).
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.all()
+    positions = _closed_positions(db, date_start, date_end)
 
     # Group by direction
-    direction_stats = defaultdict(lambda: {"count": 0, "total_pnl": 0.0, "winners": 0})
-
-    for p in positions:
-        direction = p.direction or "unknown"
-        direction_stats[direction]["count"] += 1
-        direction_stats[direction]["total_pnl"] += get_pnl_in_usd(p)  # Convert to USD
-        if p.net_pnl and float(p.net_pnl) > 0:
-            direction_stats[direction]["winners"] += 1
+    summary = group_summary(positions, _or_default(positions["direction"], "unknown"))
 
     # Convert to response items
     items = []
-    for direction, stats in direction_stats.items():
-        win_rate = stats["winners"] / stats["count"] * 100 if stats["count"] > 0 else 0.0
-        avg_pnl = stats["total_pnl"] / stats["count"] if stats["count"] > 0 else 0.0
+    for direction, stats in summary.iterrows():
+        count = int(stats["count"])
 
         items.append(
             DirectionBreakdownItem(
                 direction=direction,
-                count=stats["count"],
-                total_pnl=round(stats["total_pnl"], 2),
-                win_rate=round(win_rate, 2),
-                avg_pnl=round(avg_pnl, 2),
+                count=count,
+                total_pnl=round(float(stats["total_pnl"]), 2),
+                win_rate=round(stats["winners"] / count * 100, 2),
+                avg_pnl=round(float(stats["total_pnl"]) / count, 2),
             )
         )
 
@@ -428,7 +330,9 @@ async def get_direction_breakdown(
 
 
 @router.get("/by-holding-period", response_model=list[HoldingPeriodBreakdownItem])
-async def get_holding_period_breakdown(
+@cached_response
+@blocking_endpoint
+def get_holding_period_breakdown(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     db: Session = Depends(get_db),
@@ -436,14 +340,7 @@ async def get_holding_period_breakdown(
     """
     Get P&L breakdown by holding period.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.all()
+    positions = _closed_positions(db, date_start, date_end)
 
     # Define holding period buckets
     buckets = [
@@ -456,39 +353,25 @@ async def get_holding_period_breakdown(
         ("3+ Months", 91, 9999),
     ]
 
-    # Group by bucket
-    bucket_stats = {
-        label: {"count": 0, "total_pnl": 0.0, "winners": 0}
-        for label, _, _ in buckets
-    }
-
-    for p in positions:
-        days = p.holding_period_days or 0
-        for label, min_d, max_d in buckets:
-            if min_d <= days <= max_d:
-                bucket_stats[label]["count"] += 1
-                bucket_stats[label]["total_pnl"] += get_pnl_in_usd(p)  # Convert to USD
-                if p.net_pnl and float(p.net_pnl) > 0:
-                    bucket_stats[label]["winners"] += 1
-                break
+    days = positions["holding_days"].fillna(0)
 
     # Convert to response items
     items = []
     for label, min_d, max_d in buckets:
-        stats = bucket_stats[label]
-        if stats["count"] > 0:
-            win_rate = stats["winners"] / stats["count"] * 100
-            avg_pnl = stats["total_pnl"] / stats["count"]
+        in_bucket = positions[(days >= min_d) & (days <= max_d)]
+        count = len(in_bucket)
+        if count > 0:
+            total_pnl = float(in_bucket["pnl_usd"].sum())
 
             items.append(
                 HoldingPeriodBreakdownItem(
                     period_label=label,
                     min_days=min_d,
                     max_days=max_d,
-                    count=stats["count"],
-                    total_pnl=round(stats["total_pnl"], 2),
-                    win_rate=round(win_rate, 2),
-                    avg_pnl=round(avg_pnl, 2),
+                    count=count,
+                    total_pnl=round(total_pnl, 2),
+                    win_rate=round(int(in_bucket["is_winner"].sum()) / count * 100, 2),
+                    avg_pnl=round(total_pnl / count, 2),
                 )
             )
 
@@ -496,84 +379,67 @@ async def get_holding_period_breakdown(
 
 
 @router.get("/calendar-heatmap", response_model=list[CalendarHeatmapItem])
-async def get_calendar_heatmap(
+@cached_response
+@blocking_endpoint
+def get_calendar_heatmap(
     year: int = Query(..., description="Year to display"),
     db: Session = Depends(get_db),
 ) -> list[CalendarHeatmapItem]:
     """
     Get calendar heatmap data for a specific year.
     """
-    start_date = date(year, 1, 1)
-    end_date = date(year, 12, 31)
-
-    positions = (
-        db.query(Position)
-        .filter(Position.status == PositionStatus.CLOSED)
-        .filter(Position.close_date >= start_date)
-        .filter(Position.close_date <= end_date)
-        .all()
-    )
+    positions = _closed_positions(db, date(year, 1, 1), date(year, 12, 31))
 
     # Group by date
-    date_stats = defaultdict(lambda: {"pnl": 0.0, "count": 0})
-
-    for p in positions:
-        d = p.close_date
-        date_stats[d]["pnl"] += get_pnl_in_usd(p)  # Convert to USD
-        date_stats[d]["count"] += 1
+    by_date = positions.groupby("close_date", sort=True)["pnl_usd"].agg(["sum", "size"])
 
     return [
         CalendarHeatmapItem(
-            date=d,
-            pnl=round(stats["pnl"], 2),
-            trade_count=stats["count"],
-            is_winner=stats["pnl"] > 0,
+            date=d.date(),
+            pnl=round(float(stats["sum"]), 2),
+            trade_count=int(stats["size"]),
+            is_winner=bool(stats["sum"] > 0),
         )
-        for d, stats in sorted(date_stats.items())
+        for d, stats in by_date.iterrows()
     ]
 
 
 @router.get("/monthly-pnl", response_model=list[MonthlyPnLItem])
-async def get_monthly_pnl(
+@cached_response
+@blocking_endpoint
+def get_monthly_pnl(
     year: Optional[int] = Query(None, description="Filter by year"),
     db: Session = Depends(get_db),
 ) -> list[MonthlyPnLItem]:
     """
     Get monthly P&L summary.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
     if year:
-        start_date = date(year, 1, 1)
-        end_date = date(year, 12, 31)
-        query = query.filter(Position.close_date >= start_date)
-        query = query.filter(Position.close_date <= end_date)
-
-    positions = query.all()
+        positions = _closed_positions(db, date(year, 1, 1), date(year, 12, 31))
+    else:
+        positions = _closed_positions(db)
 
     # Group by year-month
-    month_stats = defaultdict(lambda: {"pnl": 0.0, "count": 0, "winners": 0})
-
-    for p in positions:
-        if p.close_date:
-            key = (p.close_date.year, p.close_date.month)
-            month_stats[key]["pnl"] += get_pnl_in_usd(p)  # Convert to USD
-            month_stats[key]["count"] += 1
-            if p.net_pnl and float(p.net_pnl) > 0:
-                month_stats[key]["winners"] += 1
+    positions = positions[positions["close_date"].notna()]
+    close_dates = positions["close_date"].dt
+    by_month = positions.groupby([close_dates.year, close_dates.month], sort=True).agg(
+        pnl=("pnl_usd", "sum"),
+        count=("pnl_usd", "size"),
+        winners=("is_winner", "sum"),
+    )
 
     # Convert to response items
     items = []
-    for (y, m), stats in sorted(month_stats.items()):
-        win_rate = stats["winners"] / stats["count"] * 100 if stats["count"] > 0 else 0.0
+    for (y, m), stats in by_month.iterrows():
+        count = int(stats["count"])
 
         items.append(
             MonthlyPnLItem(
-                year=y,
-                month=m,
-                pnl=round(stats["pnl"], 2),
-                trade_count=stats["count"],
-                win_rate=round(win_rate, 2),
+                year=int(y),
+                month=int(m),
+                pnl=round(float(stats["pnl"]), 2),
+                trade_count=count,
+                win_rate=round(stats["winners"] / count * 100, 2),
             )
         )
 
@@ -581,7 +447,9 @@ async def get_monthly_pnl(
 
 
 @router.get("/risk-metrics", response_model=RiskMetrics)
-async def get_risk_metrics(
+@cached_response
+@blocking_endpoint
+def get_risk_metrics(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     risk_free_rate: float = Query(0.05, description="Annual risk-free rate (default 5%)"),
@@ -590,16 +458,9 @@ async def get_risk_metrics(
     """
     Get comprehensive risk metrics including Sharpe ratio, Sortino ratio, and drawdown analysis.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
+    positions = _closed_positions(db, date_start, date_end)
 
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.order_by(Position.close_date).all()
-
-    if not positions:
+    if positions.empty:
         return RiskMetrics(
             max_drawdown=0.0,
             max_drawdown_pct=None,
@@ -607,26 +468,26 @@ async def get_risk_metrics(
             sortino_ratio=None,
         )
 
-    daily_pnl = _daily_pnl_from_positions(positions)
+    daily = daily_pnl(positions)
 
-    returns = list(daily_pnl.values())
-    dates = sorted(daily_pnl.keys())
+    returns = daily.to_numpy(dtype=float)
+    dates = [d.date() for d in daily.index]
 
     # Basic metrics
-    total_pnl = sum(returns)
-    avg_return = sum(returns) / len(returns) if returns else 0
+    total_pnl = float(returns.sum())
+    avg_return = float(returns.mean()) if len(returns) else 0
 
     # Winners and losers
-    winners = [p for p in positions if p.net_pnl and float(p.net_pnl) > 0]
-    losers = [p for p in positions if p.net_pnl and float(p.net_pnl) <= 0]
-    win_rate = len(winners) / len(positions) if positions else 0
+    winners = positions[positions["is_winner"]]
+    losers = positions[positions["is_loser"]]
+    win_rate = len(winners) / len(positions)
 
-    avg_win = sum(get_pnl_in_usd(p) for p in winners) / len(winners) if winners else 0
-    avg_loss = sum(get_pnl_in_usd(p) for p in losers) / len(losers) if losers else 0
+    avg_win = _mean(winners["pnl_usd"]) or 0
+    avg_loss = _mean(losers["pnl_usd"]) or 0
 
     # Profit factor (converted to USD)
-    gross_profit = sum(get_pnl_in_usd(p) for p in winners)
-    gross_loss = abs(sum(get_pnl_in_usd(p) for p in losers))
+    gross_profit = float(winners["pnl_usd"].sum())
+    gross_loss = abs(float(losers["pnl_usd"].sum()))
     profit_factor = gross_profit / gross_loss if gross_loss > 0 else None
 
     # Payoff ratio
@@ -638,21 +499,19 @@ async def get_risk_metrics(
 
     # Volatility
     if len(returns) > 1:
-        mean_return = sum(returns) / len(returns)
-        variance = sum((r - mean_return) ** 2 for r in returns) / (len(returns) - 1)
-        daily_volatility = math.sqrt(variance)
+        daily_volatility = float(np.std(returns, ddof=1))
         annualized_volatility = daily_volatility * math.sqrt(252)
     else:
         daily_volatility = None
         annualized_volatility = None
 
-    sharpe_ratio = _calculate_sharpe_ratio(positions, risk_free_rate)
+    sharpe = sharpe_ratio(daily, risk_free_rate)
     daily_risk_free = risk_free_rate / 252
 
     # Sortino Ratio (only considers downside volatility)
-    negative_returns = [r for r in returns if r < 0]
+    negative_returns = returns[returns < 0]
     if len(negative_returns) > 1:
-        downside_variance = sum(r ** 2 for r in negative_returns) / (len(negative_returns) - 1)
+        downside_variance = float(np.sum(negative_returns ** 2)) / (len(negative_returns) - 1)
         downside_volatility = math.sqrt(downside_variance)
         if downside_volatility > 0:
             sortino_ratio = ((avg_return - daily_risk_free) / downside_volatility) * math.sqrt(252)
@@ -661,18 +520,17 @@ async def get_risk_metrics(
     else:
         sortino_ratio = None
 
-    # Drawdown analysis
-    cumulative = 0.0
+    # Drawdown analysis (walks the per-day curve to split drawdown episodes)
+    cumulative_curve, peak_curve = drawdown_curve(daily)
     peak = 0.0
     max_drawdown = 0.0
     drawdowns = []
     dd_start = None
     current_dd = 0.0
 
-    for d in dates:
-        cumulative += daily_pnl[d]
-        if cumulative > peak:
-            peak = cumulative
+    for d, cumulative, day_peak in zip(dates, cumulative_curve.tolist(), peak_curve.tolist()):
+        if day_peak > peak:
+            peak = day_peak
             if dd_start is not None:
                 drawdowns.append(current_dd)
                 dd_start = None
@@ -684,9 +542,10 @@ async def get_risk_metrics(
                 max_drawdown = current_dd
 
     # Current drawdown
-    current_drawdown = current_dd if cumulative < peak else 0.0
+    final_cumulative = float(cumulative_curve[-1]) if len(cumulative_curve) else 0.0
+    current_drawdown = current_dd if final_cumulative < peak else 0.0
 
-    _, max_drawdown_pct = _calculate_drawdown_stats(positions)
+    _, max_drawdown_pct = drawdown_stats(daily)
 
     # Average drawdown
     all_drawdowns = drawdowns + [current_dd] if current_dd > 0 else drawdowns
@@ -705,11 +564,11 @@ async def get_risk_metrics(
 
     # Value at Risk (95%)
     if len(returns) >= 20:
-        sorted_returns = sorted(returns)
+        sorted_returns = np.sort(returns)
         var_index = int(len(sorted_returns) * 0.05)
-        var_95 = abs(sorted_returns[var_index])
+        var_95 = abs(float(sorted_returns[var_index]))
         tail_returns = sorted_returns[:var_index + 1]
-        expected_shortfall = abs(sum(tail_returns) / len(tail_returns)) if tail_returns else None
+        expected_shortfall = abs(float(tail_returns.sum()) / len(tail_returns))
     else:
         var_95 = None
         expected_shortfall = None
@@ -719,7 +578,7 @@ async def get_risk_metrics(
         max_drawdown_pct=round(max_drawdown_pct, 2) if max_drawdown_pct else None,
         avg_drawdown=round(avg_drawdown, 2) if avg_drawdown else None,
         current_drawdown=round(current_drawdown, 2) if current_drawdown > 0 else None,
-        sharpe_ratio=round(sharpe_ratio, 2) if sharpe_ratio else None,
+        sharpe_ratio=round(sharpe, 2) if sharpe else None,
         sortino_ratio=round(sortino_ratio, 2) if sortino_ratio else None,
         calmar_ratio=round(calmar_ratio, 2) if calmar_ratio else None,
         var_95=round(var_95, 2) if var_95 else None,
@@ -733,7 +592,9 @@ async def get_risk_metrics(
 
 
 @router.get("/drawdowns", response_model=list[DrawdownItem])
-async def get_drawdown_periods(
+@cached_response
+@blocking_endpoint
+def get_drawdown_periods(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     min_drawdown: float = Query(0, description="Minimum drawdown to include"),
@@ -742,31 +603,21 @@ async def get_drawdown_periods(
     """
     Get list of drawdown periods with details.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
+    positions = _closed_positions(db, date_start, date_end)
 
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.order_by(Position.close_date).all()
-
-    if not positions:
+    if positions.empty:
         return []
 
     # Calculate daily P&L
-    daily_pnl = defaultdict(float)
-    for p in positions:
-        if p.close_date and p.net_pnl:
-            daily_pnl[p.close_date] += get_pnl_in_usd(p)
-
-    dates = sorted(daily_pnl.keys())
-    if not dates:
+    daily = daily_pnl(positions, skip_zero=True)
+    if daily.empty:
         return []
 
+    dates = [d.date() for d in daily.index]
+    cumulative_curve = np.cumsum(daily.to_numpy(dtype=float)).tolist()
+
     # Track drawdown periods
     drawdown_periods = []
-    cumulative = 0.0
     peak = 0.0
     peak_date = dates[0]
 
@@ -774,9 +625,7 @@ async def get_drawdown_periods(
     dd_trough = 0.0
     dd_trough_date = None
 
-    for d in dates:
-        cumulative += daily_pnl[d]
-
+    for d, cumulative in zip(dates, cumulative_curve):
         if cumulative > peak:
             if dd_start is not None and dd_trough > min_drawdown:
                 duration = (d - dd_start).days
@@ -823,7 +672,9 @@ async def get_drawdown_periods(
 
 
 @router.get("/insights", response_model=list[TradingInsight])
-async def get_trading_insights(
+@cached_response
+@blocking_endpoint
+def get_trading_insights(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     limit: int = Query(5, ge=1, le=20, description="Maximum number of insights"),
@@ -858,7 +709,9 @@ async def get_trading_insights(
 
 
 @router.get("/equity-drawdown", response_model=list[EquityDrawdownItem])
-async def get_equity_drawdown(
+@cached_response
+@blocking_endpoint
+def get_equity_drawdown(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     db: Session = Depends(get_db),
@@ -867,49 +720,35 @@ async def get_equity_drawdown(
     Get equity curve with drawdown data for combo chart visualization.
     Returns daily cumulative P&L and corresponding drawdown values.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.order_by(Position.close_date).all()
+    positions = _closed_positions(db, date_start, date_end)
 
-    if not positions:
+    if positions.empty:
         return []
 
-    # Aggregate daily P&L
-    daily_pnl = defaultdict(float)
-    for p in positions:
-        if p.close_date and p.net_pnl:
-            daily_pnl[p.close_date] += get_pnl_in_usd(p)
+    # Aggregate daily P&L, then cumulative P&L and drawdown
+    daily = daily_pnl(positions, skip_zero=True)
+    cumulative, peak = drawdown_curve(daily)
+    drawdown = peak - cumulative
 
-    # Calculate cumulative P&L and drawdown
     items = []
-    cumulative = 0.0
-    peak = 0.0
-
-    for d in sorted(daily_pnl.keys()):
-        cumulative += daily_pnl[d]
-        if cumulative > peak:
-            peak = cumulative
-        drawdown = peak - cumulative
-        drawdown_pct = (drawdown / peak * 100) if peak > 0 else None
+    for d, cum, pk, dd in zip(daily.index, cumulative.tolist(), peak.tolist(), drawdown.tolist()):
+        drawdown_pct = (dd / pk * 100) if pk > 0 else None
 
         items.append(EquityDrawdownItem(
-            date=d,
-            cumulative_pnl=round(cumulative, 2),
-            drawdown=round(drawdown, 2),
+            date=d.date(),
+            cumulative_pnl=round(cum, 2),
+            drawdown=round(dd, 2),
             drawdown_pct=round(drawdown_pct, 2) if drawdown_pct is not None else None,
-            peak=round(peak, 2),
+            peak=round(pk, 2),
         ))
 
     return items
 
 
 @router.get("/pnl-distribution", response_model=list[PnLDistributionBin])
-async def get_pnl_distribution(
+@cached_response
+@blocking_endpoint
+def get_pnl_distribution(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     bin_count: int = Query(20, ge=5, le=50, description="Number of bins"),
@@ -919,26 +758,16 @@ async def get_pnl_distribution(
     Get P&L distribution for histogram visualization.
     Returns binned P&L values showing the distribution of trade outcomes.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.all()
-
-    if not positions:
-        return []
+    positions = _closed_positions(db, date_start, date_end)
 
     # Get all P&L values
-    pnl_values = [get_pnl_in_usd(p) for p in positions if p.net_pnl is not None]
+    pnl_values = positions.loc[positions["net_pnl"].notna(), "pnl_usd"].to_numpy()
 
-    if not pnl_values:
+    if len(pnl_values) == 0:
         return []
 
-    min_pnl = min(pnl_values)
-    max_pnl = max(pnl_values)
+    min_pnl = float(pnl_values.min())
+    max_pnl = float(pnl_values.max())
 
     # Create bins
     bin_size = (max_pnl - min_pnl) / bin_count if max_pnl != min_pnl else 1
@@ -947,11 +776,13 @@ async def get_pnl_distribution(
     for i in range(bin_count):
         bin_min = min_pnl + (i * bin_size)
         bin_max = min_pnl + ((i + 1) * bin_size)
-        count = sum(1 for v in pnl_values if bin_min <= v < bin_max)
 
         # Include max value in last bin
         if i == bin_count - 1:
-            count = sum(1 for v in pnl_values if bin_min <= v <= bin_max)
+            in_bin = (pnl_values >= bin_min) & (pnl_values <= bin_max)
+        else:
+            in_bin = (pnl_values >= bin_min) & (pnl_values < bin_max)
+        count = int(np.count_nonzero(in_bin))
 
         if count > 0:
             bins.append(PnLDistributionBin(
@@ -965,7 +796,9 @@ async def get_pnl_distribution(
 
 
 @router.get("/rolling-metrics", response_model=list[RollingMetricsItem])
-async def get_rolling_metrics(
+@cached_response
+@blocking_endpoint
+def get_rolling_metrics(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     window: int = Query(20, ge=5, le=100, description="Rolling window size"),
@@ -975,40 +808,33 @@ async def get_rolling_metrics(
     Get rolling metrics (win rate, avg P&L) for trend analysis.
     Shows how trading performance changes over time using a moving window.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.order_by(Position.close_date).all()
+    positions = _closed_positions(db, date_start, date_end, chronological=True)
 
     if len(positions) < window:
         return []
 
-    items = []
-    cumulative_pnl = 0.0
+    rolling_winners = positions["is_winner"].astype(int).rolling(window).sum().to_numpy()
+    rolling_pnl = positions["pnl_usd"].rolling(window).sum().to_numpy()
+    # Cumulative P&L starts counting at the first full window
+    cumulative_pnl = np.cumsum(positions["pnl_usd"].to_numpy()[window - 1:])
+    close_dates = positions["close_date"].tolist()
 
-    for i in range(window - 1, len(positions)):
-        window_positions = positions[i - window + 1:i + 1]
-        winners = sum(1 for p in window_positions if p.net_pnl and float(p.net_pnl) > 0)
-        total_pnl = sum(get_pnl_in_usd(p) for p in window_positions)
-        cumulative_pnl += get_pnl_in_usd(positions[i])
-
-        items.append(RollingMetricsItem(
+    return [
+        RollingMetricsItem(
             trade_index=i + 1,
-            close_date=positions[i].close_date,
-            rolling_win_rate=round(winners / window * 100, 2),
-            rolling_avg_pnl=round(total_pnl / window, 2),
-            cumulative_pnl=round(cumulative_pnl, 2),
-        ))
-
-    return items
+            close_date=None if pd.isna(close_dates[i]) else close_dates[i].date(),
+            rolling_win_rate=round(float(rolling_winners[i]) / window * 100, 2),
+            rolling_avg_pnl=round(float(rolling_pnl[i]) / window, 2),
+            cumulative_pnl=round(float(cumulative_pnl[i - window + 1]), 2),
+        )
+        for i in range(window - 1, len(positions))
+    ]
 
 
 @router.get("/duration-pnl", response_model=list[DurationPnLItem])
-async def get_duration_pnl(
+@cached_response
+@blocking_endpoint
+def get_duration_pnl(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     db: Session = Depends(get_db),
@@ -1017,34 +843,28 @@ async def get_duration_pnl(
     Get holding duration vs P&L data for scatter plot visualization.
     Helps identify if longer holding periods correlate with better/worse outcomes.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
+    positions = _closed_positions(db, date_start, date_end)
+    points = positions[positions["holding_days"].notna() & positions["net_pnl"].notna()]
+    points = points.assign(direction=_or_default(points["direction"], "unknown"))
 
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.all()
-
-    items = []
-    for p in positions:
-        if p.holding_period_days is not None and p.net_pnl is not None:
-            pnl = get_pnl_in_usd(p)  # Convert to USD
-            items.append(DurationPnLItem(
-                position_id=p.id,
-                holding_days=float(p.holding_period_days),
-                pnl=round(pnl, 2),
-                pnl_pct=round(float(p.net_pnl_pct), 2) if p.net_pnl_pct else None,
-                symbol=p.symbol,
-                direction=p.direction or "unknown",
-                is_winner=float(p.net_pnl) > 0,  # Use original PnL for winner determination
-            ))
-
-    return items
+    return [
+        DurationPnLItem(
+            position_id=p.id,
+            holding_days=float(p.holding_days),
+            pnl=round(p.pnl_usd, 2),
+            pnl_pct=round(p.net_pnl_pct, 2) if p.net_pnl_pct and not math.isnan(p.net_pnl_pct) else None,
+            symbol=p.symbol,
+            direction=p.direction,
+            is_winner=bool(p.is_winner),  # Use original PnL for winner determination
+        )
+        for p in points.itertuples(index=False)
+    ]
 
 
 @router.get("/symbol-risk", response_model=list[SymbolRiskItem])
-async def get_symbol_risk(
+@cached_response
+@blocking_endpoint
+def get_symbol_risk(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     min_trades: int = Query(2, ge=1, description="Minimum trades per symbol"),
@@ -1054,39 +874,31 @@ async def get_symbol_risk(
     Get symbol-level risk metrics for risk quadrant visualization.
     Returns avg win, avg loss, and trade count for each symbol.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.all()
-
-    # Group by symbol
-    symbol_stats = defaultdict(lambda: {
-        "winners": [],
-        "losers": [],
-        "total_pnl": 0.0,
+    positions = _closed_positions(db, date_start, date_end)
+
+    # Group by symbol; winners by original PnL sign, everything else counts as a loss
+    win_pnl = positions["pnl_usd"].where(positions["is_winner"], 0.0)
+    grouped = positions.assign(_win_pnl=win_pnl).groupby("symbol", sort=False, observed=True)
+    symbol_stats = pd.DataFrame({
+        "count": grouped.size(),
+        "total_pnl": grouped["pnl_usd"].sum(),
+        "winners": grouped["is_winner"].sum(),
+        "win_pnl": grouped["_win_pnl"].sum(),
     })
 
-    for p in positions:
-        pnl = get_pnl_in_usd(p)  # Convert to USD
-        symbol_stats[p.symbol]["total_pnl"] += pnl
-        if float(p.net_pnl or 0) > 0:  # Use original PnL for winner/loser classification
-            symbol_stats[p.symbol]["winners"].append(pnl)
-        else:
-            symbol_stats[p.symbol]["losers"].append(pnl)
-
     items = []
-    for symbol, stats in symbol_stats.items():
-        total_trades = len(stats["winners"]) + len(stats["losers"])
+    for symbol, stats in symbol_stats.iterrows():
+        total_trades = int(stats["count"])
         if total_trades < min_trades:
             continue
 
-        avg_win = sum(stats["winners"]) / len(stats["winners"]) if stats["winners"] else 0
-        avg_loss = sum(stats["losers"]) / len(stats["losers"]) if stats["losers"] else 0
-        win_rate = len(stats["winners"]) / total_trades * 100
+        winners = int(stats["winners"])
+        losers = total_trades - winners
+        loss_pnl = float(stats["total_pnl"]) - float(stats["win_pnl"])
+
+        avg_win = float(stats["win_pnl"]) / winners if winners else 0
+        avg_loss = loss_pnl / losers if losers else 0
+        win_rate = winners / total_trades * 100
 
         # Risk/reward ratio
         rr_ratio = abs(avg_win / avg_loss) if avg_loss != 0 else None
@@ -1097,15 +909,28 @@ async def get_symbol_risk(
             avg_loss=round(avg_loss, 2),
             trade_count=total_trades,
             win_rate=round(win_rate, 2),
-            total_pnl=round(stats["total_pnl"], 2),
+            total_pnl=round(float(stats["total_pnl"]), 2),
             risk_reward_ratio=round(rr_ratio, 2) if rr_ratio else None,
         ))
 
     return items
 
 
+def _timed_positions(positions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Positions with a close_time, plus the winner flag used by the time-of-day views
+    (realized_pnl when it is non-zero, otherwise net_pnl)
+    """
+    timed = positions[positions["close_time"].notna()]
+    realized = timed["realized_pnl"].fillna(0)
+    basis = realized.where(realized != 0, timed["net_pnl"].fillna(0))
+    return timed.assign(slot_winner=basis > 0)
+
+
 @router.get("/hourly-performance", response_model=list[HourlyPerformanceItem])
-async def get_hourly_performance(
+@cached_response
+@blocking_endpoint
+def get_hourly_performance(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     db: Session = Depends(get_db),
@@ -1115,44 +940,33 @@ async def get_hourly_performance(
     Helps identify the best/worst trading hours.
     Uses Position close_time for hour analysis.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.all()
+    timed = _timed_positions(_closed_positions(db, date_start, date_end))
 
     # Group by hour of close time
-    hour_stats = defaultdict(lambda: {"count": 0, "winners": 0, "total_pnl": 0.0})
-
-    for p in positions:
-        if p.close_time:
-            hour = p.close_time.hour
-            hour_stats[hour]["count"] += 1
-            pnl = get_pnl_in_usd(p)  # Convert to USD
-            hour_stats[hour]["total_pnl"] += pnl
-            if float(p.realized_pnl or p.net_pnl or 0) > 0:
-                hour_stats[hour]["winners"] += 1
+    hour_stats = timed.groupby(timed["close_time"].dt.hour, sort=True).agg(
+        count=("pnl_usd", "size"),
+        total_pnl=("pnl_usd", "sum"),
+        winners=("slot_winner", "sum"),
+    )
 
     items = []
-    for hour in range(24):
-        stats = hour_stats[hour]
-        if stats["count"] > 0:
-            items.append(HourlyPerformanceItem(
-                hour=hour,
-                trade_count=stats["count"],
-                win_rate=round(stats["winners"] / stats["count"] * 100, 2),
-                total_pnl=round(stats["total_pnl"], 2),
-                avg_pnl=round(stats["total_pnl"] / stats["count"], 2),
-            ))
+    for hour, stats in hour_stats.iterrows():
+        count = int(stats["count"])
+        items.append(HourlyPerformanceItem(
+            hour=int(hour),
+            trade_count=count,
+            win_rate=round(stats["winners"] / count * 100, 2),
+            total_pnl=round(float(stats["total_pnl"]), 2),
+            avg_pnl=round(float(stats["total_pnl"]) / count, 2),
+        ))
 
     return items
 
 
 @router.get("/trading-heatmap", response_model=list[TradingHeatmapCell])
-async def get_trading_heatmap(
+@cached_response
+@blocking_endpoint
+def get_trading_heatmap(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     db: Session = Depends(get_db),
@@ -1162,50 +976,37 @@ async def get_trading_heatmap(
     Shows trading patterns and performance across different time slots.
     Uses Position close_time for analysis.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
+    timed = _timed_positions(_closed_positions(db, date_start, date_end))
 
-    positions = query.all()
-
-    # Group by weekday and hour
+    # Group by weekday and hour (sorted by day then hour)
     day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-    matrix = defaultdict(lambda: {"count": 0, "winners": 0, "total_pnl": 0.0})
-
-    for p in positions:
-        if p.close_time:
-            day = p.close_time.weekday()
-            hour = p.close_time.hour
-            key = (day, hour)
-            matrix[key]["count"] += 1
-            pnl = get_pnl_in_usd(p)  # Convert to USD
-            matrix[key]["total_pnl"] += pnl
-            if float(p.realized_pnl or p.net_pnl or 0) > 0:
-                matrix[key]["winners"] += 1
+    close_times = timed["close_time"].dt
+    matrix = timed.groupby([close_times.weekday, close_times.hour], sort=True).agg(
+        count=("pnl_usd", "size"),
+        total_pnl=("pnl_usd", "sum"),
+        winners=("slot_winner", "sum"),
+    )
 
     items = []
-    for (day, hour), stats in matrix.items():
-        if stats["count"] > 0:
-            items.append(TradingHeatmapCell(
-                day_of_week=day,
-                day_name=day_names[day],
-                hour=hour,
-                trade_count=stats["count"],
-                win_rate=round(stats["winners"] / stats["count"] * 100, 2),
-                avg_pnl=round(stats["total_pnl"] / stats["count"], 2),
-                total_pnl=round(stats["total_pnl"], 2),
-            ))
+    for (day, hour), stats in matrix.iterrows():
+        count = int(stats["count"])
+        items.append(TradingHeatmapCell(
+            day_of_week=int(day),
+            day_name=day_names[int(day)],
+            hour=int(hour),
+            trade_count=count,
+            win_rate=round(stats["winners"] / count * 100, 2),
+            avg_pnl=round(float(stats["total_pnl"]) / count, 2),
+            total_pnl=round(float(stats["total_pnl"]), 2),
+        ))
 
-    # Sort by day then hour
-    items.sort(key=lambda x: (x.day_of_week, x.hour))
     return items
 
 
 @router.get("/by-asset-type", response_model=list[AssetTypeBreakdownItem])
-async def get_by_asset_type(
+@cached_response
+@blocking_endpoint
+def get_by_asset_type(
     date_start: Optional[date] = Query(None, description="Start date"),
     date_end: Optional[date] = Query(None, description="End date"),
     db: Session = Depends(get_db),
@@ -1214,51 +1015,29 @@ async def get_by_asset_type(
     Get performance breakdown by asset type (stock vs option).
     Compares performance across different asset classes.
     """
-    query = db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-    if date_start:
-        query = query.filter(Position.close_date >= date_start)
-    if date_end:
-        query = query.filter(Position.close_date <= date_end)
-
-    positions = query.all()
+    positions = _closed_positions(db, date_start, date_end)
 
     # Group by asset type (using is_option field)
-    type_stats = defaultdict(lambda: {
-        "count": 0,
-        "winners": 0,
-        "total_pnl": 0.0,
-        "total_holding_days": 0,
-        "holding_count": 0,
-    })
-
-    for p in positions:
-        # Determine asset type based on is_option field
-        asset_type = "option" if p.is_option else "stock"
-        type_stats[asset_type]["count"] += 1
-        pnl = get_pnl_in_usd(p)  # Convert to USD
-        type_stats[asset_type]["total_pnl"] += pnl
-        if float(p.net_pnl or 0) > 0:
-            type_stats[asset_type]["winners"] += 1
-        if p.holding_period_days:
-            type_stats[asset_type]["total_holding_days"] += p.holding_period_days
-            type_stats[asset_type]["holding_count"] += 1
+    asset_types = pd.Series(
+        np.where(positions["is_option"], "option", "stock"), index=positions.index
+    )
+    summary = group_summary(positions, asset_types)
 
     items = []
-    for asset_type, stats in type_stats.items():
-        if stats["count"] > 0:
-            avg_holding = (
-                stats["total_holding_days"] / stats["holding_count"]
-                if stats["holding_count"] > 0
-                else 0
-            )
-            items.append(AssetTypeBreakdownItem(
-                asset_type=asset_type,
-                count=stats["count"],
-                total_pnl=round(stats["total_pnl"], 2),
-                win_rate=round(stats["winners"] / stats["count"] * 100, 2),
-                avg_pnl=round(stats["total_pnl"] / stats["count"], 2),
-                avg_holding_days=round(avg_holding, 1),
-            ))
+    for asset_type, stats in summary.iterrows():
+        count = int(stats["count"])
+        avg_holding = (
+            stats["holding_total"] / stats["holding_count"]
+            if stats["holding_count"] > 0
+            else 0
+        )
+        items.append(AssetTypeBreakdownItem(
+            asset_type=asset_type,
+            count=count,
+            total_pnl=round(float(stats["total_pnl"]), 2),
+            win_rate=round(stats["winners"] / count * 100, 2),
+            avg_pnl=round(float(stats["total_pnl"]) / count, 2),
+            avg_holding_days=round(float(avg_holding), 1),
+        ))
 
     return items
@@ -18,6 +18,8 @@ from pydantic import BaseModel
 from typing import Optional
 
 from ....database import get_db, Position, Trade, MarketData
+from ....core.executor import workspace_key
+from ....core.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -234,6 +236,7 @@ async def reset_all_data(
                 deleted_counts[table] = 0
 
         db.commit()
+        response_cache.bump(workspace_key(db))
         logger.info("All trading data cleared for fresh import")
 
         total_deleted = sum(deleted_counts.values())
@@ -2,7 +2,7 @@
 任务管理 API
 
 input: 任务创建请求、文件上传、X-Workspace-Token
-output: 任务状态、进度、结果
+output: 任务状态、进度、结果、分页日志、SSE 进度推送 (/{task_id}/events)、作业队列指标 (/queue/metrics)
 pos: 后端 API 层 - 提供 workspace 隔离的异步任务管理接口
 
 一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
@@ -10,26 +10,37 @@ pos: 后端 API 层 - 提供 workspace 隔离的异步任务管理接口
 
 import os
 import sys
+import json
+import asyncio
 import tempfile
 import hashlib
 from pathlib import Path
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 import logging
 
-from fastapi import APIRouter, UploadFile, File, Header, HTTPException, Query, status
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, EmailStr
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from backend.app.services.task_manager import task_manager
+from backend.app.services.job_queue import job_queue
+from backend.app.services.task_events import Subscription, TERMINAL_STATUSES, task_event_bus
+from backend.app.services.task_log_sink import task_log_sink
+from backend.app.services.task_manager import MAX_LOGS, task_manager
 from backend.app.services.workspace_service import workspace_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# SSE 保活注释间隔；任务不在本进程时退回数据库轮询的间隔
+SSE_KEEPALIVE_SECONDS = 15.0
+SSE_DB_POLL_SECONDS = 1.0
+
 
 def _workspace_database_url(token: Optional[str]) -> str:
     workspace = workspace_service.resolve_token(token)
@@ -67,6 +78,8 @@ class TaskStatusResponse(BaseModel):
     result: Optional[dict]
     error_message: Optional[str]
     logs: List[dict]
+    log_offset: int = 0  # logs[0] 的序号
+    log_total: int = 0   # 该任务的日志总条数
     created_at: Optional[str]
     started_at: Optional[str]
     completed_at: Optional[str]
@@ -141,17 +154,39 @@ async def create_analysis_task(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/queue/metrics")
+async def get_queue_metrics():
+    """
+    作业队列指标
+
+    TASK_QUEUE_ENABLED 时返回各状态作业数、可运行作业数、等待中的 workspace 数、
+    最早排队作业的等待秒数，以及最近完成作业的排队等待 / 执行耗时 (avg/p95/max)
+    """
+    if not task_manager.queue_enabled:
+        return {"enabled": False}
+    metrics = await run_in_threadpool(job_queue.metrics)
+    return {"enabled": True, **metrics}
+
+
 @router.get("/{task_id}", response_model=TaskStatusResponse)
 async def get_task_status(
     task_id: str,
+    log_offset: Optional[int] = Query(None, ge=0, description="日志起始序号（默认返回最后 log_limit 条）"),
+    log_limit: int = Query(1000, ge=1, le=5000, description="最多返回的日志条数"),
     x_workspace_token: Optional[str] = Header(None, alias="X-Workspace-Token"),
 ):
     """
     获取任务状态
 
-    查询任务的当前状态、进度和结果
+    查询任务的当前状态、进度和结果。日志分页返回：轮询时传入
+    log_offset = 上次的 log_offset + len(logs) 只取新增日志。
     """
-    task = task_manager.get_task(task_id, database_url=_workspace_database_url(x_workspace_token))
+    task = task_manager.get_task(
+        task_id,
+        database_url=_workspace_database_url(x_workspace_token),
+        log_offset=log_offset,
+        log_limit=log_limit,
+    )
 
     if not task:
         raise HTTPException(
@@ -162,6 +197,136 @@ async def get_task_status(
     return TaskStatusResponse(**task)
 
 
+def _sse(event: str, data: dict) -> str:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    if event == "log" and "seq" in data:
+        return f"id: {data['seq']}\nevent: log\ndata: {payload}\n\n"
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def _state_of(task: dict) -> dict:
+    state = {key: task.get(key) for key in ("status", "progress", "current_step")}
+    if task.get("status") in TERMINAL_STATUSES:
+        state.update(result=task.get("result"), error_message=task.get("error_message"))
+    return state
+
+
+async def _stream_from_bus(
+    subscription: Subscription,
+    request: Request,
+    database_url: str,
+    task_id: str,
+    log_offset: Optional[int],
+) -> AsyncIterator[str]:
+    """本进程执行的任务：快照 + 订阅队列，不读数据库（除非需要补发已滑出窗口的旧日志）"""
+    try:
+        async for chunk in _bus_events(subscription, request, database_url, task_id, log_offset):
+            yield chunk
+    finally:
+        task_event_bus.unsubscribe(subscription)
+
+
+async def _bus_events(
+    subscription: Subscription,
+    request: Request,
+    database_url: str,
+    task_id: str,
+    log_offset: Optional[int],
+) -> AsyncIterator[str]:
+    state, logs = subscription.state, subscription.logs
+    first = subscription.first_buffered_seq
+    next_seq = (logs[-1]["seq"] + 1) if logs else 0
+    if log_offset is None:
+        log_offset = max(next_seq - MAX_LOGS, 0)
+
+    yield _sse("state", state)
+    if first is not None and log_offset < first:
+        older, _, _ = await run_in_threadpool(
+            task_log_sink.read, database_url, task_id, log_offset, first - log_offset
+        )
+        for entry in older:
+            yield _sse("log", entry)
+    for entry in logs:
+        if entry["seq"] >= log_offset:
+            yield _sse("log", entry)
+    if state.get("status") in TERMINAL_STATUSES:
+        return
+
+    while True:
+        if await request.is_disconnected():
+            return
+        try:
+            event = await asyncio.wait_for(subscription.queue.get(), SSE_KEEPALIVE_SECONDS)
+        except asyncio.TimeoutError:
+            yield ": keepalive\n\n"
+            continue
+        if event.kind == "log" and event.data["seq"] < log_offset:
+            continue
+        yield _sse(event.kind, event.data)
+        if event.terminal:
+            return
+
+
+async def _stream_from_database(
+    task: dict,
+    request: Request,
+    database_url: str,
+    task_id: str,
+) -> AsyncIterator[str]:
+    """任务不在本进程的总线上（已回收或由其他 worker 执行）：退回按日志偏移轮询数据库"""
+    while True:
+        yield _sse("state", _state_of(task))
+        for entry in task["logs"]:
+            yield _sse("log", entry)
+        if task["status"] in TERMINAL_STATUSES or await request.is_disconnected():
+            return
+        await asyncio.sleep(SSE_DB_POLL_SECONDS)
+        task = await run_in_threadpool(
+            task_manager.get_task,
+            task_id,
+            database_url,
+            task["log_offset"] + len(task["logs"]),
+        )
+        if task is None:
+            return
+
+
+@router.get("/{task_id}/events")
+async def stream_task_events(
+    task_id: str,
+    request: Request,
+    log_offset: Optional[int] = Query(None, ge=0, description="从该序号开始推送日志（默认最后 1000 条）"),
+    workspace_token: Optional[str] = Query(None, description="EventSource 无法设置请求头时使用"),
+    x_workspace_token: Optional[str] = Header(None, alias="X-Workspace-Token"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    以 Server-Sent Events 推送任务进度
+
+    事件: state（status/progress/current_step，结束时含 result/error_message）、
+    log（id 为日志序号）。断线重连时浏览器带 Last-Event-ID，从下一条日志继续；
+    任务结束后发送最后一个 state 事件并关闭连接。
+    """
+    database_url = _workspace_database_url(x_workspace_token or workspace_token)
+    if last_event_id and last_event_id.isdigit():
+        log_offset = int(last_event_id) + 1
+
+    subscription = task_event_bus.subscribe(database_url, task_id)
+    if subscription is not None:
+        stream = _stream_from_bus(subscription, request, database_url, task_id, log_offset)
+    else:
+        task = await run_in_threadpool(task_manager.get_task, task_id, database_url, log_offset)
+        if not task:
+            raise HTTPException(status_code=404, detail=f"任务不存在: {task_id}")
+        stream = _stream_from_database(task, request, database_url, task_id)
+
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.delete("/{task_id}")
 async def cancel_task(
     task_id: str,
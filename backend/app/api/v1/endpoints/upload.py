@@ -40,6 +40,7 @@ router = APIRouter()
 
 
 from backend.app.services.workspace_service import workspace_service
+from backend.app.core.response_cache import bump_data_version
 
 
 def _workspace_database_url(token: Optional[str]) -> str:
@@ -237,6 +238,7 @@ async def upload_trades(
                 clear_all_trading_data(session)
             finally:
                 session.close()
+            bump_data_version(database_url)
 
         # 导入（替换模式下相当于全新导入）
         importer = IncrementalImporter(
@@ -264,7 +266,11 @@ async def upload_trades(
                 # 评分
                 logger.info("Running quality scoring...")
                 scorer = QualityScorer()
-                score_result = scorer.score_all_positions(session, update_db=True)
+                score_result = scorer.score_all_positions(
+                    session,
+                    update_db=True,
+                    workers=getattr(config, 'SCORING_WORKERS', 0)
+                )
                 positions_scored = score_result.get('scored', 0)
                 logger.info(f"Scoring completed: {positions_scored} positions scored")
 
@@ -276,6 +282,8 @@ async def upload_trades(
             finally:
                 session.close()
 
+        bump_data_version(database_url)
+
         # 计算处理时间
         processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
 
@@ -2,7 +2,7 @@
 后端配置
 
 input: 环境变量 / .env
-output: settings 单例，被 main.py / database.py / endpoints 使用
+output: settings 单例，被 main.py / database.py / core / endpoints 使用
 pos: 后端配置层 - 通过 pydantic-settings 解析
 
 一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
@@ -52,6 +52,25 @@ class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", _DEFAULT_DB_URL)
     DEBUG: bool = False
 
+    # 数据端点执行模型（app/core/executor.py）：
+    # 同步 ORM/统计代码在有界线程池中执行，每个 workspace 并发受限，超时返回 504
+    DB_EXECUTOR_WORKERS: int = 8
+    WORKSPACE_MAX_CONCURRENCY: int = 2
+    REQUEST_TIMEOUT_SECONDS: float = 30.0
+
+    # 分析端点响应缓存（app/core/response_cache.py）：按 workspace 数据版本（本进程计数器 + 持仓表库内版本）失效，LRU + TTL，
+    # 上限按缓存的响应体总字节数计算
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 300.0
+
+    # workspace 数据库 engine 池（app/core/engine_pool.py）：打开的 engine 数上限（LRU 淘汰）、
+    # 每个 engine 的连接池大小，以及每个 SQLite 连接的 mmap / page cache 大小
+    WORKSPACE_ENGINE_MAX_OPEN: int = 32
+    WORKSPACE_ENGINE_POOL_SIZE: int = 4
+    WORKSPACE_ENGINE_MAX_OVERFLOW: int = 4
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 16 * 1024
+
     model_config = SettingsConfigDict(
         case_sensitive=True,
         env_file=".env",
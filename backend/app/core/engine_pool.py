@@ -0,0 +1,132 @@
+"""
+workspace 数据库 engine 池（有上限，LRU 淘汰）+ SQLite 连接 pragma
+
+input: settings.WORKSPACE_ENGINE_MAX_OPEN / WORKSPACE_ENGINE_POOL_SIZE / WORKSPACE_ENGINE_MAX_OVERFLOW /
+       SQLITE_MMAP_SIZE_BYTES / SQLITE_CACHE_SIZE_KB, workspace 数据库 URL
+output: workspace_engines 单例（session_factory() / dispose()）, apply_sqlite_pragmas()
+pos: 后端基础设施 - database.get_db 按 workspace URL 取 sessionmaker
+
+每个活跃 workspace 一个 engine，使用小连接池（QueuePool）而不是 StaticPool 的单连接，
+同一 workspace 的并发请求各用各的连接；打开的 engine 数超过上限时按 LRU dispose 最久未用的。
+被淘汰 engine 上仍借出的连接不受影响，归还后随旧连接池一起关闭。
+
+每个新连接执行:
+    journal_mode=WAL      读不阻塞写、写不阻塞读，导入进行中 Dashboard 请求照常读（持久化在文件上）
+    synchronous=NORMAL    WAL 下只在 checkpoint 时 fsync
+    mmap_size / cache_size  读多写少的统计查询减少 read() 系统调用
+内存数据库（无 workspace token 的空库）仍用 StaticPool：每个新连接都是一个新的空库。
+文件型 workspace 库附加共享行情库（src/models/market_store.py），只在本库创建用户数据表。
+
+一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from src.models.base import Base
+from src.models.market_store import attach_market_store, local_tables, uses_market_store
+from ..configuration import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _is_memory_url(database_url: str) -> bool:
+    return make_url(database_url).database in (None, "", ":memory:")
+
+
+def apply_sqlite_pragmas(engine: Engine) -> Engine:
+    """为 SQLite engine 的每个新连接设置 WAL / synchronous / mmap / cache pragma"""
+    if engine.dialect.name != "sqlite":
+        return engine
+    file_backed = not _is_memory_url(str(engine.url))
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if file_backed:
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_BYTES)}")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            # 负数表示以 KiB 为单位
+            cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+class WorkspaceEngineManager:
+    """按数据库 URL 缓存 engine + sessionmaker，最多保留 WORKSPACE_ENGINE_MAX_OPEN 个"""
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Tuple[Engine, sessionmaker]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, database_url: str) -> bool:
+        return database_url in self._entries
+
+    def session_factory(self, database_url: str) -> sessionmaker:
+        """返回 URL 对应的 sessionmaker，首次打开时建 engine 并确保表存在"""
+        with self._lock:
+            entry = self._entries.get(database_url)
+            if entry is not None:
+                self._entries.move_to_end(database_url)
+                return entry[1]
+
+            engine = self._create_engine(database_url)
+            Base.metadata.create_all(bind=engine, tables=local_tables(engine))
+            factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            self._entries[database_url] = (engine, factory)
+            while len(self._entries) > max(settings.WORKSPACE_ENGINE_MAX_OPEN, 1):
+                evicted_url, (evicted, _) = self._entries.popitem(last=False)
+                evicted.dispose()
+                logger.debug("Disposed idle workspace engine %s", evicted_url)
+            return factory
+
+    def dispose(self, database_url: str) -> bool:
+        """关闭并移除 URL 对应的 engine（workspace 被删除时调用）"""
+        with self._lock:
+            entry = self._entries.pop(database_url, None)
+        if entry is None:
+            return False
+        entry[0].dispose()
+        return True
+
+    def dispose_all(self) -> None:
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for engine, _ in entries:
+            engine.dispose()
+
+    def _create_engine(self, database_url: str) -> Engine:
+        if not database_url.startswith("sqlite"):
+            return create_engine(database_url, echo=settings.DEBUG, pool_pre_ping=True)
+
+        kwargs = {"connect_args": {"check_same_thread": False}}
+        if _is_memory_url(database_url):
+            kwargs["poolclass"] = StaticPool
+        else:
+            kwargs.update(
+                poolclass=QueuePool,
+                pool_size=settings.WORKSPACE_ENGINE_POOL_SIZE,
+                max_overflow=settings.WORKSPACE_ENGINE_MAX_OVERFLOW,
+            )
+        engine = apply_sqlite_pragmas(create_engine(database_url, echo=settings.DEBUG, **kwargs))
+        if uses_market_store(database_url):
+            attach_market_store(engine)
+        return engine
+
+
+workspace_engines = WorkspaceEngineManager()
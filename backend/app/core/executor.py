@@ -0,0 +1,263 @@
+"""
+数据端点的阻塞调用执行器
+
+input: settings.DB_EXECUTOR_WORKERS / WORKSPACE_MAX_CONCURRENCY / REQUEST_TIMEOUT_SECONDS
+output: blocking_endpoint 装饰器, run_blocking(), close_session(), workspace_key() / workspace_key_for_url()
+pos: 后端基础设施 - 同步 ORM/统计代码移出 uvicorn 事件循环
+
+执行模型:
+    事件循环 → workspace 槽位（asyncio.Semaphore，每个 workspace 至多 N 个并发）
+             → 全局有界线程池（DB_EXECUTOR_WORKERS 个线程）→ 同步函数
+    超过 REQUEST_TIMEOUT_SECONDS（排队 + 执行）返回 504。
+
+超时后线程里的函数无法被强行终止，它会继续跑完并一直占着所属 workspace 的槽位，
+所以一个 workspace 的慢请求只会让它自己排队，不会占满整个线程池。
+超时时请求的 Session 仍在线程里使用：Session 不是线程安全的，此时由工作线程在调用结束后关闭它，
+get_db 通过 close_session() 跳过关闭，不会在另一个线程里并发拆掉连接。
+
+workspace 以 Session 绑定的数据库 URL 区分（每个 workspace 一个 SQLite 文件；
+内存数据库每个 engine 各算一个 workspace）。
+
+一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
+"""
+
+import asyncio
+import functools
+import itertools
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from ..configuration import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_WORKSPACE_KEY = "default"
+
+# Session.info 标记：超时后由工作线程关闭该 Session
+DEFERRED_CLOSE_KEY = "close_in_executor"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """全局线程池（首次使用时创建）"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DB_EXECUTOR_WORKERS,
+                thread_name_prefix="db-endpoint",
+            )
+        return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """关闭线程池（下次使用时重新创建）"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+class _WorkspaceSlots:
+    """单个 workspace 的并发槽位；users 为 0 时从表中移除"""
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.users = 0
+
+
+# 只在事件循环线程中访问；Semaphore 绑定事件循环，换循环（如测试中多个 TestClient）时重建
+_slots: Dict[str, _WorkspaceSlots] = {}
+_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _checkout_slots(key: str) -> _WorkspaceSlots:
+    global _slots_loop
+    loop = asyncio.get_running_loop()
+    if loop is not _slots_loop:
+        _slots.clear()
+        _slots_loop = loop
+
+    slots = _slots.get(key)
+    if slots is None:
+        slots = _slots[key] = _WorkspaceSlots(max(1, settings.WORKSPACE_MAX_CONCURRENCY))
+    slots.users += 1
+    return slots
+
+
+def _return_slots(key: str, slots: _WorkspaceSlots) -> None:
+    slots.users -= 1
+    if slots.users == 0 and _slots.get(key) is slots:
+        del _slots[key]
+
+
+# 内存数据库的 URL 都相同，但每个 engine 是独立的数据库：按 engine 分配序号区分
+_memory_engine_ids: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_memory_engine_counter = itertools.count(1)
+_memory_engine_lock = threading.Lock()
+
+
+def workspace_key(db: Optional[Session]) -> str:
+    """Session 所属 workspace 的标识（数据库 URL；内存数据库附加 engine 序号）"""
+    if db is None:
+        return DEFAULT_WORKSPACE_KEY
+    try:
+        bind = db.get_bind()
+        engine = getattr(bind, "engine", bind)
+        url = engine.url
+        if url.database in (None, "", ":memory:"):
+            with _memory_engine_lock:
+                serial = _memory_engine_ids.setdefault(engine, next(_memory_engine_counter))
+            return f"{url}#{serial}"
+        return str(url)
+    except Exception:
+        return DEFAULT_WORKSPACE_KEY
+
+
+def workspace_key_for_url(database_url: str) -> str:
+    """数据库 URL 对应的 workspace 标识（与 workspace_key 对同一数据库给出相同结果）"""
+    try:
+        return str(make_url(database_url))
+    except Exception:
+        return database_url
+
+
+def close_session(db: Session) -> None:
+    """请求结束时关闭 Session；超时后仍被工作线程使用的 Session 由该线程自行关闭"""
+    if not db.info.get(DEFERRED_CLOSE_KEY):
+        db.close()
+
+
+class _SessionHandoff:
+    """超时后把 Session 的关闭交给仍在运行的工作线程"""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self._lock = threading.Lock()
+        self._finished = False
+        self._deferred = False
+
+    def run(self, call: Callable[[], T]) -> T:
+        try:
+            return call()
+        finally:
+            with self._lock:
+                self._finished = True
+                deferred = self._deferred
+            if deferred:
+                self.session.close()
+
+    def defer_close(self) -> None:
+        with self._lock:
+            if not self._finished:
+                self._deferred = True
+                self.session.info[DEFERRED_CLOSE_KEY] = True
+
+
+def _timeout_error(timeout: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail=f"Request did not complete within {timeout:g}s, please retry later.",
+    )
+
+
+async def run_blocking(
+    key: str,
+    call: Callable[[], T],
+    timeout: Optional[float] = None,
+    session: Optional[Session] = None,
+) -> T:
+    """
+    在线程池中执行阻塞调用，受 workspace 并发上限和超时约束
+
+    Args:
+        key: workspace 标识
+        call: 无参可调用对象
+        timeout: 排队 + 执行的总秒数，默认 settings.REQUEST_TIMEOUT_SECONDS
+        session: call 使用的请求 Session；执行中超时时改由工作线程在 call 结束后关闭
+
+    Raises:
+        HTTPException(504): 超时
+    """
+    timeout = settings.REQUEST_TIMEOUT_SECONDS if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    slots = _checkout_slots(key)
+
+    try:
+        await asyncio.wait_for(slots.semaphore.acquire(), timeout)
+    except asyncio.TimeoutError:
+        _return_slots(key, slots)
+        logger.warning(f"Workspace {key} saturated, request waited {timeout:g}s for a slot")
+        raise _timeout_error(timeout)
+    except BaseException:
+        _return_slots(key, slots)
+        raise
+
+    handoff = _SessionHandoff(session) if session is not None else None
+    target = call if handoff is None else functools.partial(handoff.run, call)
+
+    try:
+        future = loop.run_in_executor(get_executor(), target)
+    except BaseException:
+        slots.semaphore.release()
+        _return_slots(key, slots)
+        raise
+
+    def release(_future) -> None:
+        # 线程结束（包括超时后才结束）时才归还槽位
+        slots.semaphore.release()
+        _return_slots(key, slots)
+
+    future.add_done_callback(release)
+
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), max(0.0, deadline - loop.time()))
+    except asyncio.TimeoutError:
+        logger.warning(f"Blocking call timed out after {timeout:g}s for workspace {key}")
+        if handoff is not None:
+            handoff.defer_close()
+        raise _timeout_error(timeout)
+
+
+def blocking_endpoint(
+    func: Optional[Callable[..., Any]] = None,
+    *,
+    timeout: Optional[float] = None,
+):
+    """
+    把同步端点函数包装成在线程池中执行的 async 端点
+
+    FastAPI 通过 __wrapped__ 读取原函数签名，依赖注入不受影响；
+    workspace 取自参数中的 Session，超时后该 Session 由工作线程关闭。
+
+    用法:
+        @router.get("/kpis")
+        @blocking_endpoint
+        def get_kpis(db: Session = Depends(get_db)): ...
+    """
+    def decorate(fn: Callable[..., Any]):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            db = next((v for v in kwargs.values() if isinstance(v, Session)), None)
+            return await run_blocking(
+                workspace_key(db),
+                functools.partial(fn, *args, **kwargs),
+                timeout=timeout,
+                session=db,
+            )
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
@@ -0,0 +1,224 @@
+"""
+分析类端点的响应缓存（按数据版本失效）+ ETag / 304
+
+input: settings.RESPONSE_CACHE_MAX_BYTES / RESPONSE_CACHE_TTL_SECONDS, 请求头 If-None-Match,
+       position_frame.data_version()（持仓表的数据版本）
+output: cached_response 装饰器, bump_data_version(), response_cache 单例
+pos: 后端基础设施 - Dashboard 每次打开都要发十几个 /statistics/*、/dashboard/* 请求，
+     结果只在导入/配对/评分/复盘后才会变化，命中时只做一次版本查询，直接返回已序列化的 JSON
+
+缓存键: (workspace, 路径, 规范化参数)，条目记录写入时的数据版本 (本进程计数器, 库内数据版本):
+    - 规范化参数取 FastAPI 解析后的端点参数（含默认值），?limit=20 与不传 limit 命中同一条目
+    - 本进程计数器：TaskManager（导入/清空）、持仓复盘 PATCH、数据重置等写入方调用
+      bump_data_version() 递增，同时丢弃该 workspace 的全部条目；计算期间计数器被递增的结果不会被缓存
+    - 库内数据版本：position_frame.data_version(db)（持仓数、最大 id、最大 updated_at），
+      缓存的统计/看板端点都由持仓表计算。队列 worker、scripts/ 命令行等其他进程写库后版本随之改变，
+      不依赖它们能否调用本进程的 bump_data_version()；计算期间库被改写的结果按旧版本缓存，下次请求即失效
+    - 版本查询经 run_blocking 在线程池执行（与端点共用 workspace 槽位与超时），不阻塞事件循环
+
+淘汰: LRU，按响应体字节数计入内存上限；超过 TTL 的条目在读取时丢弃。
+ETag 为响应体摘要；If-None-Match 匹配时返回 304（无响应体），前端浏览器缓存直接复用。
+
+用法（放在 @blocking_endpoint 外层，命中时只为版本查询占用一次 workspace 槽位）:
+    @router.get("/kpis", response_model=DashboardKPIs)
+    @cached_response
+    @blocking_endpoint
+    def get_kpis(..., db: Session = Depends(get_db)): ...
+
+一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
+"""
+
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from ..configuration import settings
+from ..services.position_frame import data_version
+from .executor import run_blocking, workspace_key, workspace_key_for_url
+
+CACHE_CONTROL = "private, no-cache"
+
+# (本进程计数器, 库内数据版本)
+Version = Tuple[int, Hashable]
+
+
+class _Entry(NamedTuple):
+    version: Version
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    线程安全的 LRU 响应缓存，按响应体字节数限制内存
+
+    键的第一个元素是 workspace，bump(workspace) 据此清掉该 workspace 的条目。
+    条目版本为 (本进程计数器, 库内数据版本)，两者任一变化都视为失效。
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def version(self, workspace: str) -> int:
+        with self._lock:
+            return self._versions.get(workspace, 0)
+
+    def bump(self, workspace: str) -> int:
+        """递增 workspace 的数据版本并丢弃它的全部条目"""
+        with self._lock:
+            version = self._versions[workspace] = self._versions.get(workspace, 0) + 1
+            for key in [k for k in self._entries if k[0] == workspace]:
+                self._drop(key)
+            return version
+
+    def get(self, key: Tuple, version: Version) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version or entry.expires_at <= time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, version: Version, body: bytes, etag: str) -> None:
+        max_bytes = settings.RESPONSE_CACHE_MAX_BYTES
+        if len(body) > max_bytes:
+            return
+        with self._lock:
+            # 计算期间数据已更新：这个结果已经过期，不再缓存
+            if self._versions.get(key[0], 0) != version[0]:
+                return
+            if key in self._entries:
+                self._drop(key)
+            expires_at = time.monotonic() + settings.RESPONSE_CACHE_TTL_SECONDS
+            self._entries[key] = _Entry(version, body, etag, expires_at)
+            self._bytes += len(body)
+            while self._bytes > max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._bytes = 0
+
+    def _drop(self, key: Tuple) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+
+response_cache = ResponseCache()
+
+
+def bump_data_version(database_url: Optional[str] = None) -> int:
+    """
+    标记 workspace 数据已变化（写入方在提交后调用）
+
+    Args:
+        database_url: workspace 数据库 URL，默认 settings.DATABASE_URL
+    """
+    return response_cache.bump(workspace_key_for_url(database_url or settings.DATABASE_URL))
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 弱比较（忽略 W/ 前缀，支持逗号分隔与 *）"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _respond(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _normalized_params(kwargs: Dict[str, Any]) -> Tuple[Tuple[str, Hashable], ...]:
+    return tuple(sorted(
+        (name, repr(value))
+        for name, value in kwargs.items()
+        if not isinstance(value, (Session, Request))
+    ))
+
+
+async def _stored_version(workspace: str, db: Optional[Session]) -> Hashable:
+    """其他进程也能看到的库内数据版本（没有 Session 的端点为 None）"""
+    if db is None:
+        return None
+    return await run_blocking(workspace, lambda: data_version(db), session=db)
+
+
+def cached_response(func: Callable[..., Any]):
+    """
+    为返回 JSON 数据的 async 端点加上响应缓存与 ETag
+
+    FastAPI 通过 __signature__ 看到原端点参数加上一个 Request 参数；
+    端点抛出的异常、返回的 Response 对象都不缓存。
+    """
+    signature = inspect.signature(func)
+    request_param = next(
+        (p.name for p in signature.parameters.values() if p.annotation is Request),
+        None,
+    )
+    injected = request_param is None
+    if injected:
+        request_param = "_cache_request"
+        signature = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter(request_param, inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ])
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        request: Request = kwargs.pop(request_param) if injected else kwargs[request_param]
+        db = next((v for v in kwargs.values() if isinstance(v, Session)), None)
+        workspace = workspace_key(db)
+        key = (workspace, request.url.path, _normalized_params(kwargs))
+        version = (response_cache.version(workspace), await _stored_version(workspace, db))
+
+        entry = response_cache.get(key, version)
+        if entry is not None:
+            return _respond(request, entry.body, entry.etag)
+
+        result = await func(*args, **kwargs)
+        if isinstance(result, Response):
+            return result
+
+        body = JSONResponse(content=jsonable_encoder(result)).body
+        etag = make_etag(body)
+        response_cache.put(key, version, body, etag)
+        return _respond(request, body, etag)
+
+    wrapper.__signature__ = signature
+    return wrapper
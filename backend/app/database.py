@@ -4,6 +4,7 @@ Database connection and session management
 input: settings.DATABASE_URL, optional X-Workspace-Token, src.models.*
 output: engine, SessionLocal, workspace-aware get_db dependency, 自动建表
 pos: 后端数据库层 - 应用启动即可用，支持匿名 workspace 数据隔离
+     （workspace engine 由 core/engine_pool.py 管理：有上限的 LRU + 每连接 SQLite pragma）
 """
 
 import logging
@@ -11,9 +12,7 @@ import sys
 from pathlib import Path
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
 from typing import Generator
-import threading
 
 from fastapi import HTTPException, Request, status
 
@@ -30,21 +29,21 @@ from src.models.position import Position, PositionStatus
 from src.models.market_data import MarketData
 
 from .configuration import settings
+from .core.engine_pool import apply_sqlite_pragmas, workspace_engines
+from .core.executor import close_session
 from .services.workspace_service import workspace_service
 
 logger = logging.getLogger(__name__)
 
 # Create engine with SQLite settings
-engine = create_engine(
+engine = apply_sqlite_pragmas(create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False},  # SQLite specific
     echo=settings.DEBUG,
-)
+))
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-_session_factory_cache: dict[str, sessionmaker] = {}
-_session_factory_lock = threading.RLock()
 _EMPTY_DATABASE_URL = "sqlite:///:memory:"
 
 
@@ -64,24 +63,8 @@ init_db()
 
 
 def get_session_factory_for_database_url(database_url: str) -> sessionmaker:
-    """Return a cached session factory for a database URL and ensure schema exists."""
-    with _session_factory_lock:
-        cached = _session_factory_cache.get(database_url)
-        if cached is not None:
-            return cached
-
-        kwargs = {}
-        if database_url.startswith("sqlite"):
-            kwargs = {
-                "connect_args": {"check_same_thread": False},
-                "poolclass": StaticPool,
-            }
-
-        scoped_engine = create_engine(database_url, echo=settings.DEBUG, **kwargs)
-        Base.metadata.create_all(bind=scoped_engine)
-        factory = sessionmaker(autocommit=False, autoflush=False, bind=scoped_engine)
-        _session_factory_cache[database_url] = factory
-        return factory
+    """Return the pooled session factory for a workspace database URL (schema ensured on first open)."""
+    return workspace_engines.session_factory(database_url)
 
 
 def get_db(request: Request = None) -> Generator[Session, None, None]:
@@ -111,7 +94,8 @@ def get_db(request: Request = None) -> Generator[Session, None, None]:
     try:
         yield db
     finally:
-        db.close()
+        # A blocking endpoint that timed out still owns the session; its worker thread closes it.
+        close_session(db)
 
 
 # Re-export models for convenience
@@ -2,7 +2,7 @@
 FastAPI Application Entry Point
 
 input: config.py配置, api/v1/router路由
-output: FastAPI实例, CORS中间件, API文档
+output: FastAPI实例, CORS中间件, API文档, 生命周期（workspace 过期清理定时器）
 pos: 后端服务入口 - 创建应用实例，挂载路由和中间件
 
 一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
@@ -10,6 +10,7 @@ pos: 后端服务入口 - 创建应用实例，挂载路由和中间件
 
 import logging
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 from logging.handlers import RotatingFileHandler
 
@@ -18,6 +19,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from .configuration import settings
 from .api.v1.router import api_router
+from .services.workspace_service import workspace_service
 
 # ==================== 日志配置 ====================
 # 日志目录
@@ -76,12 +78,25 @@ _is_debug = settings.DEBUG
 _docs_url = f"{settings.API_V1_PREFIX}/docs" if _is_debug else None
 _redoc_url = f"{settings.API_V1_PREFIX}/redoc" if _is_debug else None
 
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 过期 workspace 由后台定时清理；关闭时把防抖中的 last_seen_at 写回注册表
+    workspace_service.start_cleanup_timer()
+    try:
+        yield
+    finally:
+        workspace_service.stop_cleanup_timer()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     docs_url=_docs_url,
     redoc_url=_redoc_url,
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -108,6 +123,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 分析端点返回 ETag（app/core/response_cache.py），前端可读取并回传 If-None-Match
+    expose_headers=["ETag"],
 )
 
 # Include API router
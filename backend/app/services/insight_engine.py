@@ -3,6 +3,9 @@ Trading Insight Engine - Rule-based insight generation
 
 This engine analyzes trading positions and generates actionable insights
 based on a comprehensive set of rules across 10 dimensions.
+
+Positions come from the workspace's shared closed-position snapshot
+(position_frame.py) as projected rows with the same field names as Position.
 """
 
 from typing import List, Optional, Dict, Any
@@ -10,8 +13,9 @@ from datetime import date, timedelta
 from collections import defaultdict
 from sqlalchemy.orm import Session
 
-from ..database import Position, PositionStatus
+from ..database import Position
 from ..schemas.insights import TradingInsight, InsightType, InsightCategory
+from .position_frame import get_position_frame
 
 
 class InsightEngine:
@@ -53,21 +57,16 @@ class InsightEngine:
         Generate insights for the given date range.
         Returns top N insights sorted by priority.
         """
-        # Fetch positions
-        query = self.db.query(Position).filter(Position.status == PositionStatus.CLOSED)
-
-        if date_start:
-            query = query.filter(Position.close_date >= date_start)
-        if date_end:
-            query = query.filter(Position.close_date <= date_end)
-
-        self.positions = query.order_by(Position.close_date).all()
+        # Closed positions from the shared snapshot, ordered by close_date
+        frame = get_position_frame(self.db)
+        selected = frame.select(date_start, date_end, chronological=True)
+        self.positions = frame.records(selected)
 
         if len(self.positions) < 3:
             return []
 
         # Compute basic stats
-        self._compute_basic_stats()
+        self._compute_basic_stats(selected)
 
         # Clear previous insights
         self.insights = []
@@ -87,21 +86,21 @@ class InsightEngine:
         self.insights.sort(key=lambda x: x.priority, reverse=True)
         return self.insights[:limit]
 
-    def _compute_basic_stats(self):
+    def _compute_basic_stats(self, selected):
         """Compute commonly used statistics"""
-        from ..utils.currency import get_pnl_in_usd
-
-        self._winners = [p for p in self.positions if p.net_pnl and float(p.net_pnl) > 0]
-        self._losers = [p for p in self.positions if p.net_pnl and float(p.net_pnl) <= 0]
+        winner_mask = selected["is_winner"].to_numpy()
+        loser_mask = selected["is_loser"].to_numpy()
+        self._winners = [p for p, win in zip(self.positions, winner_mask) if win]
+        self._losers = [p for p, lose in zip(self.positions, loser_mask) if lose]
 
         total = len(self.positions)
         self._win_rate = len(self._winners) / total * 100 if total > 0 else 0
         # USD-equivalent — 不能直接 sum HKD+USD（之前会让 "最大亏损占总盈利 X%"
         # 这种指标的分母虚高几倍，得出 21.9% 的假数字）。
-        self._total_pnl = sum(get_pnl_in_usd(p) for p in self.positions)
-        self._avg_pnl = self._total_pnl / total if total > 0 else 0
         # 保留一份 USD-equivalent 的单笔列表，给 R03 等用
-        self._pnls_usd = [get_pnl_in_usd(p) for p in self.positions]
+        self._pnls_usd = selected["pnl_usd"].tolist()
+        self._total_pnl = float(sum(self._pnls_usd))
+        self._avg_pnl = self._total_pnl / total if total > 0 else 0
 
     def _add_insight(self, insight: TradingInsight):
         """Add an insight to the list"""
@@ -0,0 +1,447 @@
+"""
+持久化分析作业队列（SQLite）
+
+input: TaskManager.create_task 入队的作业 (task_id, workspace database_url, payload), config.TASK_QUEUE_*
+output: job_queue 单例 - enqueue() / claim() / heartbeat() / complete() / fail() / cancel() / reap_expired() / metrics()
+pos: 后端服务层 - TASK_QUEUE_ENABLED 时 API 进程只入队，独立 worker 进程（backend/app/worker.py）领取执行
+
+作业表 analysis_jobs 位于单独的 SQLite 文件（默认 DATA_DIR/task_queue.db），不进 workspace 数据库，
+容器重启后排队中的作业仍在。多个 worker 进程共享该文件，领取在 BEGIN IMMEDIATE 事务内完成，同一作业只会被一个进程领到。
+
+状态: queued → running → done / failed / cancelled
+    - 领取时 attempts + 1，并写入 worker_id 与租约到期时间 lease_expires_at
+    - 执行期间 worker 每 TASK_QUEUE_HEARTBEAT_SECONDS 续租；租约过期（进程崩溃/被杀）的作业由 reap_expired()
+      按退避重新入队，attempts 达到 TASK_QUEUE_MAX_ATTEMPTS 后标记 failed
+    - complete() / fail() / heartbeat() 都校验 worker_id，租约已被回收的 worker 写不回结果
+
+公平性（按 workspace）:
+    每个 workspace 同时运行的作业数不超过 TASK_QUEUE_MAX_RUNNING_PER_WORKSPACE；
+    有可运行作业的 workspace 中，先选当前运行数最少的，再选队首作业最早入队的。
+    单个 workspace 连续上传多个大文件时，其他 workspace 的作业不需要等它们全部跑完。
+
+一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
+"""
+
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    delete,
+    event,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.engine import Engine
+
+import config
+from ..core.engine_pool import apply_sqlite_pragmas
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus:
+    """作业状态枚举"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = (JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED)
+
+_queue_metadata = MetaData()
+
+# 独立的 MetaData：workspace 数据库不会建出这张表
+jobs_table = Table(
+    "analysis_jobs",
+    _queue_metadata,
+    Column("job_id", String(64), primary_key=True),  # 与 Task.task_id 相同
+    Column("workspace", Text, nullable=False),        # workspace 数据库 URL
+    Column("payload", JSON, nullable=False),
+    Column("status", String(16), nullable=False, default=JobStatus.QUEUED),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("max_attempts", Integer, nullable=False),
+    # 时间均为 epoch 秒
+    Column("enqueued_at", Float, nullable=False),
+    Column("available_at", Float, nullable=False),   # 重试退避：此时间之前不会被领取
+    Column("started_at", Float),
+    Column("finished_at", Float),
+    Column("worker_id", String(128)),
+    Column("lease_expires_at", Float),
+    Column("last_error", Text),
+    Index("ix_analysis_jobs_status_available", "status", "available_at"),
+    Index("ix_analysis_jobs_status_workspace", "status", "workspace"),
+)
+
+
+@dataclass(frozen=True)
+class Job:
+    """领取到的作业"""
+    job_id: str
+    workspace: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+    enqueued_at: float
+    worker_id: Optional[str] = None
+
+    @property
+    def final_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def _summary(values: List[float]) -> dict:
+    if not values:
+        return {"count": 0, "avg": None, "p95": None, "max": None}
+    return {
+        "count": len(values),
+        "avg": round(sum(values) / len(values), 3),
+        "p95": round(_percentile(values, 0.95), 3),
+        "max": round(max(values), 3),
+    }
+
+
+class JobQueue:
+    """SQLite 作业队列（多进程安全）"""
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        upload_dir: Optional[Path] = None,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_backoff_seconds: Optional[float] = None,
+        max_running_per_workspace: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.database_url = (
+            database_url
+            or getattr(config, 'TASK_QUEUE_DATABASE_URL', None)
+            or f"sqlite:///{config.DATA_DIR / 'task_queue.db'}"
+        )
+        self.upload_dir = Path(
+            upload_dir
+            or getattr(config, 'TASK_QUEUE_UPLOAD_DIR', None)
+            or (config.DATA_DIR / "task_uploads")
+        )
+        self.lease_seconds = float(
+            lease_seconds if lease_seconds is not None
+            else getattr(config, 'TASK_QUEUE_LEASE_SECONDS', 120)
+        )
+        self.max_attempts = int(max_attempts or getattr(config, 'TASK_QUEUE_MAX_ATTEMPTS', 3))
+        self.retry_backoff_seconds = float(
+            retry_backoff_seconds if retry_backoff_seconds is not None
+            else getattr(config, 'TASK_QUEUE_RETRY_BACKOFF_SECONDS', 10)
+        )
+        self.max_running_per_workspace = int(
+            max_running_per_workspace
+            or getattr(config, 'TASK_QUEUE_MAX_RUNNING_PER_WORKSPACE', 1)
+        )
+        self.retain_seconds = float(getattr(config, 'TASK_QUEUE_RETAIN_SECONDS', 7 * 24 * 3600))
+        self.clock = clock
+        self._engine: Optional[Engine] = None
+        self._lock = threading.Lock()
+
+    # ==================== 入队 / 取消 ====================
+
+    def stage_upload(self, file_path: str, job_id: str) -> str:
+        """把上传的临时文件移到所有 worker 进程可见的目录，返回新路径"""
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        target = self.upload_dir / f"{job_id}{Path(file_path).suffix or '.csv'}"
+        shutil.move(file_path, target)
+        return str(target)
+
+    def enqueue(self, job_id: str, workspace: str, payload: dict) -> None:
+        now = self.clock()
+        with self._engine_or_create().begin() as connection:
+            connection.execute(
+                insert(jobs_table),
+                {
+                    "job_id": job_id,
+                    "workspace": workspace,
+                    "payload": payload,
+                    "status": JobStatus.QUEUED,
+                    "attempts": 0,
+                    "max_attempts": self.max_attempts,
+                    "enqueued_at": now,
+                    "available_at": now,
+                },
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        """取消尚未开始的作业；已被领取的作业返回 False"""
+        with self._engine_or_create().begin() as connection:
+            result = connection.execute(
+                update(jobs_table)
+                .where(jobs_table.c.job_id == job_id, jobs_table.c.status == JobStatus.QUEUED)
+                .values(status=JobStatus.CANCELLED, finished_at=self.clock())
+            )
+        return result.rowcount == 1
+
+    # ==================== worker 侧 ====================
+
+    def claim(self, worker_id: Optional[str] = None) -> Optional[Job]:
+        """按 workspace 公平性领取一个可运行的作业，没有则返回 None"""
+        worker_id = worker_id or default_worker_id()
+        now = self.clock()
+        c = jobs_table.c
+        with self._engine_or_create().begin() as connection:
+            running = dict(connection.execute(
+                select(c.workspace, func.count())
+                .where(c.status == JobStatus.RUNNING)
+                .group_by(c.workspace)
+            ).all())
+            heads = connection.execute(
+                select(c.workspace, func.min(c.enqueued_at))
+                .where(c.status == JobStatus.QUEUED, c.available_at <= now)
+                .group_by(c.workspace)
+            ).all()
+            candidates = [
+                (running.get(workspace, 0), oldest, workspace)
+                for workspace, oldest in heads
+                if running.get(workspace, 0) < self.max_running_per_workspace
+            ]
+            if not candidates:
+                return None
+            workspace = min(candidates)[2]
+
+            row = connection.execute(
+                select(jobs_table)
+                .where(c.workspace == workspace, c.status == JobStatus.QUEUED, c.available_at <= now)
+                .order_by(c.enqueued_at, c.job_id)
+                .limit(1)
+            ).mappings().one()
+            connection.execute(
+                update(jobs_table)
+                .where(c.job_id == row["job_id"])
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=row["attempts"] + 1,
+                    worker_id=worker_id,
+                    started_at=now,
+                    lease_expires_at=now + self.lease_seconds,
+                )
+            )
+        return Job(
+            job_id=row["job_id"],
+            workspace=row["workspace"],
+            payload=row["payload"],
+            attempts=row["attempts"] + 1,
+            max_attempts=row["max_attempts"],
+            enqueued_at=row["enqueued_at"],
+            worker_id=worker_id,
+        )
+
+    def heartbeat(self, job: Job) -> bool:
+        """续租；返回 False 表示租约已被回收（作业已交给别的 worker 或已结束）"""
+        return self._update_owned(job, lease_expires_at=self.clock() + self.lease_seconds)
+
+    def complete(self, job: Job) -> bool:
+        return self._update_owned(
+            job,
+            status=JobStatus.DONE,
+            finished_at=self.clock(),
+            lease_expires_at=None,
+        )
+
+    def fail(self, job: Job, error: str) -> bool:
+        """
+        记录一次失败执行
+
+        Returns:
+            True 表示已按退避重新入队，False 表示已达最大尝试次数（或租约已丢失）
+        """
+        if job.final_attempt:
+            self._update_owned(
+                job,
+                status=JobStatus.FAILED,
+                finished_at=self.clock(),
+                lease_expires_at=None,
+                last_error=error,
+            )
+            return False
+        return self._update_owned(
+            job,
+            status=JobStatus.QUEUED,
+            available_at=self.clock() + self._backoff(job.attempts),
+            worker_id=None,
+            lease_expires_at=None,
+            last_error=error,
+        )
+
+    def reap_expired(self) -> List[Job]:
+        """
+        回收租约过期的作业：未用完尝试次数的重新入队，用完的标记 failed
+
+        同时清理超过 TASK_QUEUE_RETAIN_SECONDS 的已结束作业。
+
+        Returns:
+            本次被标记为 failed 的作业（调用方负责把对应 Task 标记失败）
+        """
+        now = self.clock()
+        c = jobs_table.c
+        failed: List[Job] = []
+        with self._engine_or_create().begin() as connection:
+            rows = connection.execute(
+                select(jobs_table)
+                .where(c.status == JobStatus.RUNNING, c.lease_expires_at < now)
+            ).mappings().all()
+            for row in rows:
+                error = f"worker {row['worker_id']} lost its lease"
+                if row["attempts"] >= row["max_attempts"]:
+                    values = dict(status=JobStatus.FAILED, finished_at=now)
+                    failed.append(self._job(row))
+                else:
+                    values = dict(status=JobStatus.QUEUED, available_at=now + self._backoff(row["attempts"]))
+                    logger.warning(f"Requeueing job {row['job_id']}: {error}")
+                connection.execute(
+                    update(jobs_table)
+                    .where(c.job_id == row["job_id"], c.status == JobStatus.RUNNING)
+                    .values(worker_id=None, lease_expires_at=None, last_error=error, **values)
+                )
+            connection.execute(
+                delete(jobs_table)
+                .where(c.status.in_(FINISHED_STATUSES), c.finished_at < now - self.retain_seconds)
+            )
+        return failed
+
+    # ==================== 指标 ====================
+
+    def metrics(self, window: int = 200) -> dict:
+        """
+        队列深度与延迟
+
+        Returns:
+            depth: 各状态作业数; ready: 已到可运行时间的排队作业数;
+            workspaces_waiting: 有排队作业的 workspace 数; oldest_queued_seconds: 最早排队作业已等待秒数;
+            wait_seconds / run_seconds: 最近 window 个已结束作业的排队等待 / 执行耗时 (avg/p95/max)
+        """
+        now = self.clock()
+        c = jobs_table.c
+        with self._engine_or_create().connect() as connection:
+            depth = dict(connection.execute(
+                select(c.status, func.count()).group_by(c.status)
+            ).all())
+            ready = connection.execute(
+                select(func.count())
+                .where(c.status == JobStatus.QUEUED, c.available_at <= now)
+            ).scalar()
+            queued = connection.execute(
+                select(func.count(func.distinct(c.workspace)), func.min(c.enqueued_at))
+                .where(c.status == JobStatus.QUEUED)
+            ).one()
+            recent = connection.execute(
+                select(c.enqueued_at, c.started_at, c.finished_at)
+                .where(c.status == JobStatus.DONE)
+                .order_by(c.finished_at.desc())
+                .limit(window)
+            ).all()
+
+        return {
+            "depth": {status: depth.get(status, 0) for status in (
+                JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED
+            )},
+            "ready": ready or 0,
+            "workspaces_waiting": queued[0] or 0,
+            "oldest_queued_seconds": round(now - queued[1], 3) if queued[1] is not None else None,
+            "wait_seconds": _summary([row.started_at - row.enqueued_at for row in recent]),
+            "run_seconds": _summary([row.finished_at - row.started_at for row in recent]),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._engine is not None:
+                self._engine.dispose()
+                self._engine = None
+
+    # ==================== 内部 ====================
+
+    def _backoff(self, attempts: int) -> float:
+        return self.retry_backoff_seconds * (2 ** max(attempts - 1, 0))
+
+    def _update_owned(self, job: Job, **values) -> bool:
+        c = jobs_table.c
+        with self._engine_or_create().begin() as connection:
+            result = connection.execute(
+                update(jobs_table)
+                .where(
+                    c.job_id == job.job_id,
+                    c.status == JobStatus.RUNNING,
+                    c.worker_id == job.worker_id,
+                )
+                .values(**values)
+            )
+        return result.rowcount == 1
+
+    @staticmethod
+    def _job(row) -> Job:
+        return Job(
+            job_id=row["job_id"],
+            workspace=row["workspace"],
+            payload=row["payload"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            enqueued_at=row["enqueued_at"],
+            worker_id=row["worker_id"],
+        )
+
+    def _engine_or_create(self) -> Engine:
+        with self._lock:
+            if self._engine is None:
+                self._engine = self._create_engine()
+                _queue_metadata.create_all(self._engine)
+            return self._engine
+
+    def _create_engine(self) -> Engine:
+        engine = create_engine(
+            self.database_url,
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+        apply_sqlite_pragmas(engine)
+
+        # pysqlite 默认延迟到第一条写语句才开启事务；改为由 SQLAlchemy 发出 BEGIN IMMEDIATE，
+        # claim() 的读-改-写在进程间串行，不会两个 worker 领到同一个作业
+        @event.listens_for(engine, "connect")
+        def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def _begin_immediate(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+        return engine
+
+
+job_queue = JobQueue()
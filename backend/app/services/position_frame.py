@@ -0,0 +1,291 @@
+"""
+已平仓持仓的列式快照（position frame）
+
+input: Session（按其绑定的 engine 区分 workspace）
+output: PositionFrame（pandas 列 + 原始行），以及统计端点共用的向量化聚合函数
+pos: 业务层 - statistics / dashboard / InsightEngine / 反事实回测共享同一份快照，
+     不再每个请求各自加载全部 Position ORM 对象并逐行换算 USD
+
+快照按数据版本缓存：
+    data_version(db) = (持仓数, 最大 id, 最大 updated_at)，一条聚合查询，
+    导入/平仓/删除/评分（ORM 与批量 UPDATE 都会刷新 updated_at）都会改变它。
+    版本不变时直接复用已构建的快照；版本变化时重新做一次列投影查询并重建。
+缓存以 engine 为弱引用键，engine 被释放时快照随之回收。
+
+列（DataFrame，按 id 升序，即不带 ORDER BY 的查询顺序；select(chronological=True)
+按 close_date、id 排序，close_date 为空的在最前，与 ORDER BY close_date 一致）:
+    id, chrono_rank, symbol(category), symbol_name, direction, strategy_type, score_grade, currency, is_option,
+    close_date/open_date(datetime64, 日), close_time/open_time,
+    holding_days, net_pnl, realized_pnl, net_pnl_pct, total_fees, overall_score（缺失为 NaN）,
+    pnl_usd, fees_usd, gross_pnl_usd（USD 换算，缺失按 0，与 utils.currency 相同）,
+    is_winner(net_pnl > 0), is_loser(net_pnl < 0)
+
+逐笔规则代码（InsightEngine、反事实规则）通过 records() 拿到原始行，
+字段名与 Position 相同、值保持 Decimal/date 原样，行为与 ORM 对象一致。
+
+一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
+"""
+
+import threading
+import weakref
+from datetime import date
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..database import Position, PositionStatus
+from ..utils.currency import EXCHANGE_RATES
+
+# 列投影：统计端点 + InsightEngine + 反事实规则用到的全部字段
+ROW_COLUMNS = (
+    Position.id,
+    Position.symbol,
+    Position.symbol_name,
+    Position.direction,
+    Position.strategy_type,
+    Position.score_grade,
+    Position.currency,
+    Position.is_option,
+    Position.open_date,
+    Position.close_date,
+    Position.open_time,
+    Position.close_time,
+    Position.holding_period_days,
+    Position.open_price,
+    Position.quantity,
+    Position.net_pnl,
+    Position.net_pnl_pct,
+    Position.realized_pnl,
+    Position.total_fees,
+    Position.overall_score,
+    Position.discipline_score,
+    Position.mae_pct,
+    Position.mfe,
+    Position.post_exit_5d_pct,
+)
+
+_FLOAT_COLUMNS = {
+    "holding_period_days": "holding_days",
+    "net_pnl": "net_pnl",
+    "realized_pnl": "realized_pnl",
+    "net_pnl_pct": "net_pnl_pct",
+    "total_fees": "total_fees",
+    "overall_score": "overall_score",
+}
+_TEXT_COLUMNS = ("symbol_name", "direction", "strategy_type", "score_grade", "currency")
+_DATE_COLUMNS = ("open_date", "close_date", "open_time", "close_time")
+
+DataVersion = Tuple[int, Optional[int], Optional[str]]
+
+
+def _floats(values) -> np.ndarray:
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=float)
+
+
+def _build_frame(rows: list) -> pd.DataFrame:
+    columns = list(zip(*rows)) if rows else [()] * len(ROW_COLUMNS)
+    raw = {col.key: values for col, values in zip(ROW_COLUMNS, columns)}
+
+    df = pd.DataFrame({
+        "id": np.array(raw["id"], dtype=np.int64),
+        "symbol": pd.Categorical(raw["symbol"]),
+    })
+    for name in _TEXT_COLUMNS:
+        df[name] = pd.Series(raw[name], dtype=object)
+    df["is_option"] = np.array([bool(v) for v in raw["is_option"]], dtype=bool)
+    for name in _DATE_COLUMNS:
+        df[name] = pd.to_datetime(pd.Series(raw[name], dtype=object))
+    for source, name in _FLOAT_COLUMNS.items():
+        df[name] = _floats(raw[source])
+
+    currency = df["currency"].fillna("USD").astype(str).str.upper()
+    rate = currency.map(EXCHANGE_RATES).fillna(1.0).to_numpy(dtype=float)
+    df["pnl_usd"] = np.nan_to_num(df["net_pnl"].to_numpy()) * rate
+    df["fees_usd"] = np.nan_to_num(df["total_fees"].to_numpy()) * rate
+    df["gross_pnl_usd"] = np.where(
+        df["realized_pnl"].notna(),
+        df["realized_pnl"].to_numpy() * rate,
+        df["pnl_usd"] + df["fees_usd"],
+    )
+    df["is_winner"] = (df["net_pnl"] > 0).to_numpy()
+    df["is_loser"] = (df["net_pnl"] < 0).to_numpy()
+
+    # NaT 的 int64 表示是最小值，排在最前
+    order = np.lexsort((df["id"].to_numpy(), df["close_date"].to_numpy().view(np.int64)))
+    chrono_rank = np.empty(len(df), dtype=np.int64)
+    chrono_rank[order] = np.arange(len(df))
+    df["chrono_rank"] = chrono_rank
+    return df
+
+
+class PositionFrame:
+    """
+    某个数据版本下全部已平仓持仓的列式快照（只读）
+
+    Attributes:
+        version: 构建时的 data_version
+        df: 列式数据（见模块说明）
+        rows: 与 df 行号一一对应的原始行（字段名同 Position）
+    """
+
+    def __init__(self, version: DataVersion, rows: list):
+        self.version = version
+        self.rows = rows
+        self.df = _build_frame(rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def select(
+        self,
+        date_start: Optional[date] = None,
+        date_end: Optional[date] = None,
+        chronological: bool = False,
+    ) -> pd.DataFrame:
+        """
+        按 close_date 过滤（与端点原来的 SQL 条件相同：有过滤条件时 close_date 为空的行被排除）
+
+        chronological=True 时按 (close_date, id) 排序
+        """
+        df = self.df
+        if date_start:
+            df = df[df["close_date"] >= pd.Timestamp(date_start)]
+        if date_end:
+            df = df[df["close_date"] <= pd.Timestamp(date_end)]
+        if chronological:
+            df = df.sort_values("chrono_rank")
+        return df
+
+    def records(self, df: Optional[pd.DataFrame] = None) -> list:
+        """df（默认全部）对应的原始行，顺序同 df"""
+        if df is None:
+            return list(self.rows)
+        return [self.rows[i] for i in df.index]
+
+
+_frames: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_frames_lock = threading.Lock()
+_build_locks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def data_version(db: Session) -> DataVersion:
+    """持仓表的数据版本（一条聚合查询）"""
+    count, max_id, max_updated = db.execute(
+        select(func.count(Position.id), func.max(Position.id), func.max(Position.updated_at))
+    ).one()
+    return (count, max_id, str(max_updated) if max_updated is not None else None)
+
+
+def _engine_of(db: Session):
+    bind = db.get_bind()
+    return getattr(bind, "engine", bind)
+
+
+def get_position_frame(db: Session) -> PositionFrame:
+    """当前数据版本的快照；版本未变时复用缓存，同一 engine 并发请求只构建一次"""
+    engine = _engine_of(db)
+    with _frames_lock:
+        build_lock = _build_locks.setdefault(engine, threading.Lock())
+
+    with build_lock:
+        version = data_version(db)
+        frame = _frames.get(engine)
+        if frame is not None and frame.version == version:
+            return frame
+
+        rows = db.execute(
+            select(*ROW_COLUMNS)
+            .where(Position.status == PositionStatus.CLOSED)
+            .order_by(Position.id)
+        ).all()
+        frame = PositionFrame(version, rows)
+        with _frames_lock:
+            _frames[engine] = frame
+        return frame
+
+
+def clear_position_frames() -> None:
+    """丢弃全部缓存的快照"""
+    with _frames_lock:
+        _frames.clear()
+
+
+# ==================== 共用聚合 ====================
+
+
+def daily_pnl(df: pd.DataFrame, skip_zero: bool = False) -> pd.Series:
+    """
+    按 close_date 汇总的 USD 日盈亏（按日期升序）
+
+    只统计 close_date 与 net_pnl 都存在的持仓；skip_zero=True 时同时跳过 net_pnl == 0
+    （对应原来 `if p.close_date and p.net_pnl` 的写法，全为 0 的日期不出现）
+    """
+    mask = df["close_date"].notna() & df["net_pnl"].notna()
+    if skip_zero:
+        mask &= df["net_pnl"] != 0
+    subset = df[mask]
+    return subset.groupby("close_date", sort=True)["pnl_usd"].sum()
+
+
+def drawdown_curve(daily: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """(累计盈亏, 峰值)；峰值从 0 起算"""
+    cumulative = np.cumsum(daily.to_numpy(dtype=float))
+    peak = np.maximum.accumulate(np.maximum(cumulative, 0.0)) if len(cumulative) else cumulative
+    return cumulative, peak
+
+
+def drawdown_stats(daily: pd.Series) -> Tuple[float, Optional[float]]:
+    """(最大回撤, 最大回撤占峰值百分比)"""
+    if daily.empty:
+        return 0.0, None
+    cumulative, peak = drawdown_curve(daily)
+    max_drawdown = max(0.0, float(np.max(peak - cumulative)))
+    final_peak = float(peak[-1])
+    if final_peak > 0 and final_peak >= max_drawdown:
+        return max_drawdown, min(max_drawdown / final_peak * 100, 100.0)
+    return max_drawdown, None
+
+
+def sharpe_ratio(daily: pd.Series, risk_free_rate: float = 0.05) -> Optional[float]:
+    """日盈亏序列的年化 Sharpe（样本标准差）"""
+    returns = daily.to_numpy(dtype=float)
+    if len(returns) <= 1:
+        return None
+    daily_volatility = float(np.std(returns, ddof=1))
+    if daily_volatility <= 0:
+        return None
+    return ((float(np.mean(returns)) - risk_free_rate / 252) / daily_volatility) * np.sqrt(252)
+
+
+def group_summary(df: pd.DataFrame, keys) -> pd.DataFrame:
+    """
+    分组汇总：count / total_pnl(USD) / winners / holding_total / holding_count
+
+    分组按首次出现顺序排列；holding 只统计持仓天数 > 0 的行（与原来 `if p.holding_period_days` 一致）
+    """
+    holding = df["holding_days"].where(df["holding_days"] > 0)
+    grouped = df.assign(_holding=holding).groupby(keys, sort=False, observed=True, dropna=False)
+    return pd.DataFrame({
+        "count": grouped.size(),
+        "total_pnl": grouped["pnl_usd"].sum(),
+        "winners": grouped["is_winner"].sum(),
+        "holding_total": grouped["_holding"].sum(),
+        "holding_count": grouped["_holding"].count(),
+    })
+
+
+def longest_runs(flags: np.ndarray) -> Tuple[int, int]:
+    """布尔序列中最长的连续 True 与连续 False 长度"""
+    if len(flags) == 0:
+        return 0, 0
+    flags = np.asarray(flags, dtype=bool)
+    boundaries = np.flatnonzero(np.diff(flags.astype(np.int8))) + 1
+    starts = np.concatenate(([0], boundaries))
+    lengths = np.diff(np.concatenate((starts, [len(flags)])))
+    values = flags[starts]
+    longest_true = int(lengths[values].max()) if values.any() else 0
+    longest_false = int(lengths[~values].max()) if (~values).any() else 0
+    return longest_true, longest_false
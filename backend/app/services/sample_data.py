@@ -18,6 +18,8 @@ from src.importers.incremental_importer import IncrementalImporter
 from src.matchers.fifo_matcher import FIFOMatcher
 from src.models.base import create_all_tables, get_session, init_database
 
+from ..core.response_cache import bump_data_version
+
 
 SAMPLE_CSV_PATH = Path(__file__).parent.parent / "sample_data" / "ph_sample_trades.csv"
 
@@ -64,6 +66,7 @@ def import_sample_dataset(
         raise
     finally:
         session.close()
+    bump_data_version(database_url)
 
     return {
         "total_rows": import_result.total_rows,
@@ -0,0 +1,136 @@
+"""
+分析流水线阶段计时
+
+input: TaskManager._run_csv_analysis 的各阶段 (import / match / market_data / score / events)
+output: StageTimer - stage() 记录实测耗时与处理量，to_dict() 生成任务结果里的 timings
+pos: 后端服务层 - 任务结果中的阶段耗时/吞吐分解，进度日志不再靠固定 sleep 控制节奏
+
+timings 结构:
+    {
+        "total_seconds": 3.42,
+        "stages": {
+            "import": {"seconds": 0.81, "items": 1200, "unit": "rows", "per_second": 1481.5, "status": "ok"},
+            ...
+        }
+    }
+status: ok / failed（阶段内抛出异常）/ skipped（无新交易时的配对、行情、评分、事件阶段）
+
+一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional
+
+PIPELINE_STAGES = ("import", "match", "market_data", "score", "events")
+
+# 各阶段 items 的计量单位
+STAGE_UNITS = {
+    "import": "rows",
+    "match": "trades",
+    "market_data": "symbols",
+    "score": "positions",
+    "events": "positions",
+}
+
+STAGE_LABELS = {
+    "import": "数据导入",
+    "match": "持仓配对",
+    "market_data": "市场数据",
+    "score": "质量评分",
+    "events": "事件检测",
+}
+
+
+@dataclass
+class StageTiming:
+    """单个阶段的耗时与处理量"""
+    name: str
+    unit: str = ""
+    seconds: float = 0.0
+    items: int = 0
+    status: str = "ok"
+
+    @property
+    def label(self) -> str:
+        return STAGE_LABELS.get(self.name, self.name)
+
+    @property
+    def per_second(self) -> Optional[float]:
+        if self.seconds <= 0 or not self.items:
+            return None
+        return self.items / self.seconds
+
+    def to_dict(self) -> dict:
+        per_second = self.per_second
+        return {
+            "seconds": round(self.seconds, 3),
+            "items": self.items,
+            "unit": self.unit,
+            "per_second": round(per_second, 1) if per_second is not None else None,
+            "status": self.status,
+        }
+
+    def describe(self) -> str:
+        """日志用的一行摘要，如 "数据导入耗时 0.81s (1200 rows, 1481/s)" """
+        text = f"{self.label}耗时 {self.seconds:.2f}s"
+        if self.items:
+            text += f" ({self.items} {self.unit}"
+            if self.per_second is not None:
+                text += f", {self.per_second:.0f}/s"
+            text += ")"
+        return text
+
+
+class StageTimer:
+    """按阶段记录实测耗时（time.perf_counter），阶段按首次进入的顺序输出"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self._started = clock()
+        self.stages: Dict[str, StageTiming] = {}
+
+    @contextmanager
+    def stage(self, name: str, unit: Optional[str] = None) -> Iterator[StageTiming]:
+        """
+        计时一个阶段；在 with 块内设置 timing.items 记录处理量
+
+        阶段内抛出异常时标记为 failed 并继续抛出
+        """
+        timing = StageTiming(name=name, unit=unit or STAGE_UNITS.get(name, ""))
+        self.stages[name] = timing
+        started = self._clock()
+        try:
+            yield timing
+        except BaseException:
+            timing.status = "failed"
+            raise
+        finally:
+            timing.seconds = self._clock() - started
+
+    def skip(self, name: str, unit: Optional[str] = None) -> StageTiming:
+        """记录未执行的阶段"""
+        timing = StageTiming(name=name, unit=unit or STAGE_UNITS.get(name, ""), status="skipped")
+        self.stages[name] = timing
+        return timing
+
+    @property
+    def total_seconds(self) -> float:
+        return self._clock() - self._started
+
+    def to_dict(self) -> dict:
+        return {
+            "total_seconds": round(self.total_seconds, 3),
+            "stages": {name: timing.to_dict() for name, timing in self.stages.items()},
+        }
+
+    def summary(self) -> str:
+        """各阶段耗时的单行汇总，如 "数据导入 0.81s | 持仓配对 0.12s | 总计 1.02s" """
+        parts = [
+            f"{timing.label} {timing.seconds:.2f}s"
+            for timing in self.stages.values()
+            if timing.status != "skipped"
+        ]
+        parts.append(f"总计 {self.total_seconds:.2f}s")
+        return " | ".join(parts)
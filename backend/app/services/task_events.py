@@ -0,0 +1,157 @@
+"""
+任务进度的进程内发布/订阅
+
+input: TaskManager._update_task_status / _add_log 发布的状态与日志条目
+output: task_event_bus 单例 - publish_state() / publish_log() / subscribe() / unsubscribe()
+pos: 后端服务层 - GET /tasks/{task_id}/events（SSE）的数据来源，进度推送不读数据库
+
+每个任务一个频道 (database_url, task_id):
+    - state: 最新的 status / progress / current_step（结束时含 result / error_message）
+    - logs: 最近 TASK_EVENT_LOG_WINDOW 条日志（带任务内序号 seq，与 task_logs 表一致）
+    - 订阅者: asyncio.Queue + 所属事件循环；发布方是任务线程，用 call_soon_threadsafe 投递
+
+subscribe() 在同一把锁内登记队列并拷贝快照，快照之后发布的事件都会进入队列，不丢不重。
+频道在任务结束 TASK_EVENT_RETAIN_SECONDS 秒后回收；其他进程创建的任务不在本进程的总线上，
+订阅返回 None，由端点退回到读数据库。
+
+一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import config
+from src.models.task import TaskStatus
+
+TERMINAL_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+
+@dataclass
+class TaskEvent:
+    """推送给订阅者的事件: kind 为 state / log"""
+    kind: str
+    data: dict
+
+    @property
+    def terminal(self) -> bool:
+        return self.kind == "state" and self.data.get("status") in TERMINAL_STATUSES
+
+
+@dataclass
+class Subscription:
+    key: Tuple[str, str]
+    loop: asyncio.AbstractEventLoop
+    queue: "asyncio.Queue[TaskEvent]"
+    state: dict
+    logs: List[dict]
+
+    @property
+    def first_buffered_seq(self) -> Optional[int]:
+        return self.logs[0]["seq"] if self.logs else None
+
+
+@dataclass
+class _Channel:
+    state: dict
+    logs: Deque[dict]
+    subscribers: Set[int] = field(default_factory=set)
+    finished_at: Optional[float] = None
+
+
+class TaskEventBus:
+    """进程内任务事件总线（线程安全）"""
+
+    def __init__(self, log_window: Optional[int] = None, retain_seconds: Optional[float] = None):
+        self.log_window = log_window or getattr(config, 'TASK_EVENT_LOG_WINDOW', 2000)
+        self.retain_seconds = (
+            retain_seconds if retain_seconds is not None
+            else getattr(config, 'TASK_EVENT_RETAIN_SECONDS', 300)
+        )
+        self._channels: Dict[Tuple[str, str], _Channel] = {}
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._lock = threading.Lock()
+
+    def open(self, database_url: str, task_id: str, **state) -> None:
+        """任务创建时登记频道"""
+        with self._lock:
+            self._prune_locked()
+            self._channels[(database_url, task_id)] = _Channel(
+                state=dict(state), logs=deque(maxlen=self.log_window)
+            )
+
+    def publish_state(self, database_url: str, task_id: str, **state) -> None:
+        with self._lock:
+            channel = self._channels.get((database_url, task_id))
+            if channel is None:
+                return
+            channel.state.update(state)
+            if channel.state.get("status") in TERMINAL_STATUSES:
+                channel.finished_at = time.monotonic()
+            self._deliver_locked(channel, TaskEvent("state", dict(channel.state)))
+
+    def publish_log(self, database_url: str, task_id: str, entry: dict) -> None:
+        with self._lock:
+            channel = self._channels.get((database_url, task_id))
+            if channel is None:
+                return
+            channel.logs.append(entry)
+            self._deliver_locked(channel, TaskEvent("log", entry))
+
+    def subscribe(
+        self,
+        database_url: str,
+        task_id: str,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> Optional[Subscription]:
+        """登记订阅并返回当前快照；任务不在本进程的总线上时返回 None"""
+        loop = loop or asyncio.get_running_loop()
+        key = (database_url, task_id)
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                return None
+            subscription = Subscription(
+                key=key,
+                loop=loop,
+                queue=asyncio.Queue(),
+                state=dict(channel.state),
+                logs=list(channel.logs),
+            )
+            self._subscriptions[id(subscription)] = subscription
+            channel.subscribers.add(id(subscription))
+            return subscription
+
+    def unsubscribe(self, subscription: Optional[Subscription]) -> None:
+        if subscription is None:
+            return
+        with self._lock:
+            self._subscriptions.pop(id(subscription), None)
+            channel = self._channels.get(subscription.key)
+            if channel is not None:
+                channel.subscribers.discard(id(subscription))
+
+    def _deliver_locked(self, channel: _Channel, event: TaskEvent) -> None:
+        for subscription_id in channel.subscribers:
+            subscription = self._subscriptions[subscription_id]
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.queue.put_nowait, event)
+            except RuntimeError:
+                # 订阅方的事件循环已关闭，等它 unsubscribe
+                pass
+
+    def _prune_locked(self) -> None:
+        cutoff = time.monotonic() - self.retain_seconds
+        for key in [
+            key for key, channel in self._channels.items()
+            # 结束事件已经投递给所有订阅方，不必等它们断开
+            if channel.finished_at is not None and channel.finished_at <= cutoff
+        ]:
+            for subscription_id in self._channels.pop(key).subscribers:
+                self._subscriptions.pop(subscription_id, None)
+
+
+task_event_bus = TaskEventBus()
@@ -0,0 +1,247 @@
+"""
+任务日志缓冲写入器
+
+input: TaskManager 的日志条目 (database_url, task_id, message, level, category), config.TASK_LOG_*
+output: task_log_sink 单例 - append() 缓冲（返回带 seq 的条目）、flush() 批量写入 task_logs、read() 分页读取
+pos: 后端服务层 - 替代逐条 "读 Task → 复制整个 logs JSON → 提交" 的写法
+
+写入模型:
+    append() 只在内存里追加并分配任务内序号 seq，不碰数据库；
+    缓冲条数达到 TASK_LOG_BATCH_SIZE 时唤醒后台线程立即写入，否则后台线程每
+    TASK_LOG_FLUSH_INTERVAL 秒批量 INSERT 一次（每个数据库一个事务）。
+    read() 按 (task_id, seq) 索引分页查询，再合并尚未落库的缓冲，读到的总是最新日志。
+
+连接:
+    task_logs 走本模块自己的 engine（每个 URL 一个，SQLite 文件库用 NullPool），不经过
+    src.models.base 的 StaticPool。那个连接由任务线程的导入/配对/评分事务共用，
+    在别的线程上 close/rollback 会丢掉任务已 flush 未提交的数据。
+    任务事务持有写锁时 INSERT 等待 TASK_LOG_LOCK_TIMEOUT 秒，超时的批次放回缓冲下次重试，不丢日志。
+    所以写库只在后台线程（或显式 flush()/finish_task()）进行，不在 append() 的调用线程上等锁。
+
+seq 在本进程内分配：新任务由 start_task() 从 0 开始，其他任务首次追加时查一次 MAX(seq)。
+
+一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool, StaticPool
+
+import config
+from src.models.task import TaskLog
+
+logger = logging.getLogger(__name__)
+
+
+def _entry(row: dict) -> dict:
+    entry = {"seq": row["seq"], "time": row["time"], "level": row["level"], "message": row["message"]}
+    if row["category"]:
+        entry["category"] = row["category"]
+    return entry
+
+
+class TaskLogSink:
+    """按数据库 URL 缓冲任务日志，定时或按批量写入 task_logs 表"""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        lock_timeout: Optional[float] = None,
+    ):
+        self.batch_size = batch_size or getattr(config, 'TASK_LOG_BATCH_SIZE', 200)
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else getattr(config, 'TASK_LOG_FLUSH_INTERVAL', 0.5)
+        )
+        self.lock_timeout = (
+            lock_timeout if lock_timeout is not None
+            else getattr(config, 'TASK_LOG_LOCK_TIMEOUT', 5.0)
+        )
+        self._buffers: Dict[str, List[dict]] = {}
+        # 正在写入的批次（已移出缓冲、尚未提交），read() 合并它们
+        self._in_flight: Dict[str, List[dict]] = {}
+        self._next_seq: Dict[Tuple[str, str], int] = {}
+        self._engines: Dict[str, Engine] = {}
+        self._lock = threading.Lock()
+        # 串行化写入（SQLite 单写者）；与 _lock 分开，写库期间 append() 不被阻塞
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start_task(self, database_url: str, task_id: str) -> None:
+        """登记新建的任务，序号从 0 开始（省去一次 MAX(seq) 查询）"""
+        with self._lock:
+            self._next_seq.setdefault((database_url, task_id), 0)
+
+    def finish_task(self, database_url: str, task_id: str) -> None:
+        """任务结束：写入缓冲并释放序号计数"""
+        self.flush(database_url)
+        with self._lock:
+            self._next_seq.pop((database_url, task_id), None)
+
+    def append(
+        self,
+        database_url: str,
+        task_id: str,
+        message: str,
+        level: str = "info",
+        category: Optional[str] = None,
+    ) -> dict:
+        """追加一条日志，返回带 seq 的条目（结构同 read() 的结果）"""
+        key = (database_url, task_id)
+        with self._lock:
+            seq = self._next_seq.get(key)
+        if seq is None:
+            stored = self._stored_count(database_url, task_id)
+            with self._lock:
+                self._next_seq.setdefault(key, stored)
+
+        with self._lock:
+            seq = self._next_seq[key]
+            self._next_seq[key] = seq + 1
+            buffer = self._buffers.setdefault(database_url, [])
+            row = {
+                "task_id": task_id,
+                "seq": seq,
+                "time": datetime.utcnow().isoformat(),
+                "level": level,
+                "category": category,
+                "message": message,
+            }
+            buffer.append(row)
+            self._ensure_thread()
+            if len(buffer) >= self.batch_size:
+                # 调用线程可能正持有自己的写事务，交给后台线程写入
+                self._wake.set()
+        return _entry(row)
+
+    def flush(self, database_url: Optional[str] = None) -> int:
+        """写入缓冲（默认全部数据库），返回写入条数"""
+        written = 0
+        with self._write_lock:
+            with self._lock:
+                urls = [database_url] if database_url else list(self._buffers)
+                batches = [(url, self._buffers.pop(url, [])) for url in urls]
+                for url, rows in batches:
+                    if rows:
+                        self._in_flight[url] = rows
+            for url, rows in batches:
+                if not rows:
+                    continue
+                try:
+                    self._insert(url, rows)
+                    written += len(rows)
+                except Exception as e:
+                    logger.warning(f"Deferred {len(rows)} task logs for {url}: {e}")
+                    with self._lock:
+                        # 放回缓冲头部，下次重试
+                        self._buffers[url] = rows + self._buffers.get(url, [])
+                finally:
+                    with self._lock:
+                        self._in_flight.pop(url, None)
+        return written
+
+    def read(
+        self,
+        database_url: str,
+        task_id: str,
+        offset: Optional[int] = None,
+        limit: int = 1000,
+    ) -> Tuple[List[dict], int, int]:
+        """
+        分页读取任务日志
+
+        Args:
+            offset: 起始序号；None 表示最后 limit 条
+            limit: 最多返回条数
+
+        Returns:
+            (日志条目, 起始序号, 日志总数)
+        """
+        with self._lock:
+            pending = {
+                row["seq"]: row
+                for rows in (self._in_flight.get(database_url, []), self._buffers.get(database_url, []))
+                for row in rows
+                if row["task_id"] == task_id
+            }
+        total = max([self._stored_count(database_url, task_id), *(seq + 1 for seq in pending)])
+        if offset is None:
+            offset = max(total - limit, 0)
+
+        with Session(self._engine(database_url)) as session:
+            rows = session.execute(
+                select(TaskLog)
+                .where(TaskLog.task_id == task_id, TaskLog.seq >= offset)
+                .order_by(TaskLog.seq)
+                .limit(limit)
+            ).scalars().all()
+            entries = {row.seq: dict(row.to_dict(), seq=row.seq) for row in rows}
+        # 写入中途读到的批次可能已提交，按 seq 去重
+        for seq, row in pending.items():
+            if seq >= offset:
+                entries.setdefault(seq, _entry(row))
+        return [entries[seq] for seq in sorted(entries)[:limit]], offset, total
+
+    def _stored_count(self, database_url: str, task_id: str) -> int:
+        with self._engine(database_url).connect() as connection:
+            last = connection.execute(
+                select(func.max(TaskLog.seq)).where(TaskLog.task_id == task_id)
+            ).scalar()
+        return 0 if last is None else last + 1
+
+    def _insert(self, database_url: str, rows: List[dict]) -> None:
+        with self._engine(database_url).begin() as connection:
+            connection.execute(insert(TaskLog), rows)
+
+    def _engine(self, database_url: str) -> Engine:
+        """task_logs 专用 engine（不与任务线程共用连接），首次使用时确保表存在"""
+        with self._lock:
+            engine = self._engines.get(database_url)
+        if engine is not None:
+            return engine
+
+        if database_url.startswith('sqlite'):
+            kwargs = {"connect_args": {"check_same_thread": False, "timeout": self.lock_timeout}}
+            if make_url(database_url).database in (None, "", ":memory:"):
+                kwargs["poolclass"] = StaticPool
+            else:
+                # 每次写入新开连接：不长期占用 workspace 文件，删除 workspace 时无需 dispose
+                kwargs["poolclass"] = NullPool
+            engine = create_engine(database_url, **kwargs)
+        else:
+            engine = create_engine(database_url, pool_pre_ping=True)
+        TaskLog.__table__.create(engine, checkfirst=True)
+
+        with self._lock:
+            existing = self._engines.setdefault(database_url, engine)
+        if existing is not engine:
+            engine.dispose()
+        return existing
+
+    def _ensure_thread(self) -> None:
+        # 调用方持有 self._lock
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="task-log-sink", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Task log flush failed: {e}")
+
+
+task_log_sink = TaskLogSink()
@@ -6,12 +6,16 @@ output: 任务创建、执行、状态追踪
 pos: 后端服务层 - 管理异步分析任务的执行，支持匿名 workspace 隔离
 
 功能:
-- 异步任务执行 (ThreadPoolExecutor)
-- 详细处理日志 (每条交易/持仓/评分/事件)
+- 异步任务执行 (ThreadPoolExecutor)；TASK_QUEUE_ENABLED 时改为写入 job_queue，由 worker 进程执行 run_job()
+- 追加导入时增量配对 (只重放新交易涉及的标的)
+- 分阶段执行 (import/match/market_data/score/events)，StageTimer 记录实测耗时与吞吐，结果附带 timings
+- 详细处理日志 (每条交易/持仓/评分/事件)，经 task_log_sink 缓冲后批量写入 task_logs 表
+- 状态与日志同时发布到 task_event_bus（SSE 进度推送）
 - 进度追踪 (0-100%)
 - 市场数据源不可用时降级继续分析
 - 事件检测 (财报/价格异常/成交量异常)
 - 完成通知 (邮件)
+- 任务结束/清空数据后递增 workspace 数据版本（分析端点响应缓存失效）
 
 一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
 """
@@ -26,6 +30,7 @@ from datetime import datetime
 from typing import Optional, Callable, List
 from concurrent.futures import ThreadPoolExecutor
 import threading
+from contextlib import contextmanager
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
@@ -34,13 +39,25 @@ sys.path.insert(0, str(PROJECT_ROOT))
 import config
 from src.models.base import init_database, get_session, create_all_tables
 from src.models.task import Task, TaskStatus, TaskType
+from ..core.response_cache import bump_data_version
+from .task_events import task_event_bus
+from .task_log_sink import task_log_sink
+from .job_queue import job_queue
+from .stage_timer import PIPELINE_STAGES, StageTimer, StageTiming
 
 logger = logging.getLogger(__name__)
 
 # 日志配置
-MAX_LOGS = 1000  # 最大日志条数（增加以容纳更多日志）
-LOG_BATCH_SIZE = 1  # 每条都记录，让日志更频繁
-import time  # 用于添加小延迟让动画更明显
+MAX_LOGS = 1000  # get_task 默认返回的日志条数（最后 MAX_LOGS 条）
+
+# 阶段耗时日志写入的分类（与各阶段自身日志一致）
+STAGE_LOG_CATEGORIES = {
+    "import": "import",
+    "match": "match",
+    "market_data": "data",
+    "score": "score",
+    "events": "events",
+}
 
 
 class TaskManager:
@@ -71,9 +88,14 @@ class TaskManager:
         self._executor = ThreadPoolExecutor(max_workers=max_workers)
         self._tasks = {}  # task_id -> Future
         self._task_database_urls = {}  # task_id -> database_url
+        # 作业写入持久化队列，由独立 worker 进程执行（python -m backend.app.worker）
+        self.queue_enabled = bool(getattr(config, 'TASK_QUEUE_ENABLED', False))
         self._initialized = True
 
-        logger.info(f"TaskManager initialized with {max_workers} workers")
+        if self.queue_enabled:
+            logger.info(f"TaskManager initialized in queue mode ({job_queue.database_url})")
+        else:
+            logger.info(f"TaskManager initialized with {max_workers} workers")
 
     def create_task(
         self,
@@ -120,18 +142,49 @@ class TaskManager:
                 file_hash=file_hash,
                 file_size=file_size,
                 email=email,
-                logs=[]
             )
-            task.add_log("任务已创建")
 
             session.add(task)
             session.commit()
+            if self.queue_enabled:
+                # 任务在别的进程执行：不开本进程的总线频道（SSE 退回读数据库），
+                # 日志立即落库，worker 从 MAX(seq)+1 接着编号
+                task_log_sink.start_task(db_url, task_id)
+                self._add_log(task_id, "任务已创建，排队等待执行", database_url=db_url)
+                task_log_sink.finish_task(db_url, task_id)
+            else:
+                task_event_bus.open(
+                    db_url,
+                    task_id,
+                    status=task.status,
+                    progress=task.progress,
+                    current_step=task.current_step,
+                )
+                task_log_sink.start_task(db_url, task_id)
+                self._add_log(task_id, "任务已创建", database_url=db_url)
 
             logger.info(f"Task created: {task_id}")
 
         finally:
             session.close()
 
+        if self.queue_enabled:
+            try:
+                job_queue.enqueue(
+                    task_id,
+                    db_url,
+                    {
+                        "file_path": job_queue.stage_upload(file_path, task_id),
+                        "replace_mode": replace_mode,
+                    },
+                )
+            except Exception as e:
+                self._update_task_status(
+                    task_id, TaskStatus.FAILED, error=f"任务入队失败: {e}", database_url=db_url
+                )
+                raise
+            return task_id
+
         # 提交到线程池执行
         future = self._executor.submit(
             self._run_csv_analysis,
@@ -144,27 +197,46 @@ class TaskManager:
 
         return task_id
 
-    def get_task(self, task_id: str, database_url: Optional[str] = None) -> Optional[dict]:
+    def get_task(
+        self,
+        task_id: str,
+        database_url: Optional[str] = None,
+        log_offset: Optional[int] = None,
+        log_limit: int = MAX_LOGS,
+    ) -> Optional[dict]:
         """
         获取任务状态
 
         Args:
             task_id: 任务ID
+            log_offset: 日志起始序号（None 表示最后 log_limit 条）
+            log_limit: 最多返回的日志条数
 
         Returns:
-            任务信息字典，不存在返回 None
+            任务信息字典（含 logs / log_offset / log_total），不存在返回 None
         """
-        init_database(self._database_url_for_task(task_id, database_url), echo=False)
+        db_url = self._database_url_for_task(task_id, database_url)
+        init_database(db_url, echo=False)
         session = get_session()
 
         try:
             task = session.query(Task).filter(Task.task_id == task_id).first()
-            if task:
-                return task.to_dict()
-            return None
+            if not task:
+                return None
+            data = task.to_dict()
         finally:
             session.close()
 
+        logs, offset, total = task_log_sink.read(db_url, task_id, log_offset, log_limit)
+        if total == 0 and data["logs"]:
+            # 旧版本任务：日志内联在 tasks.logs 列
+            legacy = data["logs"]
+            start = max(len(legacy) - log_limit, 0) if log_offset is None else log_offset
+            logs, offset, total = legacy[start:start + log_limit], start, len(legacy)
+
+        data.update(logs=logs, log_offset=offset, log_total=total)
+        return data
+
     def cancel_task(self, task_id: str, database_url: Optional[str] = None) -> bool:
         """
         取消任务
@@ -175,6 +247,17 @@ class TaskManager:
         Returns:
             是否成功取消
         """
+        if self.queue_enabled:
+            if job_queue.cancel(task_id):
+                self._update_task_status(
+                    task_id,
+                    TaskStatus.CANCELLED,
+                    database_url=database_url,
+                )
+                logger.info(f"Queued task cancelled: {task_id}")
+                return True
+            return False
+
         if task_id in self._tasks:
             future = self._tasks[task_id]
             if future.cancel():
@@ -188,6 +271,50 @@ class TaskManager:
 
         return False
 
+    def run_job(self, job) -> None:
+        """
+        执行一个队列作业（在 worker 进程中调用）
+
+        Args:
+            job: job_queue.claim() 返回的 Job，job_id 即 task_id，workspace 为数据库 URL
+        """
+        self._task_database_urls[job.job_id] = job.workspace
+        if job.attempts > 1:
+            self._add_log(
+                job.job_id,
+                f"上一次执行中断，第 {job.attempts}/{job.max_attempts} 次尝试",
+                "warning",
+                "system",
+            )
+        self._run_csv_analysis(
+            job.job_id,
+            job.payload["file_path"],
+            job.payload.get("replace_mode", True),
+            job.workspace,
+            job=job,
+        )
+
+    def fail_task(
+        self,
+        task_id: str,
+        database_url: str,
+        error: str,
+        file_path: Optional[str] = None,
+    ) -> None:
+        """把任务标记为失败并删除上传文件（worker 放弃作业时调用；_run_csv_analysis 已记录失败时不重复写入）"""
+        init_database(database_url, echo=False)
+        session = get_session()
+        try:
+            status = session.query(Task.status).filter(Task.task_id == task_id).scalar()
+        finally:
+            session.close()
+        if status != TaskStatus.FAILED:
+            self._update_task_status(task_id, TaskStatus.FAILED, error=error, database_url=database_url)
+        task_log_sink.finish_task(database_url, task_id)
+        bump_data_version(database_url)
+        if file_path:
+            Path(file_path).unlink(missing_ok=True)
+
     def _update_task_status(
         self,
         task_id: str,
@@ -215,14 +342,12 @@ class TaskManager:
 
             if step:
                 task.current_step = step
-                task.add_log(step)
 
             if result:
                 task.result = result
 
             if error:
                 task.error_message = error
-                task.add_log(error, level="error")
 
             if status == TaskStatus.RUNNING and not task.started_at:
                 task.started_at = datetime.utcnow()
@@ -231,15 +356,29 @@ class TaskManager:
                 task.completed_at = datetime.utcnow()
 
             session.commit()
+            state = {
+                "status": task.status,
+                "progress": task.progress,
+                "current_step": task.current_step,
+            }
+            if status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]:
+                state.update(result=task.result, error_message=task.error_message)
 
         except Exception as e:
             logger.error(f"Failed to update task {task_id}: {e}")
             session.rollback()
+            return
         finally:
             session.close()
 
-    # 日志写入锁（SQLite 不支持并发写入）
-    _log_lock = threading.Lock()
+        if step:
+            self._add_log(task_id, step, database_url=database_url)
+        if error:
+            self._add_log(task_id, error, "error", database_url=database_url)
+        # 结束状态在最后一条日志之后发布，订阅方收到结束事件时日志已完整
+        task_event_bus.publish_state(
+            self._database_url_for_task(task_id, database_url), task_id, **state
+        )
 
     def _add_log(
         self,
@@ -250,7 +389,7 @@ class TaskManager:
         database_url: Optional[str] = None,
     ):
         """
-        添加日志条目（不更新进度）
+        添加日志条目（不更新进度，只写入内存缓冲，由 task_log_sink 批量落库，同时推送给 SSE 订阅方）
 
         Args:
             task_id: 任务ID
@@ -258,38 +397,9 @@ class TaskManager:
             level: 日志级别 (info/success/warning/error)
             category: 日志分类 (import/match/score/system)
         """
-        with self._log_lock:  # 串行化数据库写入
-            init_database(self._database_url_for_task(task_id, database_url), echo=False)
-            session = get_session()
-
-            try:
-                task = session.query(Task).filter(Task.task_id == task_id).first()
-                if not task:
-                    return
-
-                log_entry = {
-                    "time": datetime.utcnow().isoformat(),
-                    "level": level,
-                    "message": message,
-                }
-                if category:
-                    log_entry["category"] = category
-
-                if task.logs is None:
-                    task.logs = []
-
-                # 限制日志数量
-                if len(task.logs) >= MAX_LOGS:
-                    task.logs = task.logs[-(MAX_LOGS - 1):]
-
-                task.logs = task.logs + [log_entry]  # 创建新列表触发SQLAlchemy更新
-                session.commit()
-
-            except Exception as e:
-                logger.error(f"Failed to add log for task {task_id}: {e}")
-                session.rollback()
-            finally:
-                session.close()
+        db_url = self._database_url_for_task(task_id, database_url)
+        entry = task_log_sink.append(db_url, task_id, message, level, category)
+        task_event_bus.publish_log(db_url, task_id, entry)
 
     def _database_url_for_task(
         self,
@@ -304,17 +414,28 @@ class TaskManager:
         file_path: str,
         replace_mode: bool,
         database_url: str,
+        job=None,
     ):
         """
         执行 CSV 分析任务（带详细日志）
 
-        分为4个阶段：
-        1. 数据导入 (0-40%)
-        2. FIFO配对 (40-70%)
-        3. 质量评分 (70-95%)
-        4. 完成 (95-100%)
+        按阶段执行，每个阶段由 StageTimer 记录实测耗时与处理量，汇总写入结果的 timings：
+        1. import       数据导入 (0-40%)
+        2. match        FIFO配对 (40-70%)
+        3. market_data  市场数据获取 (70-82%)
+        4. score        质量评分 (82-90%)
+        5. events       事件检测 (90-95%)
+        无新交易时 2-5 记为 skipped
+
+        追加模式的重试（job.attempts > 1）：上一次尝试提交的交易这次被指纹去重跳过，
+        重复记录涉及的标的并入 touched_symbols，照常执行 2-5，不会因"无新交易"直接完成。
+
+        由队列 worker 执行时（job 不为 None）异常会继续抛出，交给 worker 调用 job_queue.fail() 按退避重试；
+        还有重试机会时任务回到 PENDING 并保留上传文件，最后一次尝试失败才标记 FAILED 并删除文件。
         """
         logger.info(f"Starting CSV analysis task: {task_id}")
+        retrying = False
+        timer = StageTimer()
 
         self._update_task_status(
             task_id,
@@ -325,272 +446,51 @@ class TaskManager:
         self._add_log(task_id, "任务开始执行", "info", "system")
 
         try:
-            # 导入必要的模块
-            from src.importers.english_csv_parser import detect_csv_language
-            from src.importers.incremental_importer import IncrementalImporter
-            from src.matchers.fifo_matcher import FIFOMatcher
-            from src.analyzers.quality_scorer import QualityScorer
-            from src.models.trade import Trade
-            from src.models.position import Position
-            from sqlalchemy import text
-
-            # ==================== 阶段 1: 数据导入 (0-40%) ====================
-            self._update_task_status(
-                task_id,
-                TaskStatus.RUNNING,
-                progress=10.0,
-                step="正在检测文件格式..."
-            )
-            self._add_log(task_id, "正在检测 CSV 文件格式...", "info", "import")
-
-            # 检测语言 - 添加更多步骤日志
-            self._add_log(task_id, "读取文件头信息...", "info", "import")
-            time.sleep(0.1)
-            self._add_log(task_id, "分析字段名称...", "info", "import")
-            time.sleep(0.1)
-
-            language = detect_csv_language(file_path)
-            logger.info(f"[{task_id}] Detected language: {language}")
-
-            if language == 'unknown':
-                self._add_log(task_id, "无法识别的文件格式", "error", "import")
-                raise ValueError("不支持的CSV格式，请使用富途证券导出的CSV文件")
-
-            # 格式识别成功
-            format_name = "富途英文格式" if language == 'english' else "富途中文格式"
-            self._add_log(task_id, f"✓ 检测到格式: {format_name}", "success", "import")
-            time.sleep(0.05)
-
-            # 替换模式：先清除所有旧数据
-            if replace_mode:
-                self._update_task_status(
-                    task_id,
-                    TaskStatus.RUNNING,
-                    progress=15.0,
-                    step="清除旧数据..."
+            with self._timed_stage(task_id, timer, "import") as stage:
+                language, format_name, import_result = self._import_stage(
+                    task_id, file_path, replace_mode, database_url
                 )
-                self._add_log(task_id, "正在清除旧数据...", "info", "import")
-                self._add_log(task_id, "清除交易记录表...", "info", "import")
-                time.sleep(0.05)
-                self._add_log(task_id, "清除持仓记录表...", "info", "import")
-                time.sleep(0.05)
-                self._clear_all_trading_data(database_url)
-                self._add_log(task_id, "清除导入历史表...", "info", "import")
-                time.sleep(0.05)
-                self._add_log(task_id, "✓ 旧数据已清除", "success", "import")
-
-            # 执行导入
-            self._update_task_status(
-                task_id,
-                TaskStatus.RUNNING,
-                progress=20.0,
-                step="正在导入交易数据..."
-            )
-            self._add_log(task_id, "开始解析 CSV 文件...", "info", "import")
-            self._add_log(task_id, "初始化解析器...", "info", "import")
-            time.sleep(0.05)
-            self._add_log(task_id, "读取文件内容...", "info", "import")
-            time.sleep(0.05)
-
-            importer = IncrementalImporter(
-                file_path,
-                dry_run=False,
-                database_url=database_url,
-            )
-
-            self._add_log(task_id, "解析 CSV 列结构...", "info", "import")
-            time.sleep(0.05)
-            self._add_log(task_id, "映射字段到标准格式...", "info", "import")
-            time.sleep(0.05)
-
-            import_result = importer.run()
-
-            # 添加导入详情日志 - 更详细
-            self._add_log(task_id, f"文件解析完成: 共 {import_result.total_rows} 行数据", "info", "import")
-            time.sleep(0.03)
-            self._add_log(task_id, f"已成交订单: {import_result.completed_trades} 笔", "info", "import")
-            time.sleep(0.03)
-
-            if import_result.duplicates_skipped > 0:
-                self._add_log(task_id, f"⚠ 跳过重复记录: {import_result.duplicates_skipped} 笔", "warning", "import")
-
-            if import_result.errors > 0:
-                self._add_log(task_id, f"⚠ 解析错误: {import_result.errors} 笔", "warning", "import")
-                for err_msg in import_result.error_messages[:5]:
-                    self._add_log(task_id, f"  └ {err_msg}", "warning", "import")
-                    time.sleep(0.02)
-
-            # 添加导入的每条交易详情 - 全部记录！
-            self._log_all_imported_trades(task_id, database_url)
-
-            self._update_task_status(
-                task_id,
-                TaskStatus.RUNNING,
-                progress=40.0,
-                step=f"已导入 {import_result.new_trades} 条交易记录"
-            )
-            self._add_log(
-                task_id,
-                f"✓ 导入完成: {import_result.new_trades} 条新交易已入库",
-                "success",
-                "import"
-            )
+                stage.items = import_result.total_rows
 
-            # ==================== 阶段 2: FIFO配对 (40-70%) ====================
             positions_matched = 0
             positions_scored = 0
+            events_detected = 0
+            market_data_result = {'symbols_fetched': 0, 'records_fetched': 0}
 
-            if import_result.new_trades > 0:
-                self._update_task_status(
+            resumed = (
+                job is not None and job.attempts > 1 and not replace_mode
+                and bool(import_result.duplicate_symbols)
+            )
+            if resumed:
+                # 上一次尝试可能已导入部分/全部交易后才失败，这些标的需要重新配对和评分
+                import_result.touched_symbols |= import_result.duplicate_symbols
+                self._add_log(
                     task_id,
-                    TaskStatus.RUNNING,
-                    progress=45.0,
-                    step="正在进行持仓配对..."
+                    f"重试：重新配对 {len(import_result.touched_symbols)} 个已导入标的",
+                    "info",
+                    "system",
                 )
-                self._add_log(task_id, "开始 FIFO 持仓配对算法...", "info", "match")
-                time.sleep(0.05)
-                self._add_log(task_id, "初始化配对引擎...", "info", "match")
-                time.sleep(0.05)
-                self._add_log(task_id, "按标的分组交易记录...", "info", "match")
-                time.sleep(0.05)
 
+            if import_result.new_trades > 0 or resumed:
                 init_database(database_url, echo=False)
                 session = get_session()
 
                 try:
-                    matcher = FIFOMatcher(session)
-
-                    self._add_log(task_id, "排序买入/卖出队列...", "info", "match")
-                    time.sleep(0.05)
-
-                    match_result = matcher.match_all_trades()
+                    with self._timed_stage(task_id, timer, "match") as stage:
+                        match_result = self._match_stage(task_id, session, replace_mode, import_result)
+                        stage.items = match_result.get('total_trades', 0)
                     positions_matched = match_result.get('positions_created', 0)
-                    open_positions = match_result.get('open_positions', 0)
-                    closed_positions = match_result.get('closed_positions', 0)
-
-                    # 添加配对详情日志
-                    self._add_log(task_id, f"处理交易数: {match_result.get('total_trades', 0)} 笔", "info", "match")
-                    time.sleep(0.03)
-                    self._add_log(task_id, f"涉及标的数: {match_result.get('symbols_processed', 0)} 个", "info", "match")
-                    time.sleep(0.03)
-
-                    # 记录每个持仓的配对结果 - 全部！
-                    self._log_all_matched_positions(task_id, session)
-
-                    self._add_log(
-                        task_id,
-                        f"✓ 配对完成: {positions_matched} 个持仓 (已平仓: {closed_positions}, 未平仓: {open_positions})",
-                        "success",
-                        "match"
-                    )
 
-                    self._update_task_status(
-                        task_id,
-                        TaskStatus.RUNNING,
-                        progress=70.0,
-                        step=f"已配对 {positions_matched} 个持仓"
-                    )
+                    with self._timed_stage(task_id, timer, "market_data") as stage:
+                        market_data_result = self._market_data_stage(task_id, session)
+                        stage.items = market_data_result.get('symbols_analyzed', 0)
 
-                    # ==================== 阶段 3: 市场数据获取 (70-82%) ====================
-                    self._update_task_status(
-                        task_id,
-                        TaskStatus.RUNNING,
-                        progress=70.0,
-                        step="正在获取市场数据..."
-                    )
-                    self._add_log(task_id, "开始获取市场数据...", "info", "data")
-
-                    # 获取股票数据
-                    market_data_result = self._fetch_market_data_with_logs(task_id, session)
-
-                    # 根据结果显示不同的日志
-                    symbols_fetched = market_data_result.get('symbols_fetched', 0)
-                    symbols_analyzed = market_data_result.get('symbols_analyzed', 0)
-                    failed_symbols = market_data_result.get('failed_symbols', [])
+                    with self._timed_stage(task_id, timer, "score") as stage:
+                        positions_scored = self._score_stage(task_id, session)
+                        stage.items = positions_scored
 
-                    if symbols_fetched == 0 and symbols_analyzed > 0:
-                        # 完全失败
-                        self._add_log(
-                            task_id,
-                            f"⚠ 市场数据获取失败，将使用有限数据完成评分",
-                            "warning",
-                            "data"
-                        )
-                    elif len(failed_symbols) > 0:
-                        # 部分失败
-                        failed_count = len(failed_symbols)
-                        self._add_log(
-                            task_id,
-                            f"⚠ 部分标的获取失败: {failed_count} 个 (已成功 {symbols_fetched} 个)",
-                            "warning",
-                            "data"
-                        )
-                    else:
-                        # 全部成功
-                        self._add_log(
-                            task_id,
-                            f"✓ 市场数据获取完成: {symbols_fetched} 个标的",
-                            "success",
-                            "data"
-                        )
-
-                    # ==================== 阶段 4: 质量评分 (82-95%) ====================
-                    self._update_task_status(
-                        task_id,
-                        TaskStatus.RUNNING,
-                        progress=85.0,
-                        step="正在计算质量评分..."
-                    )
-                    self._add_log(task_id, "开始计算质量评分 (V2 九维度)...", "info", "score")
-                    time.sleep(0.05)
-                    self._add_log(task_id, "初始化评分引擎...", "info", "score")
-                    time.sleep(0.05)
-                    self._add_log(task_id, "加载评分规则配置...", "info", "score")
-                    time.sleep(0.05)
-                    self._add_log(task_id, "评分维度: 技术/行为/风控/执行/市场环境...", "info", "score")
-                    time.sleep(0.05)
-
-                    scorer = QualityScorer()
-                    score_result = scorer.score_all_positions(session, update_db=True)
-                    positions_scored = score_result.get('scored', 0)
-
-                    # 记录每个持仓的评分 - 全部！
-                    self._log_all_scored_positions(task_id, session)
-
-                    session.commit()
-
-                    self._add_log(
-                        task_id,
-                        f"✓ 评分完成: {positions_scored} 个持仓已评分",
-                        "success",
-                        "score"
-                    )
-
-                    self._update_task_status(
-                        task_id,
-                        TaskStatus.RUNNING,
-                        progress=90.0,
-                        step=f"已评分 {positions_scored} 个持仓"
-                    )
-
-                    # ==================== 阶段 4.5: 事件检测 (90-95%) ====================
-                    self._update_task_status(
-                        task_id,
-                        TaskStatus.RUNNING,
-                        progress=90.0,
-                        step="正在检测市场事件..."
-                    )
-                    self._add_log(task_id, "开始检测市场事件 (财报/价格异常/成交量异常)...", "info", "events")
-                    time.sleep(0.05)
-
-                    events_detected = self._detect_events_with_logs(task_id, session)
-
-                    self._update_task_status(
-                        task_id,
-                        TaskStatus.RUNNING,
-                        progress=95.0,
-                        step=f"已检测 {events_detected} 个事件"
-                    )
+                    with self._timed_stage(task_id, timer, "events") as stage:
+                        events_detected = self._events_stage(task_id, session, stage)
 
                 except Exception as e:
                     logger.error(f"[{task_id}] Matching/scoring error: {e}")
@@ -603,14 +503,10 @@ class TaskManager:
 
             else:
                 self._add_log(task_id, "无新交易，跳过配对和评分", "info", "system")
+                for name in PIPELINE_STAGES[1:]:
+                    timer.skip(name)
 
-            # ==================== 阶段 5: 完成 (100%) ====================
-            # 如果没有运行market_data_result，初始化为空
-            if 'market_data_result' not in locals():
-                market_data_result = {'symbols_fetched': 0, 'records_fetched': 0}
-            if 'events_detected' not in locals():
-                events_detected = 0
-
+            # ==================== 完成 (100%) ====================
             result = {
                 "language": language,
                 "total_rows": import_result.total_rows,
@@ -625,8 +521,10 @@ class TaskManager:
                 "errors": import_result.errors,
                 "error_messages": import_result.error_messages[:10] if import_result.error_messages else [],
                 "broker_name": getattr(import_result, 'broker_name', format_name),
+                "timings": timer.to_dict(),
             }
 
+            self._add_log(task_id, f"⏱ {timer.summary()}", "info", "system")
             self._add_log(task_id, "分析完成！", "success", "system")
             self._update_task_status(
                 task_id,
@@ -636,26 +534,292 @@ class TaskManager:
                 result=result
             )
 
-            logger.info(f"[{task_id}] Task completed successfully")
+            logger.info(f"[{task_id}] Task completed successfully: {timer.summary()}")
 
             # 发送邮件通知
             self._send_completion_email(task_id, result, database_url)
 
         except Exception as e:
-            logger.error(f"[{task_id}] Task failed: {e}", exc_info=True)
-            self._add_log(task_id, f"任务失败: {str(e)}", "error", "system")
+            retrying = job is not None and not job.final_attempt
+            if retrying:
+                logger.warning(f"[{task_id}] Attempt {job.attempts}/{job.max_attempts} failed: {e}", exc_info=True)
+                self._add_log(
+                    task_id,
+                    f"第 {job.attempts}/{job.max_attempts} 次尝试失败: {str(e)}",
+                    "warning",
+                    "system",
+                )
+                self._update_task_status(task_id, TaskStatus.PENDING, step="执行失败，等待重试")
+            else:
+                logger.error(f"[{task_id}] Task failed: {e}", exc_info=True)
+                self._add_log(task_id, f"任务失败: {str(e)}", "error", "system")
+                self._update_task_status(
+                    task_id,
+                    TaskStatus.FAILED,
+                    error=str(e),
+                    result={"timings": timer.to_dict()},
+                )
+            if job is not None:
+                raise
+
+        finally:
+            task_log_sink.finish_task(database_url, task_id)
+
+            # 导入/配对/评分可能已部分提交：无论成败都让分析端点的响应缓存失效
+            bump_data_version(database_url)
+
+            # 清理临时文件（还要重试的作业保留输入）
+            if not retrying:
+                try:
+                    Path(file_path).unlink()
+                except Exception:
+                    pass
+
+    @contextmanager
+    def _timed_stage(self, task_id: str, timer: StageTimer, name: str):
+        """计时一个阶段，正常结束后把耗时/吞吐写入该阶段的日志分类"""
+        with timer.stage(name) as timing:
+            yield timing
+        self._add_log(task_id, f"⏱ {timing.describe()}", "info", STAGE_LOG_CATEGORIES[name])
+
+    def _import_stage(
+        self,
+        task_id: str,
+        file_path: str,
+        replace_mode: bool,
+        database_url: str,
+    ):
+        """
+        阶段 1: 数据导入 (0-40%)
+
+        Returns:
+            (language, format_name, ImportResult)
+        """
+        from src.importers.english_csv_parser import detect_csv_language
+        from src.importers.incremental_importer import IncrementalImporter
+
+        self._update_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            progress=10.0,
+            step="正在检测文件格式..."
+        )
+        self._add_log(task_id, "正在检测 CSV 文件格式...", "info", "import")
+
+        language = detect_csv_language(file_path)
+        logger.info(f"[{task_id}] Detected language: {language}")
+
+        if language == 'unknown':
+            self._add_log(task_id, "无法识别的文件格式", "error", "import")
+            raise ValueError("不支持的CSV格式，请使用富途证券导出的CSV文件")
+
+        format_name = "富途英文格式" if language == 'english' else "富途中文格式"
+        self._add_log(task_id, f"✓ 检测到格式: {format_name}", "success", "import")
+
+        # 替换模式：先清除所有旧数据
+        if replace_mode:
             self._update_task_status(
                 task_id,
-                TaskStatus.FAILED,
-                error=str(e)
+                TaskStatus.RUNNING,
+                progress=15.0,
+                step="清除旧数据..."
             )
+            self._add_log(task_id, "正在清除旧数据 (交易/持仓/导入历史)...", "info", "import")
+            self._clear_all_trading_data(database_url)
+            self._add_log(task_id, "✓ 旧数据已清除", "success", "import")
 
-        finally:
-            # 清理临时文件
-            try:
-                Path(file_path).unlink()
-            except Exception:
-                pass
+        self._update_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            progress=20.0,
+            step="正在导入交易数据..."
+        )
+        self._add_log(task_id, "开始解析 CSV 文件...", "info", "import")
+
+        importer = IncrementalImporter(
+            file_path,
+            dry_run=False,
+            database_url=database_url,
+        )
+        import_result = importer.run()
+
+        self._add_log(task_id, f"文件解析完成: 共 {import_result.total_rows} 行数据", "info", "import")
+        self._add_log(task_id, f"已成交订单: {import_result.completed_trades} 笔", "info", "import")
+
+        if import_result.duplicates_skipped > 0:
+            self._add_log(task_id, f"⚠ 跳过重复记录: {import_result.duplicates_skipped} 笔", "warning", "import")
+
+        if import_result.errors > 0:
+            self._add_log(task_id, f"⚠ 解析错误: {import_result.errors} 笔", "warning", "import")
+            for err_msg in import_result.error_messages[:5]:
+                self._add_log(task_id, f"  └ {err_msg}", "warning", "import")
+
+        # 添加导入的每条交易详情 - 全部记录！
+        self._log_all_imported_trades(task_id, database_url)
+
+        self._update_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            progress=40.0,
+            step=f"已导入 {import_result.new_trades} 条交易记录"
+        )
+        self._add_log(
+            task_id,
+            f"✓ 导入完成: {import_result.new_trades} 条新交易已入库",
+            "success",
+            "import"
+        )
+        return language, format_name, import_result
+
+    def _match_stage(self, task_id: str, session, replace_mode: bool, import_result) -> dict:
+        """阶段 2: FIFO配对 (40-70%)，返回 FIFOMatcher 的统计"""
+        from src.matchers.fifo_matcher import FIFOMatcher
+
+        self._update_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            progress=45.0,
+            step="正在进行持仓配对..."
+        )
+        self._add_log(task_id, "开始 FIFO 持仓配对算法...", "info", "match")
+
+        matcher = FIFOMatcher(session)
+        if replace_mode:
+            match_result = matcher.match_all_trades()
+        else:
+            # 追加导入：只重放本批次涉及的标的
+            self._add_log(
+                task_id,
+                f"增量配对: {len(import_result.touched_symbols)} 个标的有新交易",
+                "info",
+                "match"
+            )
+            match_result = matcher.match_incremental(import_result.touched_symbols)
+        positions_matched = match_result.get('positions_created', 0)
+        open_positions = match_result.get('open_positions', 0)
+        closed_positions = match_result.get('closed_positions', 0)
+
+        self._add_log(task_id, f"处理交易数: {match_result.get('total_trades', 0)} 笔", "info", "match")
+        self._add_log(task_id, f"涉及标的数: {match_result.get('symbols_processed', 0)} 个", "info", "match")
+
+        # 记录每个持仓的配对结果 - 全部！
+        self._log_all_matched_positions(task_id, session)
+
+        self._add_log(
+            task_id,
+            f"✓ 配对完成: {positions_matched} 个持仓 (已平仓: {closed_positions}, 未平仓: {open_positions})",
+            "success",
+            "match"
+        )
+        self._update_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            progress=70.0,
+            step=f"已配对 {positions_matched} 个持仓"
+        )
+        return match_result
+
+    def _market_data_stage(self, task_id: str, session) -> dict:
+        """阶段 3: 市场数据获取 (70-82%)，失败时降级返回统计而不抛出"""
+        self._update_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            progress=70.0,
+            step="正在获取市场数据..."
+        )
+        self._add_log(task_id, "开始获取市场数据...", "info", "data")
+
+        market_data_result = self._fetch_market_data_with_logs(task_id, session)
+
+        symbols_fetched = market_data_result.get('symbols_fetched', 0)
+        symbols_analyzed = market_data_result.get('symbols_analyzed', 0)
+        failed_symbols = market_data_result.get('failed_symbols', [])
+
+        if symbols_fetched == 0 and symbols_analyzed > 0:
+            # 完全失败
+            self._add_log(
+                task_id,
+                f"⚠ 市场数据获取失败，将使用有限数据完成评分",
+                "warning",
+                "data"
+            )
+        elif len(failed_symbols) > 0:
+            # 部分失败
+            self._add_log(
+                task_id,
+                f"⚠ 部分标的获取失败: {len(failed_symbols)} 个 (已成功 {symbols_fetched} 个)",
+                "warning",
+                "data"
+            )
+        else:
+            # 全部成功
+            self._add_log(
+                task_id,
+                f"✓ 市场数据获取完成: {symbols_fetched} 个标的",
+                "success",
+                "data"
+            )
+        return market_data_result
+
+    def _score_stage(self, task_id: str, session) -> int:
+        """阶段 4: 质量评分 (82-90%)，返回评分的持仓数"""
+        from src.analyzers.quality_scorer import QualityScorer
+
+        self._update_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            progress=85.0,
+            step="正在计算质量评分..."
+        )
+        self._add_log(task_id, "开始计算质量评分 (V2 九维度)...", "info", "score")
+        self._add_log(task_id, "评分维度: 技术/行为/风控/执行/市场环境...", "info", "score")
+
+        scorer = QualityScorer()
+        score_result = scorer.score_all_positions(
+            session,
+            update_db=True,
+            workers=getattr(config, 'SCORING_WORKERS', 0)
+        )
+        positions_scored = score_result.get('scored', 0)
+
+        # 记录每个持仓的评分 - 全部！
+        self._log_all_scored_positions(task_id, session)
+
+        session.commit()
+
+        self._add_log(
+            task_id,
+            f"✓ 评分完成: {positions_scored} 个持仓已评分",
+            "success",
+            "score"
+        )
+        self._update_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            progress=90.0,
+            step=f"已评分 {positions_scored} 个持仓"
+        )
+        return positions_scored
+
+    def _events_stage(self, task_id: str, session, timing: Optional[StageTiming] = None) -> int:
+        """阶段 5: 事件检测 (90-95%)，返回检测到的事件数"""
+        self._update_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            progress=90.0,
+            step="正在检测市场事件..."
+        )
+        self._add_log(task_id, "开始检测市场事件 (财报/价格异常/成交量异常)...", "info", "events")
+
+        events_detected = self._detect_events_with_logs(task_id, session, timing)
+
+        self._update_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            progress=95.0,
+            step=f"已检测 {events_detected} 个事件"
+        )
+        return events_detected
 
     def _log_all_imported_trades(self, task_id: str, database_url: str):
         """记录所有导入的交易 - 每条都记录！"""
@@ -672,7 +836,6 @@ class TaskManager:
                 return
 
             self._add_log(task_id, f"正在记录 {len(trades)} 条交易明细...", "info", "import")
-            time.sleep(0.03)
 
             for i, trade in enumerate(trades, 1):
                 direction = "买入" if trade.direction == "BUY" else "卖出"
@@ -688,10 +851,6 @@ class TaskManager:
                     "import"
                 )
 
-                # 每5条加一点延迟，让动画更明显
-                if i % 5 == 0:
-                    time.sleep(0.02)
-
             self._add_log(task_id, f"✓ 已记录 {len(trades)} 条交易明细", "success", "import")
 
         except Exception as e:
@@ -711,7 +870,6 @@ class TaskManager:
                 return
 
             self._add_log(task_id, f"正在记录 {len(positions)} 个持仓配对结果...", "info", "match")
-            time.sleep(0.03)
 
             for i, pos in enumerate(positions, 1):
                 direction = "多头" if pos.direction == "LONG" else "空头"
@@ -735,10 +893,6 @@ class TaskManager:
                     "match"
                 )
 
-                # 每3个持仓加一点延迟
-                if i % 3 == 0:
-                    time.sleep(0.02)
-
             self._add_log(task_id, f"✓ 已记录 {len(positions)} 个持仓", "success", "match")
 
         except Exception as e:
@@ -758,7 +912,6 @@ class TaskManager:
                 return
 
             self._add_log(task_id, f"正在记录 {len(positions)} 个持仓评分...", "info", "score")
-            time.sleep(0.03)
 
             for i, pos in enumerate(positions, 1):
                 grade = pos.score_grade or "?"
@@ -789,10 +942,6 @@ class TaskManager:
                     "score"
                 )
 
-                # 每3个评分加一点延迟
-                if i % 3 == 0:
-                    time.sleep(0.02)
-
             # 统计各等级数量
             grade_counts = {}
             for pos in positions:
@@ -821,8 +970,6 @@ class TaskManager:
             from src.data_sources.cache_manager import CacheManager
             from src.models.trade import Trade
 
-            self._add_log(task_id, "初始化数据获取引擎...", "info", "data")
-            time.sleep(0.05)
 
             # 获取所有交易标的
             symbols = session.query(Trade.symbol).distinct().all()
@@ -833,27 +980,24 @@ class TaskManager:
                 return {'symbols_fetched': 0, 'records_fetched': 0}
 
             self._add_log(task_id, f"发现 {len(symbol_list)} 个需要获取数据的标的", "info", "data")
-            time.sleep(0.03)
 
             # 显示部分标的
             sample_symbols = symbol_list[:5]
             self._add_log(task_id, f"标的预览: {', '.join(sample_symbols)}...", "info", "data")
-            time.sleep(0.03)
 
             # 初始化 BatchFetcher
             self._add_log(task_id, "初始化数据路由器 (YFinance + AKShare)...", "info", "data")
-            time.sleep(0.05)
 
             cache_manager = CacheManager(db_session=session)
             fetcher = BatchFetcher(
                 cache_manager=cache_manager,
                 use_router=True,
-                max_workers=1,  # 串行模式避免线程挂起问题
+                # 请求速率与并发由各数据源共享的 RateLimiter 控制，缓存写入已串行化
+                max_workers=getattr(config, 'MARKET_DATA_FETCH_WORKERS', 4),
                 request_delay=0.1
             )
 
             self._add_log(task_id, "开始批量获取市场数据...", "info", "data")
-            time.sleep(0.05)
 
             # 更新进度
             self._update_task_status(
@@ -922,16 +1066,28 @@ class TaskManager:
 
             # 记录汇总结果
             self._add_log(task_id, f"分析标的数: {stats.get('symbols_analyzed', 0)}", "info", "data")
-            time.sleep(0.02)
             self._add_log(task_id, f"成功获取: {stats.get('symbols_fetched', 0)} 个标的", "info", "data")
-            time.sleep(0.02)
             self._add_log(task_id, f"缓存命中: {stats.get('cached_symbols', 0)} 个标的", "info", "data")
-            time.sleep(0.02)
+            self._add_log(task_id, f"缺失区间请求: {stats.get('fetch_requests', 0)} 个", "info", "data")
             self._add_log(task_id, f"数据记录数: {stats.get('records_fetched', 0)}", "info", "data")
-            time.sleep(0.02)
 
             duration = stats.get('duration_seconds', 0)
             self._add_log(task_id, f"获取耗时: {duration:.1f} 秒", "info", "data")
+            if stats.get('rate_limit_throttled'):
+                self._add_log(
+                    task_id,
+                    f"限流等待: {stats.get('rate_limit_wait_seconds', 0):.1f} 秒 "
+                    f"({stats['rate_limit_throttled']} 个请求)",
+                    "info",
+                    "data"
+                )
+            if stats.get('coalesced_requests'):
+                self._add_log(
+                    task_id,
+                    f"合并获取: {stats['coalesced_requests']} 个标的由并发任务获取",
+                    "info",
+                    "data"
+                )
 
             # 更新进度
             self._update_task_status(
@@ -977,7 +1133,7 @@ class TaskManager:
         init_database(database_url, echo=False)
         session = get_session()
 
-        tables_to_clear = ['positions', 'trades', 'import_history']
+        tables_to_clear = ['positions', 'trades', 'import_history', 'symbol_match_state']
 
         try:
             for table in tables_to_clear:
@@ -990,14 +1146,21 @@ class TaskManager:
             session.commit()
         finally:
             session.close()
+        bump_data_version(database_url)
 
-    def _detect_events_with_logs(self, task_id: str, session) -> int:
+    def _detect_events_with_logs(
+        self,
+        task_id: str,
+        session,
+        timing: Optional[StageTiming] = None,
+    ) -> int:
         """
         为新配对的持仓检测市场事件
 
         Args:
             task_id: 任务ID
             session: 数据库会话
+            timing: 阶段计时（记录检测的持仓数）
 
         Returns:
             检测到的事件数量
@@ -1006,9 +1169,6 @@ class TaskManager:
         from src.models.position import Position, PositionStatus
 
         try:
-            self._add_log(task_id, "初始化事件检测器...", "info", "events")
-            time.sleep(0.03)
-
             detector = EventDetector(session)
 
             # 获取需要检测事件的持仓（已平仓且没有关联事件的）
@@ -1020,53 +1180,64 @@ class TaskManager:
                 self._add_log(task_id, "⚠ 没有需要检测事件的持仓", "warning", "events")
                 return 0
 
-            self._add_log(task_id, f"发现 {len(positions)} 个已平仓持仓需要检测事件", "info", "events")
-            time.sleep(0.03)
+            groups = detector.group_positions_by_symbol(positions)
+            self._add_log(
+                task_id,
+                f"发现 {len(positions)} 个已平仓持仓需要检测事件（{len(groups)} 个标的）",
+                "info",
+                "events"
+            )
+            if timing is not None:
+                timing.items = len(positions)
 
             total_events = 0
+            skipped_events = 0
             symbols_processed = set()
+            done = 0
 
-            for i, position in enumerate(positions, 1):
+            for symbol, group in groups.items():
                 try:
-                    # 检测该持仓的事件
-                    events = detector.detect_events_for_position(
-                        position,
+                    # 每个标的计算一次事件，再按日期区间分配给该标的的持仓
+                    events_by_position = detector.detect_events_for_symbol(
+                        symbol,
+                        group,
                         include_earnings=True,
                         include_anomalies=True
                     )
+                    events = [event for found in events_by_position.values() for event in found]
 
                     if events:
                         saved = detector.save_events(events, deduplicate=True)
                         total_events += saved
+                        skipped_events += detector.last_save_stats['skipped']
 
                         if saved > 0:
-                            symbols_processed.add(position.symbol)
+                            symbols_processed.add(symbol)
                             self._add_log(
                                 task_id,
-                                f"📊 {position.symbol}: 检测到 {saved} 个事件",
+                                f"📊 {symbol}: {len(group)} 个持仓检测到 {saved} 个事件",
                                 "info",
                                 "events"
                             )
 
-                    # 每10个持仓更新一次进度
-                    if i % 10 == 0:
-                        progress = 90.0 + (i / len(positions)) * 5.0
-                        self._update_task_status(
-                            task_id,
-                            TaskStatus.RUNNING,
-                            progress=min(progress, 95.0),
-                            step=f"正在检测事件 ({i}/{len(positions)})..."
-                        )
-
                 except Exception as e:
-                    # 单个持仓检测失败不影响其他
-                    logger.warning(f"Event detection failed for position {position.id}: {e}")
-                    continue
+                    # 单个标的检测失败不影响其他
+                    logger.warning(f"Event detection failed for {symbol} ({len(group)} positions): {e}")
+
+                done += len(group)
+                progress = 90.0 + (done / len(positions)) * 5.0
+                self._update_task_status(
+                    task_id,
+                    TaskStatus.RUNNING,
+                    progress=min(progress, 95.0),
+                    step=f"正在检测事件 ({done}/{len(positions)})..."
+                )
 
             # 汇总日志
             self._add_log(
                 task_id,
-                f"✓ 事件检测完成: {total_events} 个事件，涉及 {len(symbols_processed)} 个标的",
+                f"✓ 事件检测完成: {total_events} 个事件（跳过 {skipped_events} 个已存在），"
+                f"涉及 {len(symbols_processed)} 个标的",
                 "success",
                 "events"
             )
@@ -1,29 +1,74 @@
 """
 Anonymous workspace service
 
-input: workspace token / filesystem registry
+input: workspace token / SQLite registry (registry.db under WORKSPACE_DATA_DIR)
 output: isolated SQLite database URL and token lifecycle operations
 pos: backend service layer - Product Hunt beta anonymous data isolation
+
+resolve_token() runs on every request through get_db, so it is a dict lookup
+against an in-memory token_hash -> record index. The registry table is only
+written when a workspace is created or deleted, when last_seen_at updates are
+flushed (debounced, WORKSPACE_TOUCH_INTERVAL_SECONDS), and by the background
+cleanup timer (WORKSPACE_CLEANUP_INTERVAL_SECONDS), which also reloads the
+index so workspaces created or deleted by other worker processes show up.
+A workspace deleted by another process is noticed before that reload: its
+directory is removed with it, so a cached record whose database file is gone
+is re-checked against the registry and dropped if the row no longer exists.
+A legacy registry.json is imported once and renamed to registry.json.migrated.
+Workspace files hold only user data; market data tables live in the shared
+market store (src/models/market_store.py) when MARKET_STORE_DATABASE_URL is set.
 """
 
 from __future__ import annotations
 
 import hashlib
 import json
+import logging
 import os
 import secrets
 import shutil
 import threading
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Callable, Optional
-
-from sqlalchemy import create_engine
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import (
+    Column,
+    MetaData,
+    String,
+    Table,
+    Text,
+    bindparam,
+    create_engine,
+    delete,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.engine import Engine
 
 import config
 from src.models.base import Base
+from src.models.market_store import attach_market_store, local_tables, uses_market_store
+from ..core.engine_pool import workspace_engines
+
+logger = logging.getLogger(__name__)
+
+_registry_metadata = MetaData()
+
+# Kept out of Base.metadata so workspace databases never get this table.
+workspaces_table = Table(
+    "workspaces",
+    _registry_metadata,
+    Column("workspace_id", String(32), primary_key=True),
+    Column("token_hash", String(64), nullable=False, unique=True),
+    Column("created_at", String(40), nullable=False),
+    Column("last_seen_at", String(40), nullable=False),
+    Column("expires_at", String(40), nullable=False, index=True),
+    Column("db_path", Text, nullable=False),
+)
 
 
 def _utcnow() -> datetime:
@@ -75,13 +120,15 @@ class WorkspaceDeleteResult:
 
 
 class WorkspaceService:
-    """Filesystem-backed registry for temporary anonymous workspaces."""
+    """SQLite-backed registry for temporary anonymous workspaces with an in-memory token index."""
 
     def __init__(
         self,
         root_dir: Optional[Path] = None,
         ttl_hours: Optional[int] = None,
         clock: Callable[[], datetime] = _utcnow,
+        touch_interval_seconds: Optional[float] = None,
+        cleanup_interval_seconds: Optional[float] = None,
     ):
         self.root_dir = Path(
             root_dir
@@ -93,95 +140,161 @@ class WorkspaceService:
             if ttl_hours is not None
             else os.getenv("WORKSPACE_TTL_HOURS", "72")
         )
+        self.touch_interval = timedelta(seconds=float(
+            touch_interval_seconds
+            if touch_interval_seconds is not None
+            else os.getenv("WORKSPACE_TOUCH_INTERVAL_SECONDS", "60")
+        ))
+        self.cleanup_interval_seconds = float(
+            cleanup_interval_seconds
+            if cleanup_interval_seconds is not None
+            else os.getenv("WORKSPACE_CLEANUP_INTERVAL_SECONDS", "600")
+        )
         self.clock = clock
         self._lock = threading.RLock()
+        self._engine: Optional[Engine] = None
+        self._by_hash: Optional[Dict[str, WorkspaceRecord]] = None
+        self._pending_touches: Dict[str, datetime] = {}
+        self._last_flush: Optional[datetime] = None
+        self._cleanup_stop: Optional[threading.Event] = None
+        self._cleanup_thread: Optional[threading.Thread] = None
 
     @property
     def registry_path(self) -> Path:
+        return self.root_dir / "registry.db"
+
+    @property
+    def legacy_registry_path(self) -> Path:
         return self.root_dir / "registry.json"
 
     def create_workspace(self) -> WorkspaceRecord:
         """Create a workspace, initialize its SQLite schema, and return its token once."""
-        with self._lock:
-            self.root_dir.mkdir(parents=True, exist_ok=True)
-            registry = self._load_registry()
-            registry = self._cleanup_expired_locked(registry)
+        workspace_id = uuid.uuid4().hex[:16]
+        token = secrets.token_urlsafe(32)
+        now = self.clock()
+        db_path = self.root_dir / workspace_id / "tradingcoach.db"
+        record = WorkspaceRecord(
+            workspace_id=workspace_id,
+            token_hash=_token_hash(token),
+            created_at=now,
+            last_seen_at=now,
+            expires_at=now + timedelta(hours=self.ttl_hours),
+            db_path=db_path,
+            token=token,
+        )
+        # The only place a workspace database gets its schema; get_db trusts it exists.
+        self.ensure_schema(record)
 
-            workspace_id = uuid.uuid4().hex[:16]
-            token = secrets.token_urlsafe(32)
-            now = self.clock()
-            expires_at = now + timedelta(hours=self.ttl_hours)
-            db_path = self.root_dir / workspace_id / "tradingcoach.db"
-            db_path.parent.mkdir(parents=True, exist_ok=True)
-
-            record = WorkspaceRecord(
-                workspace_id=workspace_id,
-                token_hash=_token_hash(token),
-                created_at=now,
-                last_seen_at=now,
-                expires_at=expires_at,
-                db_path=db_path,
-                token=token,
-            )
-            registry[workspace_id] = self._serialize_record(record)
-            self._write_registry(registry)
-            self.ensure_schema(record)
-            return record
+        with self._lock:
+            index = self._index()
+            with self._registry_engine().begin() as connection:
+                connection.execute(insert(workspaces_table), self._serialize_record(record))
+            index[record.token_hash] = replace(record, token=None)
+        return record
 
     def resolve_token(self, token: Optional[str], *, touch: bool = True) -> Optional[WorkspaceRecord]:
-        """Resolve an active token. Expired workspaces are lazily deleted."""
+        """Resolve an active token. An expired workspace is deleted when its token is used."""
         if not token:
             return None
 
+        hashed = _token_hash(token)
         with self._lock:
-            registry = self._load_registry()
-            registry = self._cleanup_expired_locked(registry)
-            hashed = _token_hash(token)
-            for workspace_id, item in registry.items():
-                if item.get("token_hash") != hashed:
-                    continue
-                record = self._deserialize_record(workspace_id, item)
-                if record.expires_at <= self.clock():
-                    self._delete_record_files(record)
-                    registry.pop(workspace_id, None)
-                    self._write_registry(registry)
+            index = self._index()
+            record = index.get(hashed)
+            if record is not None and not record.db_path.exists():
+                # Possibly deleted by another worker process since the index was last loaded.
+                if self._load_one(hashed) is None:
+                    index.pop(hashed, None)
                     return None
-                if touch:
-                    item["last_seen_at"] = self.clock().isoformat()
-                    registry[workspace_id] = item
-                    self._write_registry(registry)
-                self.ensure_schema(record)
-                return record
-            self._write_registry(registry)
-            return None
+            if record is None:
+                # Created by another worker process since the index was last loaded.
+                record = self._load_one(hashed)
+                if record is None:
+                    return None
+                index[hashed] = record
+
+            now = self.clock()
+            if record.expires_at <= now:
+                self._delete_locked(record)
+                return None
+            if touch:
+                record = index[hashed] = replace(record, last_seen_at=now)
+                self._pending_touches[record.workspace_id] = now
+                if self._last_flush is None or now - self._last_flush >= self.touch_interval:
+                    self._flush_touches_locked(now)
+            return record
 
     def delete_workspace(self, token: Optional[str]) -> WorkspaceDeleteResult:
         """Delete the current workspace and invalidate its token."""
         if not token:
             return WorkspaceDeleteResult(False, None, {})
 
+        hashed = _token_hash(token)
         with self._lock:
-            registry = self._load_registry()
-            hashed = _token_hash(token)
-            for workspace_id, item in list(registry.items()):
-                if item.get("token_hash") != hashed:
-                    continue
-                record = self._deserialize_record(workspace_id, item)
-                deleted_counts = self._count_workspace_rows(record)
-                self._delete_record_files(record)
-                registry.pop(workspace_id, None)
-                self._write_registry(registry)
-                return WorkspaceDeleteResult(True, workspace_id, deleted_counts)
-            return WorkspaceDeleteResult(False, None, {})
+            record = self._index().get(hashed) or self._load_one(hashed)
+            if record is None:
+                return WorkspaceDeleteResult(False, None, {})
+            deleted_counts = self._count_workspace_rows(record)
+            self._delete_locked(record)
+            return WorkspaceDeleteResult(True, record.workspace_id, deleted_counts)
 
     def cleanup_expired(self) -> int:
         """Remove expired workspaces and return how many were deleted."""
         with self._lock:
-            registry = self._load_registry()
-            before = len(registry)
-            registry = self._cleanup_expired_locked(registry)
-            self._write_registry(registry)
-            return before - len(registry)
+            now = self.clock()
+            self._flush_touches_locked(now)
+            with self._registry_engine().connect() as connection:
+                rows = connection.execute(select(workspaces_table)).mappings().all()
+            records = [self._deserialize_record(row["workspace_id"], row) for row in rows]
+            expired = [record for record in records if record.expires_at <= now]
+            for record in expired:
+                self._delete_locked(record)
+            # Reload so changes made by other worker processes become visible.
+            self._by_hash = {
+                record.token_hash: record
+                for record in records
+                if record.expires_at > now
+            }
+            return len(expired)
+
+    def flush(self) -> None:
+        """Persist pending last_seen_at updates now."""
+        with self._lock:
+            self._flush_touches_locked(self.clock())
+
+    def start_cleanup_timer(self) -> None:
+        """Run cleanup_expired() every cleanup_interval_seconds on a daemon thread."""
+        with self._lock:
+            if self._cleanup_thread is not None or self.cleanup_interval_seconds <= 0:
+                return
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=self._cleanup_loop,
+                args=(stop,),
+                name="workspace-cleanup",
+                daemon=True,
+            )
+            self._cleanup_stop, self._cleanup_thread = stop, thread
+        thread.start()
+
+    def stop_cleanup_timer(self) -> None:
+        """Stop the cleanup thread and flush pending last_seen_at updates."""
+        with self._lock:
+            stop, thread = self._cleanup_stop, self._cleanup_thread
+            self._cleanup_stop = self._cleanup_thread = None
+        if stop is not None:
+            stop.set()
+            thread.join(timeout=5)
+        self.flush()
+
+    def close(self) -> None:
+        """Stop background work and release the registry engine."""
+        self.stop_cleanup_timer()
+        with self._lock:
+            if self._engine is not None:
+                self._engine.dispose()
+                self._engine = None
+            self._by_hash = None
 
     def ensure_schema(self, record: WorkspaceRecord) -> None:
         record.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -189,9 +302,102 @@ class WorkspaceService:
             record.database_url,
             connect_args={"check_same_thread": False},
         )
-        Base.metadata.create_all(bind=engine)
+        if uses_market_store(record.database_url):
+            # Market data tables live in the shared store, not in each workspace file.
+            attach_market_store(engine)
+        Base.metadata.create_all(bind=engine, tables=local_tables(engine))
         engine.dispose()
 
+    def _cleanup_loop(self, stop: threading.Event) -> None:
+        while not stop.wait(self.cleanup_interval_seconds):
+            try:
+                removed = self.cleanup_expired()
+                if removed:
+                    logger.info("Removed %d expired workspaces", removed)
+            except Exception:
+                logger.exception("Workspace cleanup failed")
+
+    def _registry_engine(self) -> Engine:
+        if self._engine is None:
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+            engine = create_engine(
+                f"sqlite:///{self.registry_path}",
+                connect_args={"check_same_thread": False},
+            )
+            _registry_metadata.create_all(bind=engine)
+            self._engine = engine
+        return self._engine
+
+    def _index(self) -> Dict[str, WorkspaceRecord]:
+        """token_hash -> record, loaded from the registry table on first use."""
+        if self._by_hash is None:
+            engine = self._registry_engine()
+            self._migrate_legacy_registry(engine)
+            with engine.connect() as connection:
+                rows = connection.execute(select(workspaces_table)).mappings().all()
+            self._by_hash = {
+                row["token_hash"]: self._deserialize_record(row["workspace_id"], row)
+                for row in rows
+            }
+        return self._by_hash
+
+    def _load_one(self, token_hash: str) -> Optional[WorkspaceRecord]:
+        with self._registry_engine().connect() as connection:
+            row = connection.execute(
+                select(workspaces_table).where(workspaces_table.c.token_hash == token_hash)
+            ).mappings().first()
+        return self._deserialize_record(row["workspace_id"], row) if row else None
+
+    def _flush_touches_locked(self, now: datetime) -> None:
+        self._last_flush = now
+        if not self._pending_touches:
+            return
+        touches = [
+            {"b_workspace_id": workspace_id, "b_last_seen_at": seen.isoformat()}
+            for workspace_id, seen in self._pending_touches.items()
+        ]
+        self._pending_touches.clear()
+        statement = (
+            update(workspaces_table)
+            .where(workspaces_table.c.workspace_id == bindparam("b_workspace_id"))
+            .values(last_seen_at=bindparam("b_last_seen_at"))
+        )
+        with self._registry_engine().begin() as connection:
+            connection.execute(statement, touches)
+
+    def _delete_locked(self, record: WorkspaceRecord) -> None:
+        workspace_engines.dispose(record.database_url)
+        self._delete_record_files(record)
+        with self._registry_engine().begin() as connection:
+            connection.execute(
+                delete(workspaces_table).where(workspaces_table.c.workspace_id == record.workspace_id)
+            )
+        if self._by_hash is not None:
+            self._by_hash.pop(record.token_hash, None)
+        self._pending_touches.pop(record.workspace_id, None)
+
+    def _migrate_legacy_registry(self, engine: Engine) -> None:
+        """Import registry.json from older deployments into the registry table once."""
+        legacy_path = self.legacy_registry_path
+        if not legacy_path.exists():
+            return
+        try:
+            with legacy_path.open("r", encoding="utf-8") as file:
+                data = json.load(file)
+        except json.JSONDecodeError:
+            data = {}
+        rows = [
+            self._serialize_record(self._deserialize_record(workspace_id, item))
+            for workspace_id, item in (data.items() if isinstance(data, dict) else [])
+        ]
+        with engine.begin() as connection:
+            existing = set(connection.execute(select(workspaces_table.c.workspace_id)).scalars())
+            rows = [row for row in rows if row["workspace_id"] not in existing]
+            if rows:
+                connection.execute(insert(workspaces_table), rows)
+        legacy_path.replace(legacy_path.with_name(legacy_path.name + ".migrated"))
+        logger.info("Migrated %d workspaces from %s", len(rows), legacy_path)
+
     def _count_workspace_rows(self, record: WorkspaceRecord) -> dict:
         if not record.db_path.exists():
             return {}
@@ -211,41 +417,14 @@ class WorkspaceService:
             engine.dispose()
         return counts
 
-    def _cleanup_expired_locked(self, registry: dict) -> dict:
-        now = self.clock()
-        active = {}
-        for workspace_id, item in registry.items():
-            record = self._deserialize_record(workspace_id, item)
-            if record.expires_at <= now:
-                self._delete_record_files(record)
-            else:
-                active[workspace_id] = item
-        return active
-
     def _delete_record_files(self, record: WorkspaceRecord) -> None:
         workspace_dir = record.db_path.parent
         if workspace_dir.exists() and workspace_dir.is_dir():
             shutil.rmtree(workspace_dir, ignore_errors=True)
 
-    def _load_registry(self) -> dict:
-        if not self.registry_path.exists():
-            return {}
-        try:
-            with self.registry_path.open("r", encoding="utf-8") as file:
-                data = json.load(file)
-                return data if isinstance(data, dict) else {}
-        except json.JSONDecodeError:
-            return {}
-
-    def _write_registry(self, registry: dict) -> None:
-        self.root_dir.mkdir(parents=True, exist_ok=True)
-        tmp_path = self.registry_path.with_suffix(".tmp")
-        with tmp_path.open("w", encoding="utf-8") as file:
-            json.dump(registry, file, ensure_ascii=False, indent=2, sort_keys=True)
-        tmp_path.replace(self.registry_path)
-
     def _serialize_record(self, record: WorkspaceRecord) -> dict:
         return {
+            "workspace_id": record.workspace_id,
             "token_hash": record.token_hash,
             "created_at": record.created_at.isoformat(),
             "last_seen_at": record.last_seen_at.isoformat(),
@@ -253,12 +432,12 @@ class WorkspaceService:
             "db_path": str(record.db_path),
         }
 
-    def _deserialize_record(self, workspace_id: str, item: dict) -> WorkspaceRecord:
+    def _deserialize_record(self, workspace_id: str, item) -> WorkspaceRecord:
         return WorkspaceRecord(
             workspace_id=workspace_id,
             token_hash=item["token_hash"],
             created_at=_parse_iso(item["created_at"]),
-            last_seen_at=_parse_iso(item.get("last_seen_at", item["created_at"])),
+            last_seen_at=_parse_iso(item.get("last_seen_at") or item["created_at"]),
             expires_at=_parse_iso(item["expires_at"]),
             db_path=Path(item["db_path"]),
         )
@@ -0,0 +1,167 @@
+"""
+分析作业 worker 进程入口
+
+input: job_queue（config.TASK_QUEUE_*）, task_manager.run_job()
+output: python -m backend.app.worker [--processes N] - 常驻进程，领取并执行队列中的 CSV 分析作业
+pos: 后端服务入口 - 与 uvicorn 分开运行（TASK_QUEUE_ENABLED=true），评分/指标计算不再与 API 争用 GIL
+
+每个 worker 进程同一时间执行一个作业，执行期间由心跳线程续租；进程被杀或崩溃后租约过期，
+其他 worker 的 reap_expired() 会把作业重新入队（最多 TASK_QUEUE_MAX_ATTEMPTS 次）。
+run_job() 抛出的异常同样经 job_queue.fail() 按退避重试；放弃作业时 fail_task() 标记任务失败并删除上传文件。
+--processes N 启动 N 个子进程，收到 SIGTERM / SIGINT 后各自执行完当前作业再退出。
+
+一旦我被更新，务必更新我的开头注释，以及所属文件夹的README.md
+"""
+
+import argparse
+import logging
+import multiprocessing
+import signal
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import config
+from backend.app.services.job_queue import Job, JobQueue, default_worker_id, job_queue
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisWorker:
+    """从 job_queue 领取作业并交给 TaskManager 执行"""
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        manager=None,
+        worker_id: Optional[str] = None,
+        poll_seconds: Optional[float] = None,
+        heartbeat_seconds: Optional[float] = None,
+    ):
+        if manager is None:
+            from backend.app.services.task_manager import task_manager as manager
+        self.queue = queue or job_queue
+        self.manager = manager
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_seconds = (
+            poll_seconds if poll_seconds is not None
+            else getattr(config, 'TASK_QUEUE_POLL_SECONDS', 1.0)
+        )
+        self.heartbeat_seconds = (
+            heartbeat_seconds if heartbeat_seconds is not None
+            else getattr(config, 'TASK_QUEUE_HEARTBEAT_SECONDS', 15)
+        )
+
+    def run_once(self) -> bool:
+        """回收过期租约并执行一个作业；队列中没有可运行的作业时返回 False"""
+        for job in self.queue.reap_expired():
+            logger.error(f"Job {job.job_id} failed after {job.attempts} attempts (lease expired)")
+            self.manager.fail_task(
+                job.job_id,
+                job.workspace,
+                "分析进程异常退出，已达到最大重试次数",
+                file_path=job.payload.get("file_path"),
+            )
+
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+        self._execute(job)
+        return True
+
+    def run(self, stop: threading.Event) -> None:
+        logger.info(f"Analysis worker {self.worker_id} started ({self.queue.database_url})")
+        while not stop.is_set():
+            try:
+                worked = self.run_once()
+            except Exception as e:
+                logger.error(f"Worker loop error: {e}", exc_info=True)
+                worked = False
+            if not worked:
+                stop.wait(self.poll_seconds)
+        logger.info(f"Analysis worker {self.worker_id} stopped")
+
+    def _execute(self, job: Job) -> None:
+        logger.info(
+            f"Claimed job {job.job_id} (attempt {job.attempts}/{job.max_attempts}, "
+            f"waited {self.queue.clock() - job.enqueued_at:.1f}s)"
+        )
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job, stop_heartbeat), name="job-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        try:
+            self.manager.run_job(job)
+        except Exception as e:
+            logger.error(f"Job {job.job_id} raised: {e}", exc_info=True)
+            if not self.queue.fail(job, str(e)) and job.final_attempt:
+                self.manager.fail_task(
+                    job.job_id, job.workspace, str(e), file_path=job.payload.get("file_path")
+                )
+            return
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+        if not self.queue.complete(job):
+            logger.warning(f"Job {job.job_id} finished after its lease was lost")
+
+    def _heartbeat(self, job: Job, stop: threading.Event) -> None:
+        while not stop.wait(self.heartbeat_seconds):
+            if not self.queue.heartbeat(job):
+                logger.warning(f"Lost lease on job {job.job_id}")
+                return
+
+
+def _run_process() -> None:
+    """子进程入口：SIGTERM / SIGINT 时执行完当前作业后退出"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)-8s | %(processName)s | %(name)s:%(lineno)d | %(message)s",
+    )
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    AnalysisWorker().run(stop)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run CSV analysis queue workers")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=getattr(config, 'TASK_QUEUE_WORKERS', getattr(config, 'TASK_MAX_CONCURRENT', 3)),
+        help="worker 进程数",
+    )
+    args = parser.parse_args(argv)
+
+    if args.processes <= 1:
+        _run_process()
+        return
+
+    processes = [
+        multiprocessing.Process(target=_run_process, name=f"analysis-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def _forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()  # SIGTERM：子进程做完当前作业再退出
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -101,6 +101,29 @@ ALPHA_VANTAGE_RATE_LIMIT_PERIOD = 60
 POLYGON_RATE_LIMIT_CALLS = 5
 POLYGON_RATE_LIMIT_PERIOD = 60
 
+# 共享限流器（src/data_sources/rate_limiter.py）：<PROVIDER>_RATE_LIMIT_CALLS / _RATE_LIMIT_PERIOD
+# 控制令牌桶速率，<PROVIDER>_MAX_CONCURRENCY 是自适应并发上限的上界
+YFINANCE_MAX_CONCURRENCY = 8
+
+AKSHARE_RATE_LIMIT_CALLS = 30
+AKSHARE_RATE_LIMIT_PERIOD = 60
+AKSHARE_MAX_CONCURRENCY = 2
+
+NEWS_SEARCH_RATE_LIMIT_CALLS = 10
+NEWS_SEARCH_RATE_LIMIT_PERIOD = 60
+NEWS_SEARCH_MAX_CONCURRENCY = 2
+
+# 分析任务行情阶段的 BatchFetcher 线程数（实际在途请求受上面的并发上限约束）
+MARKET_DATA_FETCH_WORKERS = 4
+
+# 跨 workspace 共享行情库（market_data / 覆盖区间 / 指标状态 / 市场环境等），workspace 库只存用户数据；
+# 设为空字符串则每个 workspace 库自带一份行情表
+MARKET_STORE_DATABASE_URL = os.getenv("MARKET_STORE_DATABASE_URL", f"sqlite:///{DATA_DIR / 'market_store.db'}")
+
+# 同一标的的并发获取只请求一次数据源（singleflight）：跨进程租约时长、等待他人获取的上限
+MARKET_FETCH_LEASE_SECONDS = 300
+MARKET_FETCH_WAIT_SECONDS = 600
+
 MAX_RETRIES = 3
 RETRY_WAIT_MIN = 2
 RETRY_WAIT_MAX = 10
@@ -137,6 +160,9 @@ SCORE_WEIGHT_EXIT = 0.25
 SCORE_WEIGHT_TREND = 0.25
 SCORE_WEIGHT_RISK = 0.20
 
+# 批量评分进程数: 0 = 自动（持仓数 >= 500 时使用 CPU 核数-1），1 = 串行
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "0"))
+
 # 新闻契合度评分配置
 # 注意: DDGS 无法获取历史新闻，只能获取当前新闻，导致事件日期错误
 # 对于历史数据分析，应禁用新闻搜索，只使用 price_anomaly/volume_anomaly/earnings
@@ -193,6 +219,28 @@ EMAIL_ENABLED = bool(SMTP_USER and SMTP_PASSWORD)
 TASK_MAX_CONCURRENT = int(os.getenv("TASK_MAX_CONCURRENT", "3"))
 TASK_TIMEOUT_SECONDS = int(os.getenv("TASK_TIMEOUT_SECONDS", "600"))
 
+# 任务日志缓冲写入 task_logs 表：缓冲达到条数或间隔到期时批量写入
+TASK_LOG_BATCH_SIZE = int(os.getenv("TASK_LOG_BATCH_SIZE", "200"))
+TASK_LOG_FLUSH_INTERVAL = float(os.getenv("TASK_LOG_FLUSH_INTERVAL", "0.5"))
+# task_logs 用独立连接写入；任务事务占着写锁时最多等待的秒数，超时的批次留在缓冲下次重试
+TASK_LOG_LOCK_TIMEOUT = float(os.getenv("TASK_LOG_LOCK_TIMEOUT", "5"))
+
+# 任务进度 SSE：内存中保留的最近日志条数、任务结束后频道保留秒数
+TASK_EVENT_LOG_WINDOW = int(os.getenv("TASK_EVENT_LOG_WINDOW", "2000"))
+TASK_EVENT_RETAIN_SECONDS = int(os.getenv("TASK_EVENT_RETAIN_SECONDS", "300"))
+
+# 持久化作业队列：开启后上传任务写入 SQLite 队列，由 `python -m backend.app.worker` 进程执行
+TASK_QUEUE_ENABLED = os.getenv("TASK_QUEUE_ENABLED", "false").lower() == "true"
+TASK_QUEUE_DATABASE_URL = os.getenv("TASK_QUEUE_DATABASE_URL", f"sqlite:///{DATA_DIR / 'task_queue.db'}")
+TASK_QUEUE_UPLOAD_DIR = Path(os.getenv("TASK_QUEUE_UPLOAD_DIR", str(DATA_DIR / "task_uploads")))
+TASK_QUEUE_WORKERS = int(os.getenv("TASK_QUEUE_WORKERS", "3"))              # worker 进程数
+TASK_QUEUE_LEASE_SECONDS = int(os.getenv("TASK_QUEUE_LEASE_SECONDS", "120"))  # 租约时长，心跳续租
+TASK_QUEUE_HEARTBEAT_SECONDS = int(os.getenv("TASK_QUEUE_HEARTBEAT_SECONDS", "15"))
+TASK_QUEUE_MAX_ATTEMPTS = int(os.getenv("TASK_QUEUE_MAX_ATTEMPTS", "3"))
+TASK_QUEUE_RETRY_BACKOFF_SECONDS = int(os.getenv("TASK_QUEUE_RETRY_BACKOFF_SECONDS", "10"))
+TASK_QUEUE_MAX_RUNNING_PER_WORKSPACE = int(os.getenv("TASK_QUEUE_MAX_RUNNING_PER_WORKSPACE", "1"))
+TASK_QUEUE_POLL_SECONDS = float(os.getenv("TASK_QUEUE_POLL_SECONDS", "1.0"))
+
 # ==================== 调试配置 ====================
 
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
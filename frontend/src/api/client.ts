@@ -554,6 +554,27 @@ export const uploadApi = {
 };
 
 // Task API
+export interface TaskLogEntry {
+  seq?: number;
+  time: string;
+  level?: string;
+  message: string;
+  category?: string;
+}
+
+export interface TaskStageTiming {
+  seconds: number;
+  items: number;
+  unit: string;
+  per_second: number | null;
+  status: 'ok' | 'failed' | 'skipped';
+}
+
+export interface TaskTimings {
+  total_seconds: number;
+  stages: Record<string, TaskStageTiming>;
+}
+
 export interface TaskStatus {
   task_id: string;
   status: 'pending' | 'running' | 'completed' | 'failed' | 'cancelled';
@@ -571,9 +592,12 @@ export interface TaskStatus {
     positions_scored?: number;
     errors?: number;
     error_messages?: string[];
+    timings?: TaskTimings;
   } | null;
   error_message: string | null;
-  logs: { time: string; level?: string; message: string; category?: string }[];
+  logs: TaskLogEntry[];
+  log_offset?: number;
+  log_total?: number;
   created_at: string | null;
   started_at: string | null;
   completed_at: string | null;
@@ -626,6 +650,18 @@ export const taskApi = {
     return data;
   },
 
+  /**
+   * 任务进度 SSE 地址（EventSource 不能带请求头，workspace token 放在查询参数）
+   */
+  eventsUrl: (taskId: string, logOffset?: number): string => {
+    const params = new URLSearchParams();
+    const token = getWorkspaceToken();
+    if (token) params.append('workspace_token', token);
+    if (logOffset !== undefined) params.append('log_offset', String(logOffset));
+    const query = params.toString();
+    return `${API_BASE}/tasks/${taskId}/events${query ? `?${query}` : ''}`;
+  },
+
   /**
    * 获取任务列表
    */
@@ -16,6 +16,7 @@ import { X, FileText, ChevronDown, ChevronUp, Loader2 } from 'lucide-react';
 import clsx from 'clsx';
 import { taskApi, type TaskStatus } from '@/api/client';
 import { useNotification } from '@/hooks/useNotification';
+import { useTaskStream } from '@/hooks/useTaskStream';
 import { useToast } from '@/store/useToastStore';
 
 import { ProgressHeader } from './ProgressHeader';
@@ -58,13 +59,15 @@ export function ProcessingLogPanel({
   const [showLogs, setShowLogs] = useState(true);
   const hasNotifiedRef = useRef(false);
 
-  // 轮询任务状态
+  // 任务状态：SSE 推送，连接不上时轮询
+  const streaming = useTaskStream(taskId);
   const { data: task } = useQuery({
     queryKey: ['task', taskId],
     queryFn: () => taskApi.getStatus(taskId),
     refetchInterval: (query) => {
       const data = query.state.data;
       if (!data) return 800;
+      if (streaming) return false;
       if (data.status === 'completed' || data.status === 'failed' || data.status === 'cancelled') {
         return false; // 停止轮询
       }
@@ -0,0 +1,76 @@
+/**
+ * useTaskStream - 任务进度 SSE 订阅 Hook
+ *
+ * input: taskId
+ * output: 是否正在通过 SSE 接收进度；状态与新日志写入 React Query 缓存 ['task', taskId]
+ * pos: Hook 层 - 替代任务状态轮询。连接中调用方停止轮询，连接失败时继续按原间隔轮询
+ */
+import { useEffect, useState } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { taskApi, type TaskLogEntry, type TaskStatus } from '@/api/client';
+
+const TERMINAL = ['completed', 'failed', 'cancelled'];
+const MAX_LOGS = 1000;
+const FLUSH_MS = 200;
+
+export function useTaskStream(taskId: string | null | undefined, enabled = true): boolean {
+  const queryClient = useQueryClient();
+  const [streaming, setStreaming] = useState(false);
+
+  useEffect(() => {
+    if (!taskId || !enabled || typeof EventSource === 'undefined') return;
+
+    const key = ['task', taskId];
+    const source = new EventSource(taskApi.eventsUrl(taskId));
+    let pendingLogs: TaskLogEntry[] = [];
+    let pendingState: Partial<TaskStatus> | null = null;
+
+    // 日志可能每秒上千条，合并后再写缓存
+    const flush = () => {
+      if (!pendingLogs.length && !pendingState) return;
+      const logs = pendingLogs;
+      const state = pendingState;
+      pendingLogs = [];
+      pendingState = null;
+      queryClient.setQueryData<TaskStatus>(key, (prev) => {
+        if (!prev) return prev;
+        const lastSeq = prev.logs[prev.logs.length - 1]?.seq ?? -1;
+        const fresh = logs.filter((entry) => (entry.seq ?? 0) > lastSeq);
+        return {
+          ...prev,
+          ...state,
+          logs: fresh.length ? [...prev.logs, ...fresh].slice(-MAX_LOGS) : prev.logs,
+        };
+      });
+    };
+    const timer = window.setInterval(flush, FLUSH_MS);
+
+    source.addEventListener('state', (event) => {
+      const state = JSON.parse((event as MessageEvent).data) as Partial<TaskStatus>;
+      pendingState = { ...pendingState, ...state };
+      setStreaming(true);
+      if (TERMINAL.includes(state.status ?? '')) {
+        flush();
+        source.close();
+        setStreaming(false);
+        // 结束后取一次完整任务（completed_at 等字段）
+        queryClient.invalidateQueries({ queryKey: key });
+      }
+    });
+    source.addEventListener('log', (event) => {
+      pendingLogs.push(JSON.parse((event as MessageEvent).data) as TaskLogEntry);
+    });
+    source.onerror = () => {
+      // CONNECTING 表示浏览器正在带 Last-Event-ID 自动重连；CLOSED 时退回轮询
+      if (source.readyState === EventSource.CLOSED) setStreaming(false);
+    };
+
+    return () => {
+      window.clearInterval(timer);
+      source.close();
+      setStreaming(false);
+    };
+  }, [taskId, enabled, queryClient]);
+
+  return streaming;
+}
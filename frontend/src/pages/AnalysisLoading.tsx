@@ -9,6 +9,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query';
 import { useTranslation } from 'react-i18next';
 import { taskApi } from '@/api/client';
+import { useTaskStream } from '@/hooks/useTaskStream';
 import { BrandSection } from '@/components/loading/BrandSection';
 import { ProgressPanel } from '@/components/loading/ProgressPanel';
 import { BackgroundEffects } from '@/components/landing/BackgroundEffects';
@@ -21,7 +22,8 @@ export function AnalysisLoading() {
   const { t } = useTranslation();
   const toast = useToast();
 
-  // Task status polling
+  // Task status: pushed over SSE, polling while the stream is not connected
+  const streaming = useTaskStream(taskId);
   const { data: task, isLoading, error } = useQuery({
     queryKey: ['task', taskId],
     queryFn: () => taskApi.getStatus(taskId!),
@@ -32,7 +34,7 @@ export function AnalysisLoading() {
       if (data.status === 'completed' || data.status === 'failed' || data.status === 'cancelled') {
         return false;
       }
-      return 500; // 快速轮询
+      return streaming ? false : 500; // 快速轮询
     },
   });
 
@@ -3,6 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { useQuery, useQueryClient } from '@tanstack/react-query';
 import { useTranslation } from 'react-i18next';
 import { taskApi } from '@/api/client';
+import { useTaskStream } from '@/hooks/useTaskStream';
 import {
   CheckCircle,
   AlertCircle,
@@ -54,6 +55,7 @@ export function TaskStatus() {
   }, []);
 
   // Fetch task status with auto-refresh
+  const streaming = useTaskStream(taskId);
   const { data: task, isLoading, isError, error } = useQuery({
     queryKey: ['task', taskId],
     queryFn: () => taskApi.getStatus(taskId!),
@@ -65,7 +67,8 @@ export function TaskStatus() {
         data?.state?.data?.status === 'cancelled') {
         return false;
       }
-      return 1000; // Poll every 1 second
+      // Progress is pushed over SSE while the stream is connected
+      return streaming ? false : 1000; // Poll every 1 second
     },
   });
 
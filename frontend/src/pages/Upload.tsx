@@ -3,6 +3,7 @@ import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { useTranslation } from 'react-i18next';
 import { uploadApi, taskApi, systemApi, workspaceApi } from '@/api/client';
 import type { UploadHistoryItem } from '@/api/client';
+import { useTaskStream } from '@/hooks/useTaskStream';
 import { ImportPreflightPanel } from '@/components/upload/ImportPreflightPanel';
 import {
   Upload as UploadIcon,
@@ -104,7 +105,8 @@ export function Upload() {
     return () => clearInterval(interval);
   }, [isProcessing]);
 
-  // 任务状态轮询
+  // 任务状态：SSE 推送，连接不上时轮询
+  const streaming = useTaskStream(taskId, isProcessing);
   const { data: task } = useQuery({
     queryKey: ['task', taskId],
     queryFn: () => taskApi.getStatus(taskId!),
@@ -114,7 +116,7 @@ export function Upload() {
       if (data?.status === 'completed' || data?.status === 'failed' || data?.status === 'cancelled') {
         return false;
       }
-      return 1000; // 每秒轮询
+      return streaming ? false : 1000; // 每秒轮询
     },
   });
 